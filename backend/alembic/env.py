@@ -0,0 +1,88 @@
+"""
+Environnement Alembic : schéma cible issu des modèles SQLAlchemy, base
+désignée par DATABASE_URL (configuration de l'application).
+"""
+import logging
+from logging.config import fileConfig
+
+from alembic import context
+from alembic.script import ScriptDirectory
+from sqlalchemy import engine_from_config, inspect, pool
+
+from app.config import settings
+from app.database import Base
+import app.models  # noqa: F401  (enregistre les tables dans Base.metadata)
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+logger = logging.getLogger("alembic.env")
+
+config.set_main_option("sqlalchemy.url", settings.database_url.replace("%", "%%"))
+target_metadata = Base.metadata
+
+# Colonnes ajoutées aux contrats par la révision 0001 (script migrations/003)
+_DOCUMENT_COLUMNS = {"document_status", "document_size", "document_etag", "document_checked_at"}
+
+
+def run_migrations_offline() -> None:
+    """Génère le SQL des migrations sans connexion (alembic upgrade --sql)."""
+    context.configure(
+        url=config.get_main_option("sqlalchemy.url"),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def _pre_alembic_revision(inspector) -> str:
+    """
+    Dernière révision entièrement présente dans une base créée avant
+    Alembic : 0000 (schéma d'origine), 0001 (scripts migrations/002 et 003
+    appliqués) ou 0002 (table `cache_versions`, DATABASE_CREATE_ALL).
+    """
+    tables = set(inspector.get_table_names())
+    contract_columns = {column["name"] for column in inspector.get_columns("contracts")}
+    if "oauth_states" not in tables or not _DOCUMENT_COLUMNS <= contract_columns:
+        return "0000"
+    if "cache_versions" not in tables:
+        return "0001"
+    return "0002"
+
+
+def _stamp_pre_alembic_schema(connection) -> None:
+    """
+    Marque une base créée avant Alembic (table `contracts` présente, pas de
+    table `alembic_version`) à la révision correspondant à son schéma, pour
+    que `alembic upgrade head` n'applique que les migrations manquantes au
+    lieu d'échouer sur des tables existantes.
+    """
+    inspector = inspect(connection)
+    tables = set(inspector.get_table_names())
+    if "alembic_version" in tables or "contracts" not in tables:
+        return
+    revision = _pre_alembic_revision(inspector)
+    context.get_context().stamp(ScriptDirectory.from_config(config), revision)
+    logger.info("Base antérieure à Alembic marquée à la révision %s", revision)
+
+
+def run_migrations_online() -> None:
+    """Applique les migrations sur la base configurée."""
+    connectable = engine_from_config(
+        config.get_section(config.config_ini_section, {}),
+        prefix="sqlalchemy.",
+        poolclass=pool.NullPool,
+    )
+    with connectable.connect() as connection:
+        context.configure(connection=connection, target_metadata=target_metadata)
+        with context.begin_transaction():
+            _stamp_pre_alembic_schema(connection)
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,74 @@
+"""Schéma d'origine (contrats, utilisateurs, cache de tickets)
+
+Tables créées par l'application avant Alembic (`Base.metadata.create_all`,
+script migrations/001 compris). Une telle base est marquée à cette révision
+par `alembic upgrade head` (voir env.py), qui applique ensuite la suite.
+
+Revision ID: 0000
+Revises:
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0000"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "contracts",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("supplier", sa.String(255), nullable=False),
+        sa.Column("amount", sa.Numeric(10, 2), nullable=False, comment="Montant total du contrat"),
+        sa.Column("duration_months", sa.Integer(), nullable=False, comment="Durée du contrat en mois"),
+        sa.Column("start_date", sa.Date(), nullable=False),
+        sa.Column("end_date", sa.Date(), nullable=False),
+        sa.Column("notice_period_days", sa.Integer(), nullable=False),
+        sa.Column("sharepoint_file_url", sa.Text(), nullable=True),
+        sa.Column("status", sa.String(50), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_contracts_name", "contracts", ["name"])
+    op.create_index("ix_contracts_end_date", "contracts", ["end_date"])
+    op.create_index("ix_contracts_status", "contracts", ["status"])
+
+    op.create_table(
+        "users",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("username", sa.String(100), nullable=False),
+        sa.Column("email", sa.String(255), nullable=False),
+        sa.Column("hashed_password", sa.String(255), nullable=False),
+        sa.Column("full_name", sa.String(255), nullable=True),
+        sa.Column("is_active", sa.Boolean(), nullable=True),
+        sa.Column("is_admin", sa.Boolean(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("last_login", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_users_username", "users", ["username"], unique=True)
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "ticket_cache",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("title", sa.String(), nullable=False),
+        sa.Column("state", sa.String(50), nullable=True),
+        sa.Column("tags", postgresql.ARRAY(sa.String()), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.Column("close_at", sa.DateTime(), nullable=True),
+        sa.Column("priority", sa.String(50), nullable=True),
+        sa.Column("synced_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_ticket_cache_close_at", "ticket_cache", ["close_at"])
+
+
+def downgrade() -> None:
+    op.drop_table("ticket_cache")
+    op.drop_table("users")
+    op.drop_table("contracts")
@@ -0,0 +1,47 @@
+"""États CSRF SSO et état des documents SharePoint des contrats
+
+Équivalent des scripts migrations/002 et 003. Une base d'origine sur
+laquelle l'un d'eux a déjà été appliqué à la main est complétée : seuls la
+table et les colonnes absentes sont créées.
+
+Revision ID: 0001
+Revises: 0000
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = "0000"
+branch_labels = None
+depends_on = None
+
+def document_columns():
+    return [
+        sa.Column("document_status", sa.String(20), nullable=True, comment="ok, not_found, error ou no_document"),
+        sa.Column("document_size", sa.BigInteger(), nullable=True),
+        sa.Column("document_etag", sa.String(255), nullable=True),
+        sa.Column("document_checked_at", sa.DateTime(), nullable=True),
+    ]
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("oauth_states"):
+        op.create_table(
+            "oauth_states",
+            sa.Column("state", sa.String(128), primary_key=True),
+            sa.Column("expires_at", sa.DateTime(), nullable=False),
+        )
+        op.create_index("ix_oauth_states_expires_at", "oauth_states", ["expires_at"])
+
+    existing = {column["name"] for column in inspector.get_columns("contracts")}
+    for column in document_columns():
+        if column.name not in existing:
+            op.add_column("contracts", column)
+
+
+def downgrade() -> None:
+    for column in reversed(document_columns()):
+        op.drop_column("contracts", column.name)
+    op.drop_table("oauth_states")
@@ -0,0 +1,27 @@
+"""Versions des caches partagés entre workers (timeline des contrats)
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    cache_versions = op.create_table(
+        "cache_versions",
+        sa.Column("name", sa.String(64), primary_key=True),
+        sa.Column("version", sa.BigInteger(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+    )
+    op.bulk_insert(cache_versions, [{"name": "contract_timeline", "version": 0}])
+
+
+def downgrade() -> None:
+    op.drop_table("cache_versions")
@@ -1,15 +1,21 @@
 """
 Utilitaires pour l'authentification JWT.
 """
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Dict, Optional, Tuple
+from uuid import UUID
+import threading
+import time
 from jose import JWTError, jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
 
 from app.config import settings
 from app.database import get_db
+from app.metrics import cache_requests_total
 from app.models.user import User
 
 # Schéma OAuth2 pour récupérer le token
@@ -64,54 +70,312 @@ def verify_token(token: str) -> dict:
         )
 
 
+@dataclass(frozen=True)
+class Principal:
+    """
+    Utilisateur authentifié, détaché de la session SQLAlchemy.
+    Peut être mis en cache et partagé entre requêtes sans risque.
+    """
+    id: Optional[UUID]
+    username: str
+    email: str
+    full_name: Optional[str]
+    is_admin: bool
+    is_active: bool
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        """Construit un Principal à partir d'un utilisateur en base."""
+        return cls(
+            id=user.id,
+            username=user.username,
+            email=user.email,
+            full_name=user.full_name,
+            is_admin=bool(user.is_admin),
+            is_active=bool(user.is_active),
+        )
+
+    @classmethod
+    def from_claims(cls, payload: dict) -> Optional["Principal"]:
+        """
+        Construit un Principal à partir des claims signés du token.
+
+        Returns:
+            Principal | None: None si le token ne porte pas toutes les claims
+        """
+        if not payload.get("sub") or not payload.get("uid"):
+            return None
+        return cls(
+            id=UUID(payload["uid"]),
+            username=payload["sub"],
+            email=payload.get("email", ""),
+            full_name=payload.get("name"),
+            is_admin=bool(payload.get("is_admin", False)),
+            # Un token n'est émis que pour un compte actif
+            is_active=True,
+        )
+
+
+# Utilisateurs dont la version est suivie avant repli dans l'époque commune
+_MAX_TRACKED_VERSIONS = 4096
+
+
+class PrincipalCache:
+    """
+    Cache mémoire à durée de vie courte des utilisateurs authentifiés.
+
+    Les entrées sont indexées par le sujet du token (username) et associées
+    à une version d'utilisateur : toute modification ou suppression de
+    l'utilisateur incrémente cette version et rend l'entrée obsolète, y compris
+    si une lecture concurrente la réinsère avec des données périmées.
+    Une invalidation globale (mise à jour en masse) incrémente la version de
+    tous les utilisateurs : les versions individuelles sont alors repliées
+    dans une époque commune, supérieure à chacune d'elles, et oubliées. Le
+    repli a aussi lieu au-delà de `_MAX_TRACKED_VERSIONS` utilisateurs
+    invalidés, ce qui borne la mémoire du cache.
+    Le cache étant propre à chaque processus, le TTL borne l'obsolescence
+    entre workers.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[str, Tuple[int, float, Principal]] = {}
+        self._versions: Dict[str, int] = {}
+        self._epoch = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def version(self, username: str) -> int:
+        """Retourne la version courante d'un utilisateur."""
+        return self._epoch + self._versions.get(username, 0)
+
+    def get(self, username: str) -> Optional[Principal]:
+        """
+        Retourne l'utilisateur en cache s'il est encore valide.
+
+        Args:
+            username: Sujet du token
+
+        Returns:
+            Principal | None: Utilisateur en cache ou None
+        """
+        entry = self._entries.get(username)
+        if entry is not None:
+            version, expires_at, principal = entry
+            if version == self.version(username) and time.monotonic() < expires_at:
+                self.hits += 1
+                cache_requests_total.inc(cache="principal", result="hit")
+                return principal
+        self.misses += 1
+        cache_requests_total.inc(cache="principal", result="miss")
+        return None
+
+    def set(self, username: str, principal: Principal, version: int) -> None:
+        """
+        Met en cache un utilisateur lu à une version donnée.
+
+        Args:
+            username: Sujet du token
+            principal: Utilisateur à mettre en cache
+            version: Version de l'utilisateur au moment de la lecture
+        """
+        if self.ttl_seconds <= 0:
+            return
+        self._entries[username] = (version, time.monotonic() + self.ttl_seconds, principal)
+
+    def invalidate(self, username: str) -> None:
+        """Invalide l'entrée d'un utilisateur (désactivation, promotion, suppression)."""
+        with self._lock:
+            self._versions[username] = self._versions.get(username, 0) + 1
+            self._entries.pop(username, None)
+            if len(self._versions) > _MAX_TRACKED_VERSIONS:
+                self._fold_versions()
+
+    def _fold_versions(self) -> None:
+        # Nouvelle époque supérieure à toute version déjà lue : aucune lecture
+        # en cours ne peut réinsérer une entrée valide (appel sous verrou)
+        self._epoch += max(self._versions.values(), default=0) + 1
+        self._versions.clear()
+        self._entries.clear()
+
+    def invalidate_all(self) -> None:
+        """Invalide tous les utilisateurs, y compris les lectures en cours."""
+        with self._lock:
+            self._fold_versions()
+
+    def clear(self) -> None:
+        """Vide entièrement le cache."""
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+
+
+principal_cache = PrincipalCache(ttl_seconds=settings.auth_principal_cache_ttl_seconds)
+
+
+# Clé de `Session.info` : utilisateurs modifiés dans la transaction en cours
+# (None dans l'ensemble = mise à jour en masse, utilisateurs inconnus)
+_PENDING_PRINCIPALS = "pending_principal_invalidations"
+
+
+def _invalidate_pending(session: Session) -> None:
+    pending = session.info.pop(_PENDING_PRINCIPALS, None)
+    if not pending:
+        return
+    if None in pending:
+        principal_cache.invalidate_all()
+        return
+    for username in pending:
+        principal_cache.invalidate(username)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_cached_principal(mapper, connection, target: User) -> None:
+    """
+    Invalide le cache dès qu'un utilisateur est modifié ou supprimé (au
+    flush), puis à nouveau après la validation : une lecture concurrente a
+    pu entre-temps remettre en cache la ligne d'avant la validation.
+    """
+    history = inspect(target).attrs.username.history
+    usernames = {username for username in {target.username, *(history.deleted or ())} if username}
+    for username in usernames:
+        principal_cache.invalidate(username)
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_PENDING_PRINCIPALS, set()).update(usernames)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _invalidate_on_bulk_statement(orm_execute_state) -> None:
+    """
+    Les mises à jour et suppressions en masse (`query.update()`,
+    `update(User)`) ne déclenchent pas les événements du mapper : tout le
+    cache est alors invalidé, à l'exécution et après la validation.
+    """
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    if not any(mapper.class_ is User for mapper in orm_execute_state.all_mappers):
+        return
+    principal_cache.invalidate_all()
+    orm_execute_state.session.info.setdefault(_PENDING_PRINCIPALS, set()).add(None)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    """Invalidation définitive, une fois la transaction visible des autres."""
+    _invalidate_pending(session)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_pending(session: Session, previous_transaction) -> None:
+    """Transaction annulée : les lignes en base n'ont pas changé."""
+    session.info.pop(_PENDING_PRINCIPALS, None)
+
+
+def _credentials_exception(detail: str) -> HTTPException:
+    """Construit l'erreur 401 standard de l'authentification."""
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def _ensure_active(principal: Principal) -> Principal:
+    """Refuse les utilisateurs inactifs."""
+    if not principal.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Utilisateur inactif"
+        )
+    return principal
+
+
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db)
-) -> User:
+) -> Principal:
     """
     Récupère l'utilisateur actuel à partir du token JWT.
+    La base n'est interrogée qu'en cas d'absence dans le cache.
     
     Args:
         token: Token JWT
         db: Session de base de données
     
     Returns:
-        User: Utilisateur authentifié
+        Principal: Utilisateur authentifié
     
     Raises:
         HTTPException: Si l'utilisateur n'existe pas ou est inactif
     """
+    return authenticate_token(token, db)
+
+
+def authenticate_token(token: str, db: Session) -> Principal:
+    """
+    Résout l'utilisateur actif d'un token JWT (cache, puis base).
+    Utilisable hors des dépendances FastAPI (middlewares).
+    
+    Args:
+        token: Token JWT
+        db: Session de base de données
+    
+    Returns:
+        Principal: Utilisateur authentifié
+    
+    Raises:
+        HTTPException: Si le token est invalide, l'utilisateur inexistant ou inactif
+    """
     payload = verify_token(token)
     username: str = payload.get("sub")
     
     if username is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token invalide",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        raise _credentials_exception("Token invalide")
     
-    user = db.query(User).filter(User.username == username).first()
+    principal = principal_cache.get(username)
+    if principal is None:
+        version = principal_cache.version(username)
+        user = db.query(User).filter(User.username == username).first()
+        
+        if user is None:
+            raise _credentials_exception("Utilisateur non trouvé")
+        
+        principal = Principal.from_user(user)
+        principal_cache.set(username, principal, version)
     
-    if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Utilisateur non trouvé",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+    return _ensure_active(principal)
+
+
+async def get_current_principal(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+) -> Principal:
+    """
+    Récupère l'utilisateur actuel pour les routes en lecture seule.
+    Si `auth_trust_token_claims` est activé, les claims signés du token
+    suffisent et aucune requête n'est effectuée.
     
-    if not user.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Utilisateur inactif"
-        )
+    Args:
+        token: Token JWT
+        db: Session de base de données (utilisée uniquement en repli)
+    
+    Returns:
+        Principal: Utilisateur authentifié
+    """
+    if settings.auth_trust_token_claims:
+        principal = Principal.from_claims(verify_token(token))
+        if principal is not None:
+            return principal
     
-    return user
+    return await get_current_user(token=token, db=db)
 
 
 async def get_current_admin_user(
-    current_user: User = Depends(get_current_user)
-) -> User:
+    current_user: Principal = Depends(get_current_user)
+) -> Principal:
     """
     Vérifie que l'utilisateur actuel est un administrateur.
     
@@ -119,7 +383,7 @@ async def get_current_admin_user(
         current_user: Utilisateur actuel
     
     Returns:
-        User: Utilisateur administrateur
+        Principal: Utilisateur administrateur
     
     Raises:
         HTTPException: Si l'utilisateur n'est pas administrateur
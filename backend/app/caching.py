@@ -0,0 +1,130 @@
+"""
+Cache mémoire à durée de vie courte des résultats de coroutines.
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from app.metrics import cache_requests_total
+
+
+class SingleFlightCache:
+    """
+    Cache TTL des résultats de chargements asynchrones (appels amont,
+    requêtes coûteuses), propre au processus.
+
+    Les appels concurrents pour une même clé sont regroupés : un seul
+    chargement est exécuté et tous les appelants reçoivent son résultat (ou
+    son exception). Les exceptions ne sont jamais mises en cache. Avec un TTL
+    nul, seul le regroupement des appels concurrents est conservé.
+
+    Une invalidation pendant un chargement empêche la mise en cache de son
+    résultat, lu avant la modification, et les appels suivants en relancent
+    un nouveau.
+
+    Les clés pouvant venir des paramètres d'une requête, le nombre d'entrées
+    est borné : chaque mise en cache purge les entrées expirées puis évince
+    les moins récemment lues au-delà de `max_entries`.
+    """
+
+    def __init__(self, name: str, ttl_seconds: float, max_entries: int = 256):
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._generation = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Retourne la valeur en cache si elle est encore valide, sinon None."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if time.monotonic() < expires_at:
+                self._entries.move_to_end(key)
+                return value
+            self._entries.pop(key, None)
+        return None
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Met une valeur en cache pour la durée du TTL, après purge des entrées
+        expirées et éviction des moins récemment lues (`max_entries`).
+        """
+        if self.ttl_seconds <= 0 or self.max_entries <= 0:
+            return
+        now = time.monotonic()
+        for expired in [k for k, (expires_at, _) in self._entries.items() if expires_at <= now]:
+            del self._entries[expired]
+        self._entries[key] = (now + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Retourne la valeur en cache ou la charge, un seul chargement par clé
+        à la fois.
+
+        Args:
+            key: Clé du résultat
+            loader: Coroutine de chargement (sans argument)
+
+        Returns:
+            Any: Valeur en cache ou chargée
+
+        Raises:
+            Exception: Exception levée par le chargement
+        """
+        while True:
+            value = self.get(key)
+            if value is not None:
+                cache_requests_total.inc(cache=self.name, result="hit")
+                return value
+
+            inflight = self._inflight.get(key)
+            if inflight is None or inflight.get_loop() is not asyncio.get_running_loop():
+                break
+            # Chargement déjà en cours : l'attendre sans pouvoir l'annuler ; s'il
+            # a été annulé (appelant initial interrompu), un nouveau est lancé
+            await asyncio.wait({inflight})
+            if not inflight.cancelled():
+                cache_requests_total.inc(cache=self.name, result="hit")
+                return inflight.result()
+
+        cache_requests_total.inc(cache=self.name, result="miss")
+        generation = self._generation
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await loader()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Exception déjà propagée à cet appelant : pas d'avertissement
+            # « exception never retrieved » s'il n'y a aucun autre appelant
+            future.exception()
+            raise
+        else:
+            if generation == self._generation:
+                self.set(key, value)
+            future.set_result(value)
+            return value
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def invalidate(self, key: Hashable) -> None:
+        """Supprime l'entrée d'une clé."""
+        self._generation += 1
+        self._entries.pop(key, None)
+        self._inflight.pop(key, None)
+
+    def clear(self) -> None:
+        """Vide entièrement le cache."""
+        self._generation += 1
+        self._entries.clear()
+        self._inflight.clear()
@@ -0,0 +1,146 @@
+"""
+Exécution des traitements bloquants hors de la boucle d'événements.
+"""
+import asyncio
+import functools
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional
+
+from app.metrics import REGISTRY
+
+_task_seconds = REGISTRY.histogram(
+    "executor_task_seconds",
+    "Durée des tâches exécutées dans les pools dédiés (attente comprise)",
+    labelnames=("executor", "operation"),
+)
+_rejected_total = REGISTRY.counter(
+    "executor_rejected_total",
+    "Tâches refusées car le pool est saturé",
+    labelnames=("executor",),
+)
+_timeouts_total = REGISTRY.counter(
+    "executor_timeouts_total",
+    "Tâches abandonnées après dépassement du délai",
+    labelnames=("executor",),
+)
+
+
+class ExecutorSaturated(Exception):
+    """Levée lorsque la file d'attente d'un pool est pleine."""
+
+    def __init__(self, executor_name: str):
+        super().__init__(f"Pool {executor_name} saturé")
+        self.executor_name = executor_name
+
+
+class ExecutorTimeout(TimeoutError):
+    """Levée lorsqu'une tâche dépasse le délai accordé par son pool."""
+
+    def __init__(self, executor_name: str, timeout: float):
+        super().__init__(f"Délai de {timeout}s dépassé dans le pool {executor_name}")
+        self.executor_name = executor_name
+        self.timeout = timeout
+
+
+class BoundedExecutor:
+    """
+    Pool de threads borné pour les appels bloquants (bcrypt, MSAL...).
+
+    Le nombre de tâches en cours (en exécution ou en attente) est limité à
+    `max_pending` : au-delà, `ExecutorSaturated` est levée immédiatement
+    plutôt que d'accumuler une file sans fin.
+    """
+
+    _instances: "weakref.WeakSet[BoundedExecutor]" = weakref.WeakSet()
+
+    def __init__(
+        self,
+        name: str,
+        max_workers: int,
+        max_pending: int,
+        timeout: Optional[float] = None
+    ):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending = 0
+        self._lock = threading.Lock()
+        BoundedExecutor._instances.add(self)
+
+    @classmethod
+    def instances(cls) -> List["BoundedExecutor"]:
+        """Pools existants (pour les métriques)."""
+        return list(cls._instances)
+
+    @property
+    def pending(self) -> int:
+        """Nombre de tâches en cours ou en attente."""
+        return self._pending
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix=self.name
+            )
+        return self._executor
+
+    def _release(self, _future) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    async def run(self, func: Callable[..., Any], *args, operation: str = "call", **kwargs) -> Any:
+        """
+        Exécute une fonction bloquante dans le pool.
+
+        Args:
+            func: Fonction à exécuter
+            operation: Nom de l'opération pour les métriques
+
+        Returns:
+            Any: Résultat de la fonction
+
+        Raises:
+            ExecutorSaturated: Si le pool est saturé
+            ExecutorTimeout: Si le délai est dépassé
+        """
+        with self._lock:
+            if self._pending >= self.max_pending:
+                _rejected_total.inc(executor=self.name)
+                raise ExecutorSaturated(self.name)
+            self._pending += 1
+
+        start = time.perf_counter()
+        try:
+            future = self._get_executor().submit(functools.partial(func, *args, **kwargs))
+        except BaseException:
+            self._release(None)
+            raise
+        # Le compteur n'est décrémenté qu'à la fin réelle du thread,
+        # même si l'appelant abandonne sur délai dépassé
+        future.add_done_callback(self._release)
+
+        try:
+            if self.timeout:
+                return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+            return await asyncio.wrap_future(future)
+        except asyncio.TimeoutError:
+            _timeouts_total.inc(executor=self.name)
+            raise ExecutorTimeout(self.name, self.timeout) from None
+        finally:
+            _task_seconds.observe(
+                time.perf_counter() - start,
+                executor=self.name,
+                operation=operation
+            )
+
+    def shutdown(self) -> None:
+        """Arrête le pool (sans attendre les tâches en cours)."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -1,29 +1,213 @@
 """
 Configuration de la base de données PostgreSQL avec SQLAlchemy.
 """
-from sqlalchemy import create_engine
+import hashlib
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from fastapi import Request
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from app.config import settings
 
 # Création du moteur SQLAlchemy
 engine = create_engine(
     settings.database_url,
     pool_pre_ping=True,  # Vérification de la connexion avant utilisation
-    echo=settings.debug   # Log des requêtes SQL en mode debug
+    echo=settings.sql_echo  # Log de toutes les requêtes SQL (voir aussi app.query_tracking)
 )
 
 # Session locale
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Moteur et session du réplica en lecture (optionnels)
+read_engine = None
+ReadSessionLocal = None
+if settings.database_read_url:
+    read_engine = create_engine(
+        settings.database_read_url,
+        pool_pre_ping=True,
+        echo=settings.sql_echo
+    )
+    ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
 # Base pour les modèles
 Base = declarative_base()
 
+# Retard de réplication (en secondes) côté PostgreSQL.
+# Un réplica à jour (LSN reçu == LSN rejoué) est considéré sans retard,
+# même si aucune transaction n'a été rejouée récemment.
+_REPLICA_LAG_QUERY = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+    """
+)
+
+
+class ReplicaRouter:
+    """
+    Décide si une lecture peut être servie par le réplica.
+
+    Le réplica est écarté (repli sur le primaire) lorsque :
+    - aucun réplica n'est configuré ;
+    - le retard de réplication dépasse `replica_max_lag_seconds` ;
+    - le réplica est injoignable.
+
+    La lecture de ses propres écritures est garantie par client, et non par
+    processus : voir `ReadAfterWriteMiddleware`.
+    """
+
+    def __init__(self, read_engine=None):
+        self.read_engine = read_engine
+        self._lag_checked_at = float("-inf")
+        self._replica_usable = read_engine is not None
+        self._last_lag: float | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def last_lag(self) -> float | None:
+        """Dernier retard de réplication mesuré (en secondes)."""
+        return self._last_lag
+
+    def use_replica(self) -> bool:
+        """
+        Indique si la lecture courante peut être routée vers le réplica.
+
+        Returns:
+            bool: True si le réplica est utilisable
+        """
+        if self.read_engine is None:
+            return False
+
+        if time.monotonic() - self._lag_checked_at >= settings.replica_lag_check_interval_seconds:
+            # Un seul thread rafraîchit la mesure, les autres gardent la valeur en cache
+            if self._lock.acquire(blocking=False):
+                try:
+                    self._refresh_lag()
+                finally:
+                    self._lag_checked_at = time.monotonic()
+                    self._lock.release()
+
+        return self._replica_usable
+
+    def _refresh_lag(self) -> None:
+        """Mesure le retard de réplication et met à jour l'état du réplica."""
+        try:
+            with self.read_engine.connect() as connection:
+                if connection.dialect.name == "postgresql":
+                    lag = float(connection.execute(_REPLICA_LAG_QUERY).scalar() or 0)
+                else:
+                    connection.execute(text("SELECT 1"))
+                    lag = 0.0
+        except Exception:
+            self._last_lag = None
+            self._replica_usable = False
+            return
+
+        self._last_lag = lag
+        self._replica_usable = lag <= settings.replica_max_lag_seconds
+
+
+replica_router = ReplicaRouter(read_engine)
+
+# Cookie portant l'échéance (epoch) jusqu'à laquelle les lectures d'un client
+# restent sur le primaire après l'une de ses écritures
+READ_PRIMARY_COOKIE = "dipa_read_primary_until"
+
+
+class _WriteTracker:
+    """Écritures sur le primaire pendant la requête HTTP en cours."""
+
+    def __init__(self):
+        # Modifié depuis le pool de threads (dépendances synchrones) : l'objet
+        # est partagé par la copie du contexte, contrairement à la variable
+        self.wrote = False
+
+
+_current_writes: ContextVar[Optional[_WriteTracker]] = ContextVar("primary_writes", default=None)
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _mark_primary_write(session, flush_context):
+    """Toute écriture sur le primaire bascule les lectures suivantes du client dessus."""
+    tracker = _current_writes.get()
+    if tracker is not None:
+        tracker.wrote = True
+
+
+def wrote_recently(request: Request) -> bool:
+    """
+    Indique si le client a écrit sur le primaire il y a moins de
+    `replica_read_after_write_seconds` (cookie posé par le middleware, quel
+    que soit le worker qui a traité l'écriture).
+
+    Args:
+        request: Requête HTTP
+
+    Returns:
+        bool: True si ses lectures doivent rester sur le primaire
+    """
+    value = request.cookies.get(READ_PRIMARY_COOKIE)
+    if not value:
+        return False
+    try:
+        return time.time() < float(value)
+    except ValueError:
+        return False
+
+
+class ReadAfterWriteMiddleware:
+    """
+    Garantit à chaque client la lecture de ses propres écritures : une
+    requête ayant écrit sur le primaire pose un cookie qui renvoie les
+    lectures suivantes de ce client (et de lui seul) vers le primaire pendant
+    `replica_read_after_write_seconds`.
+    Les lectures des autres clients restent sur le réplica et peuvent
+    refléter l'écriture avec le retard de réplication.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or settings.replica_read_after_write_seconds <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        tracker = _WriteTracker()
+        token = _current_writes.set(tracker)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and tracker.wrote:
+                max_age = settings.replica_read_after_write_seconds
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "set-cookie",
+                    f"{READ_PRIMARY_COOKIE}={time.time() + max_age:.3f}; "
+                    f"Max-Age={max(int(max_age), 1)}; Path=/; HttpOnly; SameSite=Lax"
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_writes.reset(token)
+
 
 def get_db():
     """
     Générateur de session de base de données pour les dépendances FastAPI.
-    
+
     Yields:
         Session: Session SQLAlchemy
     """
@@ -34,9 +218,82 @@ def get_db():
         db.close()
 
 
+def get_read_db(request: Request):
+    """
+    Générateur de session pour les routes en lecture seule.
+    Utilise le réplica si disponible et à jour, sinon le primaire (notamment
+    juste après une écriture du même client).
+
+    Args:
+        request: Requête HTTP (cookie de lecture de ses propres écritures)
+
+    Yields:
+        Session: Session SQLAlchemy (réplica ou primaire)
+    """
+    if wrote_recently(request) or not replica_router.use_replica():
+        yield from get_db()
+        return
+
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def advisory_lock_key(name: str) -> int:
+    """
+    Clé entière (int8 signé) d'un verrou consultatif PostgreSQL.
+
+    Args:
+        name: Nom du verrou
+
+    Returns:
+        int: Clé stable entre processus et redémarrages
+    """
+    digest = hashlib.blake2b(name.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+@contextmanager
+def advisory_lock(name: str, bind=None) -> Iterator[bool]:
+    """
+    Verrou consultatif PostgreSQL non bloquant, partagé entre workers et
+    instances : un seul détenteur à la fois, libéré en sortie de bloc (ou à
+    la fermeture de la connexion si le processus meurt).
+    Hors PostgreSQL (SQLite en développement), le verrou est toujours acquis.
+
+    Args:
+        name: Nom du verrou
+        bind: Moteur à utiliser (primaire par défaut)
+
+    Yields:
+        bool: True si le verrou est détenu par l'appelant
+    """
+    bind = bind or engine
+    if bind.dialect.name != "postgresql":
+        yield True
+        return
+
+    key = advisory_lock_key(name)
+    with bind.connect() as connection:
+        acquired = bool(connection.execute(
+            text("SELECT pg_try_advisory_lock(:key)"), {"key": key}
+        ).scalar())
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                try:
+                    connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": key})
+                except Exception:
+                    # Connexion inutilisable : la fermer libère le verrou
+                    connection.invalidate()
+
+
 def init_db():
     """
-    Initialise la base de données (création des tables).
-    À appeler au démarrage de l'application.
+    Crée les tables manquantes (développement et tests uniquement).
+    En production, le schéma est géré par Alembic (`alembic upgrade head`).
     """
     Base.metadata.create_all(bind=engine)
@@ -0,0 +1,170 @@
+"""
+Vérification des dépendances (base de données, Zammad) pour les sondes de
+santé.
+
+Le résultat de chaque vérification est gardé `health_check_cache_seconds`
+et les sondes concurrentes partagent la vérification en cours : quel que
+soit le nombre de sondes (plusieurs répartiteurs, orchestrateur), chaque
+dépendance est interrogée au plus une fois par période.
+"""
+import asyncio
+import logging
+import math
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import NullPool
+from starlette.concurrency import run_in_threadpool
+
+from app.caching import SingleFlightCache
+from app.config import settings
+from app.database import engine, read_engine
+from app.metrics import REGISTRY
+from app.services.zammad_service import get_zammad_service
+
+logger = logging.getLogger(__name__)
+
+_dependency_up = REGISTRY.gauge(
+    "health_dependency_up",
+    "1 si la dernière vérification de la dépendance a réussi",
+    labelnames=("dependency",),
+)
+_dependency_latency_seconds = REGISTRY.gauge(
+    "health_dependency_latency_seconds",
+    "Durée de la dernière vérification de la dépendance",
+    labelnames=("dependency",),
+)
+
+
+_probe_engines: Dict[str, Engine] = {}
+
+
+def _probe_connect_args(dialect: str, timeout_seconds: float) -> Dict:
+    if dialect == "postgresql":
+        return {
+            "connect_timeout": max(1, math.ceil(timeout_seconds)),
+            "options": f"-c statement_timeout={max(1, int(timeout_seconds * 1000))}",
+        }
+    if dialect == "sqlite":
+        return {"timeout": timeout_seconds}
+    return {}
+
+
+def _probe_engine(db_engine: Engine) -> Engine:
+    """
+    Moteur des sondes pour la base de `db_engine` : sans pool (le pool de
+    l'application, éventuellement épuisé, n'est jamais attendu) et avec des
+    délais de connexion et de requête côté pilote. `wait_for` n'interrompt
+    pas un thread bloqué : c'est ce délai qui libère le thread de la sonde.
+    """
+    key = db_engine.url.render_as_string(hide_password=False)
+    probe = _probe_engines.get(key)
+    if probe is None:
+        probe = create_engine(
+            db_engine.url,
+            poolclass=NullPool,
+            connect_args=_probe_connect_args(
+                db_engine.dialect.name, settings.health_check_timeout_seconds
+            ),
+        )
+        _probe_engines[key] = probe
+    return probe
+
+
+def _ping_engine(db_engine: Engine) -> None:
+    with _probe_engine(db_engine).connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+
+async def check_database() -> None:
+    """Base primaire : connexion et requête triviale."""
+    await run_in_threadpool(_ping_engine, engine)
+
+
+async def check_database_replica() -> None:
+    """Réplica en lecture : connexion et requête triviale."""
+    await run_in_threadpool(_ping_engine, read_engine)
+
+
+async def check_zammad() -> None:
+    """API Zammad : accès authentifié (client HTTP partagé)."""
+    await get_zammad_service().ping()
+
+
+def default_checks() -> Dict[str, Callable[[], Awaitable[None]]]:
+    """Vérifications des dépendances configurées."""
+    checks = {"database": check_database}
+    if read_engine is not None:
+        checks["database_replica"] = check_database_replica
+    checks["zammad"] = check_zammad
+    return checks
+
+
+class HealthChecker:
+    """
+    Vérifie les dépendances avec un délai maximal, et garde les résultats
+    (succès comme échecs) en cache pour absorber les rafales de sondes.
+    """
+
+    def __init__(
+        self,
+        checks: Dict[str, Callable[[], Awaitable[None]]],
+        ttl_seconds: float,
+        timeout_seconds: float
+    ):
+        self.checks = checks
+        self.timeout_seconds = timeout_seconds
+        self.cache = SingleFlightCache("health", ttl_seconds)
+
+    async def _run(self, name: str) -> Dict:
+        started = time.perf_counter()
+        error = None
+        try:
+            await asyncio.wait_for(self.checks[name](), timeout=self.timeout_seconds)
+        except asyncio.TimeoutError:
+            error = f"délai de {self.timeout_seconds}s dépassé"
+        except Exception as e:
+            error = str(e) or type(e).__name__
+        latency = time.perf_counter() - started
+
+        _dependency_up.set(0 if error else 1, dependency=name)
+        _dependency_latency_seconds.set(latency, dependency=name)
+        if error:
+            logger.warning("Dépendance %s indisponible : %s", name, error, extra={"dependency": name})
+
+        result = {
+            "status": "down" if error else "up",
+            "latency_ms": round(latency * 1000, 1),
+            "checked_at": datetime.now(timezone.utc).isoformat(),
+        }
+        if error:
+            result["error"] = error
+        return result
+
+    async def check(self, name: str) -> Dict:
+        """
+        Résultat de la vérification d'une dépendance (éventuellement en cache).
+
+        Args:
+            name: Nom de la dépendance
+
+        Returns:
+            Dict: Statut (up/down), latence, date de vérification et erreur
+        """
+        return await self.cache.get_or_load(name, lambda: self._run(name))
+
+    async def check_all(self) -> Dict[str, Dict]:
+        """Vérifie toutes les dépendances en parallèle."""
+        names = list(self.checks)
+        results = await asyncio.gather(*(self.check(name) for name in names))
+        return dict(zip(names, results))
+
+
+health_checker = HealthChecker(
+    default_checks(),
+    ttl_seconds=settings.health_check_cache_seconds,
+    timeout_seconds=settings.health_check_timeout_seconds,
+)
@@ -0,0 +1,220 @@
+"""
+Journalisation structurée (JSON) et non bloquante.
+
+Les enregistrements sont placés dans une file par un `QueueHandler` ; un
+`QueueListener` (thread dédié) les formate et les écrit, si bien que la
+boucle d'événements ne fait jamais d'écriture sur la sortie standard.
+Chaque enregistrement porte l'identifiant de la requête HTTP en cours et,
+le cas échéant, celui de la trace.
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import re
+import sys
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+
+REQUEST_ID_HEADER = "X-Request-ID"
+
+# Identifiant de requête accepté depuis l'appelant (proxy, frontend)
+_VALID_REQUEST_ID = re.compile(r"^[A-Za-z0-9._-]{1,128}$")
+
+# Attributs standard d'un LogRecord (les autres sont des champs `extra`)
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {
+    "message", "asctime", "request_id", "trace_id",
+}
+
+_request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[logging.handlers.QueueHandler] = None
+_hooks_registered = False
+
+
+def current_request_id() -> Optional[str]:
+    """Identifiant de la requête HTTP en cours (None hors requête)."""
+    return _request_id.get()
+
+
+class ContextFilter(logging.Filter):
+    """
+    Ajoute l'identifiant de requête et de trace aux enregistrements.
+    Doit s'exécuter dans le thread émetteur (avant la mise en file), là où
+    les variables de contexte sont disponibles.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = _request_id.get()
+        # Import local : app.tracing dépend de modules qui journalisent
+        from app.tracing import current_span
+        span = current_span()
+        record.trace_id = span.trace_id if span is not None else None
+        return True
+
+
+class StructuredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler conservant la structure de l'enregistrement : le message
+    est interpolé et l'exception mise en texte dans le thread émetteur,
+    le formatage final (JSON) est laissé au thread d'écriture.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """Formate un enregistrement en une ligne JSON."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key in ("request_id", "trace_id"):
+            value = getattr(record, key, None)
+            if value:
+                entry[key] = value
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def setup_logging() -> None:
+    """
+    Configure la journalisation du processus (idempotent, relançable après
+    `shutdown_logging`) : niveau global, niveaux par module (`log_levels`),
+    format JSON ou texte.
+    """
+    global _listener, _queue_handler, _hooks_registered
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    if settings.log_format == "json":
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter(
+            "%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s"
+        ))
+
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+    _queue_handler = StructuredQueueHandler(log_queue)
+    _queue_handler.addFilter(ContextFilter())
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_queue_handler)
+    root.setLevel(settings.log_level.upper())
+    for module, level in settings.log_levels.items():
+        logging.getLogger(module).setLevel(level.upper())
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    if not _hooks_registered:
+        _hooks_registered = True
+        atexit.register(shutdown_logging)
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=_restart_after_fork)
+
+
+def _restart_after_fork() -> None:
+    """
+    Relance le thread d'écriture dans un processus issu d'un fork (workers
+    gunicorn avec préchargement) : les threads ne survivent pas au fork et
+    la file du parent peut avoir été copiée verrouillée.
+    """
+    global _listener
+    if _listener is None or _queue_handler is None:
+        return
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+    _queue_handler.queue = log_queue
+    _listener = logging.handlers.QueueListener(log_queue, *_listener.handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """
+    Écrit les enregistrements en attente et arrête le thread d'écriture.
+    Le QueueHandler est retiré du logger racine au profit d'une écriture
+    directe (synchrone) : les journaux émis ensuite (atexit, autre cycle de
+    vie dans le même processus) ne restent pas dans une file sans lecteur.
+    """
+    global _listener, _queue_handler
+    if _listener is None:
+        return
+    root = logging.getLogger()
+    if _queue_handler is not None:
+        root.removeHandler(_queue_handler)
+        _queue_handler = None
+    _listener.stop()
+    for handler in _listener.handlers:
+        root.addHandler(handler)
+    _listener = None
+
+
+def debug_sampled(logger: logging.Logger, msg: str, *args, **kwargs) -> None:
+    """
+    Journal de debug échantillonné (`log_debug_sample_rate`) pour les
+    chemins fréquents : le coût est nul lorsque le niveau DEBUG est inactif.
+
+    Args:
+        logger: Logger du module
+        msg: Message (interpolé à la manière de `logging`)
+    """
+    if logger.isEnabledFor(logging.DEBUG) and random.random() < settings.log_debug_sample_rate:
+        logger.debug(msg, *args, **kwargs)
+
+
+class RequestIdMiddleware:
+    """
+    Middleware ASGI attribuant un identifiant à chaque requête HTTP.
+    L'en-tête `X-Request-ID` entrant est repris s'il est valide ; il est
+    renvoyé dans la réponse et ajouté à tous les journaux de la requête.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = Headers(scope=scope).get(REQUEST_ID_HEADER)
+        if not request_id or not _VALID_REQUEST_ID.match(request_id):
+            request_id = uuid.uuid4().hex
+        token = _request_id.set(request_id)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)[REQUEST_ID_HEADER] = request_id
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_id.reset(token)
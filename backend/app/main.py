@@ -2,31 +2,56 @@
 Application principale Cockpit IT.
 Point d'entrée FastAPI avec configuration CORS et routes.
 """
-from fastapi import FastAPI
+import time
+
+# Début de l'import de l'application (durée de démarrage exposée en métrique)
+_import_started = time.perf_counter()
+
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from contextlib import asynccontextmanager
+import asyncio
+import logging
 
+from app.concurrency import ExecutorSaturated, ExecutorTimeout
 from app.config import settings
-from app.database import init_db
-from app.routers import contracts_router, tickets_router, auth_router
+from app.database import ReadAfterWriteMiddleware, SessionLocal, advisory_lock, init_db
+from app.health import health_checker
+from app.logging_config import RequestIdMiddleware, setup_logging, shutdown_logging
+from app.metrics import REGISTRY
+from app.monitoring import (
+    MetricsMiddleware,
+    record_startup,
+    resident_memory_bytes,
+    run_event_loop_lag_monitor,
+)
+from app.models.user import User
+from app.passwords import hash_password, password_executor
+from app.profiling import Profiler, ProfilingMiddleware
+from app.query_tracking import QueryTrackingMiddleware
+from app.rate_limit import RateLimitMiddleware, route_cost
+from app.services.graph_service import close_graph_service
+from app.services.zammad_service import close_zammad_service
+from app.tracing import TracingMiddleware, shutdown_tracing
+from app.scheduler import Job, scheduler
+from app.services.link_health import run_link_health_check
+from app.warmup import readiness, run_warmup
+from app.routers import contracts_router, tickets_router, auth_router, profiles_router
 
+setup_logging()
+logger = logging.getLogger(__name__)
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
+
+async def bootstrap_admin() -> None:
     """
-    Gestionnaire de cycle de vie de l'application.
-    Initialise la base de données au démarrage.
+    Crée l'administrateur initial (BOOTSTRAP_ADMIN_*) s'il n'existe aucun
+    administrateur. Un seul worker s'en charge (verrou consultatif), les
+    autres ne font aucune requête.
     """
-    # Startup
-    print("🚀 Initialisation de la base de données...")
-    init_db()
-    print("✅ Base de données initialisée")
-    
-    # Créer un utilisateur admin si l'authentification locale est activée
-    if settings.enable_local_auth and settings.bootstrap_admin_username:
-        from app.database import SessionLocal
-        from app.models.user import User
-        
+    with advisory_lock("bootstrap_admin") as acquired:
+        if not acquired:
+            return
         db = SessionLocal()
         try:
             existing_admin = db.query(User).filter(User.is_admin == True).first()
@@ -34,23 +59,102 @@ async def lifespan(app: FastAPI):
                 admin = User(
                     username=settings.bootstrap_admin_username,
                     email=settings.bootstrap_admin_email,
-                    hashed_password=User.hash_password(settings.bootstrap_admin_password),
+                    hashed_password=await hash_password(settings.bootstrap_admin_password),
                     full_name="Administrateur (bootstrap)",
                     is_admin=True,
                     is_active=True
                 )
                 db.add(admin)
                 db.commit()
-                print("👤 Utilisateur admin créé via bootstrap.")
+                logger.info("Utilisateur admin créé via bootstrap.")
         except Exception as e:
-            print(f"⚠️  Erreur lors de la création de l'admin: {e}")
+            logger.exception("Erreur lors de la création de l'admin: %s", e)
         finally:
             db.close()
+
+
+def register_jobs() -> None:
+    """Enregistre les tâches planifiées selon la configuration."""
+    registered = {job.name for job in scheduler.jobs}
+    # Contrôle périodique des liens SharePoint des contrats
+    if "link_health" not in registered:
+        if settings.link_health_cron:
+            scheduler.add_job(Job(
+                "link_health", run_link_health_check,
+                cron=settings.link_health_cron, jitter=60
+            ))
+        elif settings.link_health_interval_seconds > 0:
+            interval = settings.link_health_interval_seconds
+            scheduler.add_job(Job(
+                "link_health", run_link_health_check,
+                interval=interval, jitter=interval * 0.1
+            ))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Gestionnaire de cycle de vie de l'application.
+    Le schéma est géré par Alembic ; `database_create_all` le crée au
+    démarrage (développement et tests). Le préchauffage (pools, caches)
+    s'exécute en tâche de fond : /health/ready répond 503 jusqu'à sa fin.
+    """
+    # Startup
+    lifespan_started = time.perf_counter()
+    setup_logging()  # Relance après l'arrêt d'un cycle de vie précédent
+    if settings.database_create_all:
+        logger.info("Initialisation de la base de données...")
+        init_db()
+        logger.info("Base de données initialisée")
+    
+    # Créer un utilisateur admin si l'authentification locale est activée
+    if settings.enable_local_auth and settings.bootstrap_admin_username:
+        await bootstrap_admin()
+    
+    # Tâches planifiées (exécutées par le seul worker leader de la grappe)
+    if settings.scheduler_enabled:
+        register_jobs()
+        await scheduler.start()
+    
+    # Mesure du retard de la boucle d'événements
+    loop_lag_task = None
+    if settings.metrics_enabled and settings.event_loop_lag_interval_seconds > 0:
+        loop_lag_task = asyncio.create_task(
+            run_event_loop_lag_monitor(settings.event_loop_lag_interval_seconds)
+        )
+    
+    # Préchauffage des pools et caches, borné par warmup_budget_seconds
+    warmup_task = None
+    if settings.warmup_enabled:
+        warmup_task = asyncio.create_task(run_warmup(settings.warmup_budget_seconds))
+    else:
+        readiness.set_ready()
+    
+    startup_seconds = time.perf_counter() - lifespan_started
+    record_startup("lifespan", startup_seconds)
+    rss = resident_memory_bytes()
+    logger.info(
+        "Démarrage terminé (import %.0f ms, lifespan %.0f ms, RSS %s Mo)",
+        import_seconds * 1000, startup_seconds * 1000,
+        f"{rss / 1024 / 1024:.0f}" if rss is not None else "?",
+        extra={"import_seconds": import_seconds, "startup_seconds": startup_seconds, "rss_bytes": rss}
+    )
     
     yield
     
     # Shutdown
-    print("👋 Arrêt de l'application")
+    readiness.set_ready(False)
+    if warmup_task is not None:
+        warmup_task.cancel()
+    if loop_lag_task is not None:
+        loop_lag_task.cancel()
+    await scheduler.stop()
+    password_executor.shutdown()
+    await close_graph_service()
+    await close_zammad_service()
+    shutdown_tracing()
+    logger.info("Arrêt de l'application")
+    shutdown_logging()
 
 
 # Création de l'application FastAPI
@@ -61,7 +165,52 @@ app = FastAPI(
     lifespan=lifespan
 )
 
-# Configuration CORS
+
+@app.exception_handler(ExecutorSaturated)
+async def executor_saturated_handler(request: Request, exc: ExecutorSaturated):
+    """
+    Répond 503 lorsqu'un pool dédié est saturé plutôt que d'empiler les requêtes.
+    """
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Service temporairement surchargé, veuillez réessayer"},
+        headers={"Retry-After": "1"}
+    )
+
+
+@app.exception_handler(ExecutorTimeout)
+async def executor_timeout_handler(request: Request, exc: ExecutorTimeout):
+    """
+    Répond 504 lorsqu'un appel bloquant délégué à un pool dépasse son délai.
+    """
+    return JSONResponse(
+        status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+        content={"detail": "Le service distant n'a pas répondu à temps"}
+    )
+
+
+# Limitation de débit (coût par route, seaux par client et global)
+app.add_middleware(RateLimitMiddleware)
+
+# Nombre et durée des requêtes SQL par requête HTTP, requêtes lentes et N+1
+app.add_middleware(QueryTrackingMiddleware)
+
+# Lecture de ses propres écritures malgré le réplica (cookie par client)
+if settings.database_read_url:
+    app.add_middleware(ReadAfterWriteMiddleware)
+
+# Profilage échantillonné (uniquement si activé et pyinstrument installé)
+if settings.profiling_enabled:
+    if Profiler is None:
+        logger.warning("PROFILING_ENABLED ignoré : pyinstrument n'est pas installé")
+    else:
+        app.add_middleware(ProfilingMiddleware)
+
+# Latence et statut par route (enveloppe la limitation de débit pour compter les 429)
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+
+# Configuration CORS (ajoutée en dernier pour envelopper aussi les réponses 429)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.cors_origins,
@@ -70,10 +219,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Identifiant de requête (X-Request-ID) repris dans tous les journaux
+app.add_middleware(RequestIdMiddleware)
+
+# Traçage (le plus à l'extérieur : le span serveur couvre tous les middlewares)
+if settings.tracing_enabled:
+    app.add_middleware(TracingMiddleware)
+
 # Enregistrement des routers
 app.include_router(auth_router)
+if settings.enable_sso:
+    # Import à la demande : le flux SSO (et msal) n'est chargé que s'il est utilisé
+    from app.routers.sso import router as sso_router
+    app.include_router(sso_router)
 app.include_router(contracts_router)
 app.include_router(tickets_router)
+app.include_router(profiles_router)
 
 
 @app.get("/")
@@ -94,7 +255,8 @@ async def root():
 @app.get("/health")
 async def health_check():
     """
-    Endpoint de santé pour les vérifications de disponibilité.
+    Endpoint de santé historique : répond dès que le processus sert des
+    requêtes, sans vérifier les dépendances (voir /health/ready).
     
     Returns:
         dict: Statut de santé
@@ -103,3 +265,76 @@ async def health_check():
         "status": "healthy",
         "service": settings.app_name
     }
+
+
+@app.get("/health/live")
+@route_cost(0)
+async def liveness_check():
+    """
+    Sonde de vivacité : le processus et sa boucle d'événements répondent.
+    Ne dépend d'aucun service externe, pour qu'une panne de la base ou de
+    Zammad ne provoque pas le redémarrage de tous les workers.
+    
+    Returns:
+        dict: Statut du processus
+    """
+    return {"status": "alive"}
+
+
+@app.get("/health/ready")
+@route_cost(0)
+async def readiness_check():
+    """
+    Sonde de disponibilité : le worker ne reçoit du trafic qu'une fois le
+    préchauffage terminé (ou son budget épuisé) et tant que ses dépendances
+    critiques (`health_critical_dependencies`) répondent. Les vérifications
+    sont mises en cache quelques secondes et partagées entre sondes.
+    
+    Returns:
+        JSONResponse: 200 si prêt (ou dégradé), 503 sinon, avec le résultat
+        des étapes du préchauffage et la latence de chaque dépendance
+    """
+    if not readiness.ready:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "starting", "warmup": readiness.steps}
+        )
+    
+    dependencies = await health_checker.check_all()
+    down = {name for name, result in dependencies.items() if result["status"] != "up"}
+    if down & set(settings.health_critical_dependencies):
+        health_status = "unavailable"
+    else:
+        health_status = "degraded" if down else "ready"
+    return JSONResponse(
+        status_code=(
+            status.HTTP_503_SERVICE_UNAVAILABLE if health_status == "unavailable"
+            else status.HTTP_200_OK
+        ),
+        content={
+            "status": health_status,
+            "dependencies": dependencies,
+            "warmup": readiness.steps
+        }
+    )
+
+
+if settings.metrics_enabled:
+    @app.get("/metrics", include_in_schema=False)
+    @route_cost(0)
+    async def metrics():
+        """
+        Exporte les métriques du processus au format texte Prometheus.
+        
+        Returns:
+            PlainTextResponse: Métriques (format d'exposition 0.0.4)
+        """
+        return PlainTextResponse(
+            REGISTRY.render(),
+            media_type="text/plain; version=0.0.4"
+        )
+
+
+# Durée d'import de l'application (modules, routes, middlewares)
+import_seconds = time.perf_counter() - _import_started
+record_startup("import", import_seconds)
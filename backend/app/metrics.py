@@ -0,0 +1,286 @@
+"""
+Métriques applicatives en mémoire (compteurs, jauges et histogrammes).
+Les noms et conventions suivent le format Prometheus.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Tuple
+
+# Bornes par défaut des histogrammes de latence (en secondes)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Metric:
+    """Base commune des métriques étiquetées."""
+
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        """Construit la clé interne à partir des étiquettes."""
+        return tuple(str(labels.get(label, "")) for label in self.labelnames)
+
+
+class Counter(Metric):
+    """Compteur monotone."""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        """Incrémente le compteur."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> List[Tuple[Tuple[str, ...], float]]:
+        """Retourne les valeurs par jeu d'étiquettes."""
+        with self._lock:
+            return list(self._values.items())
+
+
+class Gauge(Metric):
+    """Valeur instantanée (peut monter ou descendre)."""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        """Fixe la valeur de la jauge."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def samples(self) -> List[Tuple[Tuple[str, ...], float]]:
+        """Retourne les valeurs par jeu d'étiquettes."""
+        with self._lock:
+            return list(self._values.items())
+
+
+class Histogram(Metric):
+    """Histogramme à bornes fixes (cumulatives à l'export)."""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Par jeu d'étiquettes : [compteurs par borne..., +Inf], somme, total
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        """Enregistre une observation."""
+        key = self._key(labels)
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        with self._lock:
+            counts, total = self._values.setdefault(
+                key, ([0] * (len(self.buckets) + 1), [0.0])
+            )
+            counts[index] += 1
+            total[0] += value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Mesure la durée d'un bloc de code."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self) -> List[Tuple[Tuple[str, ...], List[int], float]]:
+        """Retourne (étiquettes, compteurs par borne, somme) par jeu d'étiquettes."""
+        with self._lock:
+            return [
+                (key, list(counts), total[0])
+                for key, (counts, total) in self._values.items()
+            ]
+
+
+class Registry:
+    """Registre des métriques du processus."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, *args, **kwargs) -> Metric:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = cls(name, *args, **kwargs)
+                self._metrics[name] = metric
+            elif not isinstance(metric, cls):
+                raise ValueError(f"La métrique {name} existe déjà avec un autre type")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        """Retourne (ou crée) un compteur."""
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Gauge:
+        """Retourne (ou crée) une jauge."""
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        """
+        Enregistre une fonction appelée avant chaque export, pour mettre à
+        jour les jauges coûteuses ou externes (pool SQL, caches...).
+        """
+        with self._lock:
+            self._collectors.append(collector)
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        """Retourne (ou crée) un histogramme."""
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets)
+
+    def metrics(self) -> List[Metric]:
+        """Liste des métriques enregistrées."""
+        with self._lock:
+            return list(self._metrics.values())
+
+    def render(self) -> str:
+        """
+        Exporte toutes les métriques au format texte Prometheus (0.0.4).
+
+        Returns:
+            str: Corps de la réponse /metrics
+        """
+        with self._lock:
+            collectors = list(self._collectors)
+        for collector in collectors:
+            collector()
+
+        lines: List[str] = []
+        for metric in sorted(self.metrics(), key=lambda m: m.name):
+            lines.append(f"# HELP {metric.name} {_escape_help(metric.documentation)}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            if isinstance(metric, Histogram):
+                for key, counts, total in metric.samples():
+                    cumulative = 0
+                    bounds = [*(_format_value(b) for b in metric.buckets), "+Inf"]
+                    for bound, count in zip(bounds, counts):
+                        cumulative += count
+                        labels = _format_labels(metric.labelnames + ("le",), key + (bound,))
+                        lines.append(f"{metric.name}_bucket{labels} {cumulative}")
+                    labels = _format_labels(metric.labelnames, key)
+                    lines.append(f"{metric.name}_sum{labels} {_format_value(total)}")
+                    lines.append(f"{metric.name}_count{labels} {cumulative}")
+            else:
+                for key, value in metric.samples():
+                    labels = _format_labels(metric.labelnames, key)
+                    lines.append(f"{metric.name}{labels} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        escaped = value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{name}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+# Registre global
+REGISTRY = Registry()
+
+# Métriques partagées entre modules
+upstream_request_seconds = REGISTRY.histogram(
+    "upstream_request_seconds",
+    "Durée des appels aux services externes (Zammad, Graph)",
+    labelnames=("service", "endpoint"),
+)
+upstream_errors_total = REGISTRY.counter(
+    "upstream_errors_total",
+    "Appels aux services externes en erreur",
+    labelnames=("service", "endpoint"),
+)
+cache_requests_total = REGISTRY.counter(
+    "cache_requests_total",
+    "Consultations des caches applicatifs par résultat (hit/miss)",
+    labelnames=("cache", "result"),
+)
+cache_hit_ratio = REGISTRY.gauge(
+    "cache_hit_ratio",
+    "Taux de succès des caches applicatifs depuis le démarrage",
+    labelnames=("cache",),
+)
+
+
+@contextmanager
+def track_upstream(service: str, endpoint: str) -> Iterator[None]:
+    """
+    Mesure un appel à un service externe ; toute exception (y compris
+    `raise_for_status`) est comptée comme une erreur.
+
+    Args:
+        service: Nom du service ("zammad", "graph")
+        endpoint: Endpoint appelé, sans identifiants variables
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        upstream_errors_total.inc(service=service, endpoint=endpoint)
+        raise
+    finally:
+        upstream_request_seconds.observe(
+            time.perf_counter() - start, service=service, endpoint=endpoint
+        )
+
+
+def _collect_cache_ratios() -> None:
+    """Calcule le taux de succès de chaque cache à partir des compteurs."""
+    totals: Dict[str, Dict[str, float]] = {}
+    for (cache, result), value in cache_requests_total.samples():
+        totals.setdefault(cache, {})[result] = value
+    for cache, results in totals.items():
+        requests = results.get("hit", 0) + results.get("miss", 0)
+        if requests:
+            cache_hit_ratio.set(results.get("hit", 0) / requests, cache=cache)
+
+
+REGISTRY.add_collector(_collect_cache_ratios)
@@ -4,5 +4,7 @@ Modèles de données de l'application Cockpit IT.
 from app.models.contract import Contract
 from app.models.ticket import Ticket, TicketCache
 from app.models.user import User
+from app.models.oauth_state import OAuthState
+from app.models.cache_version import CacheVersion
 
-__all__ = ["Contract", "Ticket", "TicketCache", "User"]
+__all__ = ["Contract", "Ticket", "TicketCache", "User", "OAuthState", "CacheVersion"]
@@ -0,0 +1,23 @@
+"""
+Modèle de données pour les versions des caches partagés entre workers.
+"""
+from datetime import datetime
+
+from sqlalchemy import BigInteger, Column, DateTime, String
+from app.database import Base
+
+
+class CacheVersion(Base):
+    """
+    Version d'un cache applicatif (ex. timeline des contrats), incrémentée
+    dans la transaction de chaque écriture qui le rend obsolète. Chaque
+    worker compare sa copie à cette version pour se reconstruire.
+    """
+    __tablename__ = "cache_versions"
+
+    name = Column(String(64), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<CacheVersion(name='{self.name}', version={self.version})>"
@@ -1,12 +1,85 @@
 """
 Modèle de données pour les contrats.
 """
-from sqlalchemy import Column, String, Numeric, Date, Integer, DateTime, Text
+from sqlalchemy import Column, String, Numeric, Date, Integer, BigInteger, DateTime, Text
 from sqlalchemy.dialects.postgresql import UUID
 from datetime import datetime, date, timedelta
+from typing import Dict, List, Optional, Sequence
 from app.database import Base
 import uuid
 
+# Couleurs de la timeline selon l'état du contrat
+COLOR_EXPIRED = "#6B7280"  # Gris
+COLOR_NOTICE_URGENT = "#EF4444"  # Rouge : préavis, 30 jours ou moins avant l'échéance
+COLOR_NOTICE = "#F59E0B"  # Orange
+COLOR_ACTIVE = "#10B981"  # Vert
+
+# Champs calculés exposés par l'API (voir `compute_derived_fields`)
+DERIVED_FIELDS = (
+    "notice_start_date", "days_until_end", "is_in_notice_period", "is_expired",
+    "computed_status", "timeline_color", "annual_cost", "duration_years",
+)
+
+
+def _status_and_color(days_until_end: int, in_notice: bool) -> tuple:
+    if days_until_end < 0:
+        return "expired", COLOR_EXPIRED
+    if in_notice:
+        return "in_notice", COLOR_NOTICE_URGENT if days_until_end <= 30 else COLOR_NOTICE
+    return "active", COLOR_ACTIVE
+
+
+def compute_derived_fields(
+    end_dates: Sequence[date],
+    notice_period_days: Sequence[int],
+    amounts: Sequence,
+    duration_months: Sequence[int],
+    as_of: date
+) -> Dict[str, List]:
+    """
+    Calcule en bloc les champs dérivés d'un ensemble de contrats, colonne par
+    colonne, pour une date d'évaluation unique.
+    
+    Les dates sont traitées en ordinaux (entiers) ; le résultat est identique
+    aux propriétés du modèle évaluées à la date `as_of`.
+    
+    Args:
+        end_dates: Dates de fin
+        notice_period_days: Préavis en jours
+        amounts: Montants totaux
+        duration_months: Durées en mois
+        as_of: Date d'évaluation
+    
+    Returns:
+        Dict[str, List]: Nom du champ (`DERIVED_FIELDS`) -> valeurs, dans
+        l'ordre des contrats
+    """
+    today = as_of.toordinal()
+    end_ordinals = [end_date.toordinal() for end_date in end_dates]
+    notice_ordinals = [end - notice for end, notice in zip(end_ordinals, notice_period_days)]
+    days_until_end = [end - today for end in end_ordinals]
+    in_notice = [
+        notice_start <= today <= end
+        for notice_start, end in zip(notice_ordinals, end_ordinals)
+    ]
+    statuses_and_colors = [
+        _status_and_color(days, notice) for days, notice in zip(days_until_end, in_notice)
+    ]
+    amounts_float = [float(amount) for amount in amounts]
+    return {
+        "notice_start_date": [date.fromordinal(ordinal) for ordinal in notice_ordinals],
+        "days_until_end": days_until_end,
+        "is_in_notice_period": in_notice,
+        "is_expired": [days < 0 for days in days_until_end],
+        "computed_status": [status for status, _ in statuses_and_colors],
+        "timeline_color": [color for _, color in statuses_and_colors],
+        "annual_cost": [
+            amount / (months / 12) if months > 0 else amount
+            for amount, months in zip(amounts_float, duration_months)
+        ],
+        "duration_years": [months / 12 for months in duration_months],
+    }
+
 
 class Contract(Base):
     """
@@ -24,6 +97,11 @@ class Contract(Base):
     end_date = Column(Date, nullable=False, index=True)
     notice_period_days = Column(Integer, nullable=False)
     sharepoint_file_url = Column(Text, nullable=True)
+    # État du document SharePoint, renseigné par le contrôle périodique des liens
+    document_status = Column(String(20), nullable=True, comment="ok, not_found, error ou no_document")
+    document_size = Column(BigInteger, nullable=True)
+    document_etag = Column(String(255), nullable=True)
+    document_checked_at = Column(DateTime, nullable=True)
     status = Column(String(50), default="active", index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -73,6 +151,22 @@ class Contract(Base):
         """
         return date.today() > self.end_date
     
+    def status_and_color(self, as_of: Optional[date] = None) -> tuple:
+        """
+        Statut et couleur de timeline évalués à une même date.
+        
+        Args:
+            as_of: Date d'évaluation (aujourd'hui par défaut)
+        
+        Returns:
+            tuple: ("expired" | "in_notice" | "active", code couleur hexadécimal)
+        """
+        as_of = as_of or date.today()
+        return _status_and_color(
+            (self.end_date - as_of).days,
+            self.notice_start_date <= as_of <= self.end_date
+        )
+    
     @property
     def computed_status(self) -> str:
         """
@@ -81,12 +175,7 @@ class Contract(Base):
         Returns:
             str: "expired", "in_notice", ou "active"
         """
-        if self.is_expired:
-            return "expired"
-        elif self.is_in_notice_period:
-            return "in_notice"
-        else:
-            return "active"
+        return self.status_and_color()[0]
     
     @property
     def timeline_color(self) -> str:
@@ -96,16 +185,7 @@ class Contract(Base):
         Returns:
             str: Code couleur hexadécimal
         """
-        if self.is_expired:
-            return "#6B7280"  # Gris
-        elif self.is_in_notice_period:
-            days_left = self.days_until_end
-            if days_left <= 30:
-                return "#EF4444"  # Rouge
-            else:
-                return "#F59E0B"  # Orange
-        else:
-            return "#10B981"  # Vert
+        return self.status_and_color()[1]
 
     @property
     def annual_cost(self) -> float:
@@ -0,0 +1,20 @@
+"""
+Modèle de données pour les états CSRF du flux SSO.
+"""
+from sqlalchemy import Column, String, DateTime
+from app.database import Base
+
+
+class OAuthState(Base):
+    """
+    État CSRF émis lors de la redirection vers Microsoft Entra ID.
+    Partagé entre workers pour que le callback puisse être traité par
+    n'importe quel processus.
+    """
+    __tablename__ = "oauth_states"
+
+    state = Column(String(128), primary_key=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<OAuthState(expires_at='{self.expires_at}')>"
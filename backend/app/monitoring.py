@@ -0,0 +1,215 @@
+"""
+Instrumentation du service : latence par route, état du pool SQL, des
+pools de threads, retard de la boucle d'événements, durée de démarrage et
+mémoire résidente du worker.
+Les valeurs sont exposées au format Prometheus par l'endpoint /metrics.
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import Callable, Dict, Optional
+
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.concurrency import BoundedExecutor
+from app.database import engine, read_engine, replica_router
+from app.logging_config import debug_sampled
+from app.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+# Route utilisée pour les requêtes ne correspondant à aucune route déclarée
+# (évite une étiquette par URL inconnue)
+UNMATCHED_ROUTE = "unmatched"
+
+_request_seconds = REGISTRY.histogram(
+    "http_request_seconds",
+    "Durée de traitement des requêtes HTTP par route",
+    labelnames=("method", "route"),
+)
+_responses_total = REGISTRY.counter(
+    "http_responses_total",
+    "Réponses HTTP par route et code de statut",
+    labelnames=("method", "route", "status"),
+)
+_db_pool_connections = REGISTRY.gauge(
+    "db_pool_connections",
+    "Connexions du pool SQLAlchemy par état (checked_out, idle, overflow, size)",
+    labelnames=("engine", "state"),
+)
+_replica_lag_seconds = REGISTRY.gauge(
+    "db_replica_lag_seconds",
+    "Dernier retard de réplication mesuré (-1 si inconnu)",
+)
+_executor_pending = REGISTRY.gauge(
+    "executor_pending_tasks",
+    "Tâches en cours ou en attente dans les pools dédiés",
+    labelnames=("executor",),
+)
+_loop_lag_seconds = REGISTRY.gauge(
+    "event_loop_lag_seconds",
+    "Dernier retard mesuré de la boucle d'événements",
+)
+_loop_lag_histogram = REGISTRY.histogram(
+    "event_loop_lag_observed_seconds",
+    "Retards de la boucle d'événements (réveil d'un sleep programmé)",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+_startup_seconds = REGISTRY.gauge(
+    "process_startup_seconds",
+    "Durée de démarrage du worker par phase (import, lifespan)",
+    labelnames=("phase",),
+)
+_resident_memory_bytes = REGISTRY.gauge(
+    "process_resident_memory_bytes",
+    "Mémoire résidente (RSS) du processus",
+)
+
+
+# Gabarits par endpoint, indexés par routeur (id : les routeurs ne sont pas hachables)
+_route_templates: Dict[int, Dict[Callable, str]] = {}
+
+
+def route_template(scope: Scope) -> str:
+    """
+    Retrouve le gabarit de la route servie (ou tentée) par une requête,
+    par exemple `/contracts/{contract_id}`, pour étiqueter sans exploser la
+    cardinalité.
+
+    Args:
+        scope: Scope ASGI de la requête
+
+    Returns:
+        str: Gabarit de route, ou `UNMATCHED_ROUTE`
+    """
+    router = scope["app"].router
+    templates = _route_templates.get(id(router))
+    if templates is None:
+        templates = {
+            route.endpoint: route.path
+            for route in router.routes
+            if getattr(route, "endpoint", None) is not None
+        }
+        _route_templates[id(router)] = templates
+    # Le routeur Starlette renseigne l'endpoint dans le scope partagé
+    endpoint = scope.get("endpoint")
+    if endpoint is not None and endpoint in templates:
+        return templates[endpoint]
+    # Requête pas encore (ou pas) routée : 429, 404...
+    for route in router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", UNMATCHED_ROUTE)
+    return UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI mesurant la durée et le statut de chaque requête,
+    étiquetés par gabarit de route (`/contracts/{contract_id}`) et non par URL.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            route = route_template(scope)
+            method = scope["method"]
+            _request_seconds.observe(duration, method=method, route=route)
+            _responses_total.inc(method=method, route=route, status=str(status_code))
+            debug_sampled(
+                logger, "%s %s -> %d (%.1f ms)", method, route, status_code, duration * 1000
+            )
+
+
+def _collect_database() -> None:
+    """Relève l'état des pools de connexions au moment de l'export."""
+    engines = {"primary": engine}
+    if read_engine is not None:
+        engines["replica"] = read_engine
+    for name, db_engine in engines.items():
+        pool = db_engine.pool
+        # Les pools sans file (SQLite, NullPool) n'exposent pas ces compteurs
+        if not hasattr(pool, "checkedout"):
+            continue
+        _db_pool_connections.set(pool.checkedout(), engine=name, state="checked_out")
+        _db_pool_connections.set(pool.checkedin(), engine=name, state="idle")
+        _db_pool_connections.set(max(pool.overflow(), 0), engine=name, state="overflow")
+        _db_pool_connections.set(pool.size(), engine=name, state="size")
+    lag = replica_router.last_lag
+    _replica_lag_seconds.set(-1 if lag is None else lag)
+
+
+def _collect_executors() -> None:
+    """Relève le nombre de tâches en cours dans chaque pool dédié."""
+    for executor in BoundedExecutor.instances():
+        _executor_pending.set(executor.pending, executor=executor.name)
+
+
+def resident_memory_bytes() -> Optional[int]:
+    """Mémoire résidente du processus (Linux, None ailleurs)."""
+    try:
+        with open("/proc/self/statm", encoding="ascii") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def record_startup(phase: str, seconds: float) -> None:
+    """
+    Enregistre la durée d'une phase du démarrage.
+
+    Args:
+        phase: Phase mesurée (import, lifespan)
+        seconds: Durée en secondes
+    """
+    _startup_seconds.set(seconds, phase=phase)
+
+
+def _collect_process() -> None:
+    """Relève la mémoire résidente du processus."""
+    rss = resident_memory_bytes()
+    if rss is not None:
+        _resident_memory_bytes.set(rss)
+
+
+REGISTRY.add_collector(_collect_database)
+REGISTRY.add_collector(_collect_executors)
+REGISTRY.add_collector(_collect_process)
+
+
+async def run_event_loop_lag_monitor(interval: float) -> None:
+    """
+    Mesure en continu le retard de la boucle d'événements : l'écart entre
+    l'heure de réveil prévue d'un `sleep` et son réveil effectif révèle le
+    code bloquant exécuté dans la boucle.
+
+    Args:
+        interval: Période de mesure en secondes
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        lag = max(loop.time() - expected, 0.0)
+        _loop_lag_seconds.set(lag)
+        _loop_lag_histogram.observe(lag)
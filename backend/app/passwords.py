@@ -0,0 +1,48 @@
+"""
+Hachage et vérification des mots de passe hors de la boucle d'événements.
+bcrypt coûte plusieurs centaines de millisecondes par appel : il est
+exécuté dans un pool borné dédié.
+"""
+from app.concurrency import BoundedExecutor
+from app.config import settings
+from app.models.user import User
+
+# Pool dédié au hachage (bcrypt libère le GIL, des threads suffisent)
+password_executor = BoundedExecutor(
+    "password_hashing",
+    max_workers=settings.password_hash_workers,
+    max_pending=settings.password_hash_max_pending
+)
+
+
+async def hash_password(password: str) -> str:
+    """
+    Hache un mot de passe dans le pool dédié.
+
+    Args:
+        password: Mot de passe en clair
+
+    Returns:
+        str: Mot de passe haché
+
+    Raises:
+        ExecutorSaturated: Si trop de hachages sont déjà en attente
+    """
+    return await password_executor.run(User.hash_password, password, operation="hash")
+
+
+async def verify_password(user: User, plain_password: str) -> bool:
+    """
+    Vérifie le mot de passe d'un utilisateur dans le pool dédié.
+
+    Args:
+        user: Utilisateur
+        plain_password: Mot de passe en clair
+
+    Returns:
+        bool: True si le mot de passe est correct
+
+    Raises:
+        ExecutorSaturated: Si trop de vérifications sont déjà en attente
+    """
+    return await password_executor.run(user.verify_password, plain_password, operation="verify")
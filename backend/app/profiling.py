@@ -0,0 +1,186 @@
+"""
+Profilage statistique de requêtes en production (optionnel).
+
+Une fraction des requêtes (`profiling_sample_rate`), ou celles d'un
+administrateur authentifié portant l'en-tête `X-Profile-Token` attendu, est
+profilée avec pyinstrument en mode asynchrone (les `await` sont attribués à
+la requête). Le rendu HTML (flame graph) est produit hors de la boucle
+d'événements et conservé dans `profiling_dir`, limité à
+`profiling_max_files` fichiers. Les requêtes non échantillonnées ne sont
+pas instrumentées.
+"""
+import hmac
+import logging
+import os
+import random
+import re
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.auth import authenticate_token
+from app.config import settings
+from app.database import SessionLocal
+from app.metrics import REGISTRY
+from app.monitoring import route_template
+
+try:
+    from pyinstrument import Profiler
+except ImportError:  # Dépendance optionnelle
+    Profiler = None
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "x-profile-token"
+PROFILE_SUFFIX = ".html"
+
+_profiles_total = REGISTRY.counter(
+    "profiles_captured_total",
+    "Profils de requêtes enregistrés, par déclencheur (sample/header)",
+    labelnames=("trigger",),
+)
+
+_UNSAFE_CHARS = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+def profile_file_name(method: str, route: str, duration: float) -> str:
+    """
+    Nom du fichier d'un profil : horodatage, méthode, route et durée.
+
+    Args:
+        method: Méthode HTTP
+        route: Gabarit de route
+        duration: Durée de la requête en secondes
+
+    Returns:
+        str: Nom de fichier sans caractère de chemin
+    """
+    timestamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+    route_part = _UNSAFE_CHARS.sub("_", route).strip("_") or "root"
+    return f"{timestamp}-{method}-{route_part}-{int(duration * 1000)}ms{PROFILE_SUFFIX}"
+
+
+def list_profiles(directory: str) -> List[Dict]:
+    """
+    Liste les profils conservés, du plus récent au plus ancien.
+
+    Args:
+        directory: Répertoire des profils
+
+    Returns:
+        List[Dict]: Nom, taille et date de création de chaque profil
+    """
+    if not os.path.isdir(directory):
+        return []
+    profiles = []
+    for entry in os.scandir(directory):
+        if entry.is_file() and entry.name.endswith(PROFILE_SUFFIX):
+            stat = entry.stat()
+            profiles.append({
+                "name": entry.name,
+                "size": stat.st_size,
+                "created_at": datetime.utcfromtimestamp(stat.st_mtime),
+            })
+    profiles.sort(key=lambda profile: profile["created_at"], reverse=True)
+    return profiles
+
+
+def _is_admin_token(token: str) -> bool:
+    """Indique si un token JWT appartient à un administrateur actif (base, hors boucle)."""
+    db = SessionLocal()
+    try:
+        return authenticate_token(token, db).is_admin
+    except HTTPException:
+        return False
+    finally:
+        db.close()
+
+
+def _render_and_store(profiler, directory: str, name: str, max_files: int) -> None:
+    """Produit le rendu HTML d'un profil puis l'enregistre (pool de threads)."""
+    _store_profile(directory, name, profiler.output_html(), max_files)
+
+
+def _store_profile(directory: str, name: str, html: str, max_files: int) -> None:
+    """Écrit un profil puis supprime les plus anciens au-delà de `max_files`."""
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = os.path.join(directory, f".{name}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as profile_file:
+        profile_file.write(html)
+    os.replace(tmp_path, os.path.join(directory, name))
+
+    for profile in list_profiles(directory)[max_files:]:
+        try:
+            os.unlink(os.path.join(directory, profile["name"]))
+        except FileNotFoundError:
+            pass
+
+
+class ProfilingMiddleware:
+    """
+    Middleware ASGI de profilage échantillonné.
+    Un seul profil est capturé à la fois par processus : une requête
+    échantillonnée pendant une capture en cours n'est pas profilée.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._active = False
+
+    async def _trigger(self, scope: Scope) -> Optional[str]:
+        """
+        Indique si la requête doit être profilée, et pourquoi. Le
+        déclenchement par en-tête exige, en plus du jeton partagé, le token
+        Bearer d'un administrateur.
+        """
+        token = settings.profiling_token
+        if token:
+            headers = Headers(scope=scope)
+            supplied = headers.get(PROFILE_HEADER)
+            if supplied and hmac.compare_digest(supplied.encode(), token.encode()):
+                scheme, _, bearer = headers.get("authorization", "").partition(" ")
+                if scheme.lower() == "bearer" and bearer and await run_in_threadpool(_is_admin_token, bearer):
+                    return "header"
+        rate = settings.profiling_sample_rate
+        if rate > 0 and random.random() < rate:
+            return "sample"
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or Profiler is None or self._active:
+            await self.app(scope, receive, send)
+            return
+
+        trigger = await self._trigger(scope)
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+
+        self._active = True
+        profiler = Profiler(interval=settings.profiling_interval_seconds, async_mode="enabled")
+        start = time.perf_counter()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            profiler.stop()
+            self._active = False
+            name = profile_file_name(
+                scope["method"], route_template(scope), time.perf_counter() - start
+            )
+            try:
+                await run_in_threadpool(
+                    _render_and_store,
+                    profiler,
+                    settings.profiling_dir,
+                    name,
+                    settings.profiling_max_files
+                )
+                _profiles_total.inc(trigger=trigger)
+            except OSError as e:
+                logger.warning("Impossible d'enregistrer le profil %s : %s", name, e)
@@ -0,0 +1,176 @@
+"""
+Comptabilité des requêtes SQL par requête HTTP.
+
+Des événements SQLAlchemy (tous moteurs) mesurent chaque requête SQL ; le
+middleware rattache ces mesures à la requête HTTP en cours via une
+variable de contexte, journalise les requêtes lentes avec leur route et
+signale les motifs N+1 (même instruction répétée dans une même requête).
+"""
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+from app.metrics import REGISTRY
+from app.monitoring import route_template
+
+logger = logging.getLogger(__name__)
+
+_query_seconds = REGISTRY.histogram(
+    "db_query_seconds",
+    "Durée des requêtes SQL",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0),
+)
+_slow_queries_total = REGISTRY.counter(
+    "db_slow_queries_total",
+    "Requêtes SQL dépassant le seuil de lenteur, par route",
+    labelnames=("route",),
+)
+_n_plus_one_total = REGISTRY.counter(
+    "db_n_plus_one_total",
+    "Requêtes HTTP présentant une instruction SQL répétée (N+1), par route",
+    labelnames=("route",),
+)
+
+# Longueur maximale des instructions SQL reproduites dans les journaux
+_MAX_LOGGED_STATEMENT = 500
+
+
+class QueryStats:
+    """Requêtes SQL exécutées pendant une requête HTTP."""
+
+    def __init__(self, scope: Scope):
+        self.scope = scope
+        self.count = 0
+        self.total_seconds = 0.0
+        self.statements: Dict[str, int] = {}
+        # Les dépendances synchrones s'exécutent dans le pool de threads
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, duration: float) -> None:
+        """Ajoute une requête SQL exécutée."""
+        with self._lock:
+            self.count += 1
+            self.total_seconds += duration
+            self.statements[statement] = self.statements.get(statement, 0) + 1
+
+    @property
+    def route(self) -> str:
+        """Route de la requête HTTP (gabarit)."""
+        return route_template(self.scope)
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    """Mesures SQL de la requête HTTP en cours (None hors requête)."""
+    return _current_stats.get()
+
+
+def _shorten(statement: str) -> str:
+    statement = " ".join(statement.split())
+    if len(statement) > _MAX_LOGGED_STATEMENT:
+        return statement[:_MAX_LOGGED_STATEMENT] + "…"
+    return statement
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+    if context is not None:
+        context.query_timing_started = True
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - conn.info["query_start_time"].pop()
+    _query_seconds.observe(duration)
+
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, duration)
+
+    if duration * 1000 >= settings.sql_slow_query_ms:
+        route = stats.route if stats is not None else "hors requête"
+        _slow_queries_total.inc(route=route)
+        logger.warning(
+            "Requête SQL lente (%.1f ms) sur %s : %s",
+            duration * 1000, route, _shorten(statement)
+        )
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    """
+    Instruction en échec : `after_cursor_execute` n'est pas appelé, l'heure
+    de début est retirée pour ne pas fausser les mesures suivantes de la
+    connexion (remise dans le pool).
+    """
+    context = exception_context.execution_context
+    conn = exception_context.connection
+    if conn is None or not getattr(context, "query_timing_started", False):
+        return  # Échec avant l'exécution (connexion, compilation)
+    start_times = conn.info.get("query_start_time")
+    if start_times:
+        start_times.pop()
+
+
+class QueryTrackingMiddleware:
+    """
+    Middleware ASGI comptant les requêtes SQL de chaque requête HTTP.
+    En mode debug, le nombre et la durée cumulée sont renvoyés dans les
+    en-têtes `X-DB-Query-Count` et `X-DB-Query-Time-Ms`.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(scope)
+        token = _current_stats.set(stats)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and settings.debug:
+                headers = MutableHeaders(scope=message)
+                headers["X-DB-Query-Count"] = str(stats.count)
+                headers["X-DB-Query-Time-Ms"] = f"{stats.total_seconds * 1000:.1f}"
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_stats.reset(token)
+            self._check_repeated_statements(stats)
+
+    @staticmethod
+    def _check_repeated_statements(stats: QueryStats) -> None:
+        """Signale les instructions répétées au-delà du seuil N+1."""
+        threshold = settings.sql_n_plus_one_threshold
+        if threshold <= 0:
+            return
+        repeated = [
+            (statement, count)
+            for statement, count in stats.statements.items()
+            if count >= threshold
+        ]
+        if not repeated:
+            return
+        route = stats.route
+        _n_plus_one_total.inc(route=route)
+        for statement, count in repeated:
+            logger.warning(
+                "N+1 probable sur %s : instruction exécutée %d fois : %s",
+                route, count, _shorten(statement)
+            )
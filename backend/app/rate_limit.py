@@ -0,0 +1,204 @@
+"""
+Limitation de débit pondérée par le coût des routes.
+
+Chaque route peut déclarer un coût (décorateur `route_cost`) ; le middleware
+débite ce coût d'un seau à jetons par client et, s'il est activé, d'un seau
+global, et répond 429 avec `Retry-After` lorsque l'un des deux est vide.
+
+Le client est identifié par son adresse IP (`scope["client"]`), réécrite
+par uvicorn à partir de `X-Forwarded-For` lorsque la connexion provient
+d'un reverse proxy de confiance (`server_forwarded_allow_ips`).
+"""
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Optional, Tuple
+
+from starlette.responses import JSONResponse
+from starlette.routing import Match
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.config import settings
+from app.metrics import REGISTRY
+
+_rejected_total = REGISTRY.counter(
+    "rate_limit_rejected_total",
+    "Requêtes refusées par la limitation de débit",
+    labelnames=("scope",),
+)
+
+GLOBAL_KEY = "__global__"
+
+# Nombre maximal de chemins dont le coût est gardé en cache
+_ROUTE_COST_CACHE_SIZE = 1024
+
+
+def route_cost(cost: float) -> Callable:
+    """
+    Déclare le coût d'une route pour la limitation de débit.
+
+    Args:
+        cost: Nombre de jetons consommés par appel
+
+    Returns:
+        Callable: Décorateur à appliquer sous le décorateur de route
+    """
+    def decorator(endpoint: Callable) -> Callable:
+        endpoint.__rate_limit_cost__ = cost
+        return endpoint
+    return decorator
+
+
+class RateLimitBackend(ABC):
+    """
+    Stockage des seaux à jetons.
+    Implémenter cette interface pour partager les seaux entre workers
+    (Redis, PostgreSQL...).
+    """
+
+    @abstractmethod
+    def consume(self, key: str, cost: float, capacity: float, refill_rate: float) -> float:
+        """
+        Tente de consommer `cost` jetons dans le seau `key`.
+
+        Args:
+            key: Identifiant du seau
+            cost: Jetons à consommer
+            capacity: Capacité maximale du seau
+            refill_rate: Jetons regagnés par seconde
+
+        Returns:
+            float: 0 si accepté, sinon délai d'attente en secondes
+        """
+
+    def refund(self, key: str, cost: float, capacity: float) -> None:
+        """Rend des jetons consommés (requête finalement refusée ailleurs)."""
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """Seaux à jetons en mémoire, propres au processus."""
+
+    def __init__(self, max_keys: int = 10000):
+        self.max_keys = max_keys
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def consume(self, key: str, cost: float, capacity: float, refill_rate: float) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated_at) * refill_rate)
+
+            if tokens >= cost:
+                self._store(key, tokens - cost, now)
+                return 0.0
+
+            self._store(key, tokens, now)
+            if refill_rate <= 0 or cost > capacity:
+                return math.inf
+            return (cost - tokens) / refill_rate
+
+    def refund(self, key: str, cost: float, capacity: float) -> None:
+        with self._lock:
+            if key in self._buckets:
+                tokens, updated_at = self._buckets[key]
+                self._buckets[key] = (min(capacity, tokens + cost), updated_at)
+
+    def _store(self, key: str, tokens: float, now: float) -> None:
+        if key not in self._buckets and len(self._buckets) >= self.max_keys:
+            # Éviction du seau le plus ancien (ordre d'insertion)
+            self._buckets.pop(next(iter(self._buckets)))
+        self._buckets.pop(key, None)
+        self._buckets[key] = (tokens, now)
+
+
+class RateLimitMiddleware:
+    """
+    Middleware ASGI de limitation de débit par coût de route.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        backend: Optional[RateLimitBackend] = None,
+        default_cost: float = 1.0
+    ):
+        self.app = app
+        self.backend = backend or InMemoryRateLimitBackend()
+        self.default_cost = default_cost
+        self._route_costs: Dict[Tuple[str, str], float] = {}
+
+    def _route_cost(self, scope: Scope) -> float:
+        """
+        Retrouve le coût déclaré par la route correspondant à la requête,
+        mis en cache par méthode et chemin (les routes ne changent pas).
+        """
+        key = (scope["method"], scope["path"])
+        cost = self._route_costs.get(key)
+        if cost is not None:
+            return cost
+
+        cost = self.default_cost
+        for route in scope["app"].router.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                endpoint = getattr(route, "endpoint", None)
+                cost = getattr(endpoint, "__rate_limit_cost__", self.default_cost)
+                break
+
+        if len(self._route_costs) >= _ROUTE_COST_CACHE_SIZE:
+            # Éviction de l'entrée la plus ancienne (ordre d'insertion)
+            self._route_costs.pop(next(iter(self._route_costs)))
+        self._route_costs[key] = cost
+        return cost
+
+    @staticmethod
+    def _client_key(scope: Scope) -> str:
+        client = scope.get("client")
+        return f"client:{client[0] if client else 'unknown'}"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.rate_limit_enabled:
+            await self.app(scope, receive, send)
+            return
+
+        cost = self._route_cost(scope)
+        if cost <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        retry_after = self.backend.consume(
+            self._client_key(scope),
+            cost,
+            settings.rate_limit_client_capacity,
+            settings.rate_limit_client_refill_per_second
+        )
+        limited_scope = "client"
+
+        if not retry_after and settings.rate_limit_global_enabled:
+            retry_after = self.backend.consume(
+                GLOBAL_KEY,
+                cost,
+                settings.rate_limit_global_capacity,
+                settings.rate_limit_global_refill_per_second
+            )
+            limited_scope = "global"
+            if retry_after:
+                # Le client n'est pas responsable de la saturation globale
+                self.backend.refund(
+                    self._client_key(scope), cost, settings.rate_limit_client_capacity
+                )
+
+        if retry_after:
+            _rejected_total.inc(scope=limited_scope)
+            seconds = 60 if math.isinf(retry_after) else max(1, math.ceil(retry_after))
+            response = JSONResponse(
+                status_code=429,
+                content={"detail": "Trop de requêtes, veuillez réessayer plus tard"},
+                headers={"Retry-After": str(seconds)}
+            )
+            await response(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send)
@@ -4,5 +4,6 @@ Routers de l'application Cockpit IT.
 from app.routers.contracts import router as contracts_router
 from app.routers.tickets import router as tickets_router
 from app.routers.auth import router as auth_router
+from app.routers.profiles import router as profiles_router
 
-__all__ = ["contracts_router", "tickets_router", "auth_router"]
+__all__ = ["contracts_router", "tickets_router", "auth_router", "profiles_router"]
@@ -1,21 +1,22 @@
 """
-Router pour l'authentification (locale et SSO avec Microsoft Entra ID).
+Router pour l'authentification locale.
+Le flux SSO (Microsoft Entra ID) est dans app.routers.sso, chargé
+uniquement si `enable_sso` est actif.
 """
-from fastapi import APIRouter, HTTPException, status, Query, Response, Depends
-from fastapi.responses import RedirectResponse
+from fastapi import APIRouter, HTTPException, status, Response, Depends
 from fastapi.security import OAuth2PasswordRequestForm
 from pydantic import BaseModel, EmailStr
-from typing import Dict
 from uuid import UUID
-from datetime import datetime, timedelta
+from datetime import datetime
 from sqlalchemy.orm import Session
-import secrets
 
-from app.services.graph_service import GraphService
 from app.config import settings
 from app.database import get_db
 from app.models.user import User
-from app.auth import create_access_token, get_current_user
+from app.auth import Principal, create_access_token, get_current_principal
+from app.passwords import hash_password, verify_password
+from app.rate_limit import route_cost
+from app.tracing import TracedRoute
 
 
 # Schémas Pydantic pour l'authentification locale
@@ -48,51 +49,14 @@ class LoginResponse(BaseModel):
     user: UserResponse
 
 
-# Schémas Pydantic pour SSO
-class UserInfo(BaseModel):
-    """Informations utilisateur."""
-    id: str
-    display_name: str
-    email: str
-    job_title: str | None = None
-
-
-class TokenResponse(BaseModel):
-    """Réponse contenant le token d'accès."""
-    access_token: str
-    token_type: str = "bearer"
-    expires_in: int
-    refresh_token: str | None = None
-
-
 # Router
-router = APIRouter(prefix="/auth", tags=["authentication"])
-
-
-def get_graph_service() -> GraphService:
-    """Dépendance pour obtenir le service Graph."""
-    return GraphService()
-
-
-# Stockage temporaire des états CSRF (en production, utiliser Redis ou une base de données)
-_csrf_states: Dict[str, datetime] = {}
-_csrf_state_ttl = timedelta(minutes=10)
-
-
-def _cleanup_csrf_states() -> None:
-    """Nettoie les états CSRF expirés."""
-    now = datetime.utcnow()
-    expired_states = [
-        state for state, created_at in _csrf_states.items()
-        if now - created_at > _csrf_state_ttl
-    ]
-    for state in expired_states:
-        _csrf_states.pop(state, None)
+router = APIRouter(prefix="/auth", tags=["authentication"], route_class=TracedRoute)
 
 
 # ========== AUTHENTIFICATION LOCALE ==========
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
+@route_cost(10)
 async def register_user(user_data: UserCreate, db: Session = Depends(get_db)):
     """
     Crée un nouvel utilisateur (authentification locale).
@@ -140,7 +104,7 @@ async def register_user(user_data: UserCreate, db: Session = Depends(get_db)):
     user = User(
         username=user_data.username,
         email=user_data.email,
-        hashed_password=User.hash_password(user_data.password),
+        hashed_password=await hash_password(user_data.password),
         full_name=user_data.full_name,
         is_admin=False
     )
@@ -153,6 +117,7 @@ async def register_user(user_data: UserCreate, db: Session = Depends(get_db)):
 
 
 @router.post("/login/local", response_model=LoginResponse)
+@route_cost(10)
 async def login_local(
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db)
@@ -179,7 +144,7 @@ async def login_local(
     # Rechercher l'utilisateur
     user = db.query(User).filter(User.username == form_data.username).first()
     
-    if not user or not user.verify_password(form_data.password):
+    if not user or not await verify_password(user, form_data.password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Identifiants incorrects",
@@ -198,7 +163,13 @@ async def login_local(
     
     # Créer le token JWT
     access_token = create_access_token(
-        data={"sub": user.username, "email": user.email, "is_admin": user.is_admin}
+        data={
+            "sub": user.username,
+            "uid": str(user.id),
+            "email": user.email,
+            "name": user.full_name,
+            "is_admin": user.is_admin
+        }
     )
     
     return LoginResponse(
@@ -208,7 +179,7 @@ async def login_local(
 
 
 @router.get("/profile", response_model=UserResponse)
-async def get_profile(current_user: User = Depends(get_current_user)):
+async def get_profile(current_user: Principal = Depends(get_current_principal)):
     """
     Récupère le profil de l'utilisateur connecté.
     
@@ -219,158 +190,3 @@ async def get_profile(current_user: User = Depends(get_current_user)):
         UserResponse: Profil utilisateur
     """
     return current_user
-
-
-# ========== AUTHENTIFICATION SSO (MICROSOFT ENTRA ID) ==========
-
-@router.get("/login")
-async def login(graph: GraphService = Depends(get_graph_service)):
-    """
-    Initie le flux d'authentification SSO.
-    Redirige l'utilisateur vers Microsoft Entra ID.
-    
-    Args:
-        graph: Service Graph
-    
-    Returns:
-        RedirectResponse: Redirection vers la page de connexion Microsoft
-    """
-    # Nettoyage des états expirés
-    _cleanup_csrf_states()
-
-    # Génération d'un état CSRF pour sécuriser le callback
-    state = secrets.token_urlsafe(32)
-    _csrf_states[state] = datetime.utcnow()
-    
-    # Génération de l'URL d'authentification
-    auth_url = graph.get_auth_url(state=state)
-    
-    return RedirectResponse(url=auth_url)
-
-
-@router.get("/callback")
-async def auth_callback(
-    code: str = Query(..., description="Code d'autorisation"),
-    state: str = Query(..., description="État CSRF"),
-    graph: GraphService = Depends(get_graph_service)
-):
-    """
-    Callback OAuth après authentification.
-    Échange le code d'autorisation contre un token d'accès.
-    
-    Args:
-        code: Code d'autorisation reçu de Microsoft
-        state: État CSRF pour validation
-        graph: Service Graph
-    
-    Returns:
-        TokenResponse: Token d'accès et informations
-    
-    Raises:
-        HTTPException: En cas d'erreur d'authentification
-    """
-    # Nettoyage des états expirés
-    _cleanup_csrf_states()
-
-    # Validation de l'état CSRF
-    created_at = _csrf_states.get(state)
-    if not created_at:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="État CSRF invalide"
-        )
-
-    if datetime.utcnow() - created_at > _csrf_state_ttl:
-        _csrf_states.pop(state, None)
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="État CSRF expiré"
-        )
-    
-    # Suppression de l'état utilisé
-    _csrf_states.pop(state, None)
-    
-    try:
-        # Échange du code contre un token
-        token_data = await graph.authenticate_user(code)
-        
-        return TokenResponse(
-            access_token=token_data["access_token"],
-            expires_in=token_data.get("expires_in", 3600),
-            refresh_token=token_data.get("refresh_token")
-        )
-    
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail=f"Erreur d'authentification: {str(e)}"
-        )
-
-
-@router.get("/me", response_model=UserInfo)
-async def get_current_user(
-    access_token: str = Query(..., description="Token d'accès Microsoft"),
-    graph: GraphService = Depends(get_graph_service)
-):
-    """
-    Récupère les informations de l'utilisateur connecté.
-    
-    Args:
-        access_token: Token d'accès Microsoft
-        graph: Service Graph
-    
-    Returns:
-        UserInfo: Informations utilisateur
-    
-    Raises:
-        HTTPException: En cas d'erreur
-    """
-    try:
-        user_data = await graph.get_user_info(access_token)
-        
-        return UserInfo(
-            id=user_data["id"],
-            display_name=user_data.get("displayName", ""),
-            email=user_data.get("mail", user_data.get("userPrincipalName", "")),
-            job_title=user_data.get("jobTitle")
-        )
-    
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail=f"Erreur lors de la récupération des informations utilisateur: {str(e)}"
-        )
-
-
-@router.post("/refresh")
-async def refresh_access_token(
-    refresh_token: str = Query(..., description="Token de rafraîchissement"),
-    graph: GraphService = Depends(get_graph_service)
-):
-    """
-    Rafraîchit le token d'accès.
-    
-    Args:
-        refresh_token: Token de rafraîchissement
-        graph: Service Graph
-    
-    Returns:
-        TokenResponse: Nouveau token d'accès
-    
-    Raises:
-        HTTPException: En cas d'erreur
-    """
-    try:
-        token_data = graph.refresh_token(refresh_token)
-        
-        return TokenResponse(
-            access_token=token_data["access_token"],
-            expires_in=token_data.get("expires_in", 3600),
-            refresh_token=token_data.get("refresh_token")
-        )
-    
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail=f"Erreur lors du rafraîchissement du token: {str(e)}"
-        )
@@ -1,15 +1,61 @@
 """
 Router pour la gestion des contrats (CRUD).
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
-from datetime import date
+from starlette.background import BackgroundTask
+from typing import AsyncIterator, BinaryIO, Dict, List, Sequence, Tuple
+from datetime import date, datetime
 from uuid import UUID
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter, field_validator
+import anyio
+import httpx
+from starlette.concurrency import run_in_threadpool
 
-from app.database import get_db
-from app.models.contract import Contract
+from app.auth import Principal, get_current_user
+from app.config import settings
+from app.database import get_db, get_read_db
+from app.models.contract import DERIVED_FIELDS, Contract, compute_derived_fields
+from app.rate_limit import route_cost
+from app.services.document_cache import DocumentCache, DocumentMetadata, get_document_cache
+from app.services.graph_service import (
+    GraphAuthError,
+    GraphService,
+    SharePointUrlError,
+    get_graph_service,
+    is_site_file_url,
+)
+from app.services.timeline_snapshot import (
+    TIMELINE_CACHE_NAME,
+    TimelineSnapshotStore,
+    bump_cache_version,
+)
+from app.tracing import TracedRoute
+
+# En-têtes de la réponse SharePoint relayés au client
+_DOCUMENT_PROXY_HEADERS = (
+    "content-type",
+    "content-length",
+    "content-range",
+    "content-encoding",
+    "content-disposition",
+    "accept-ranges",
+    "etag",
+    "last-modified",
+)
+
+
+def _validate_sharepoint_file_url(value: str | None) -> str | None:
+    """
+    Refuse les URLs de document hors du site SharePoint configuré : elles
+    sont ensuite lues avec le token applicatif, valable sur tout le tenant.
+    """
+    if not value:
+        return None
+    if not is_site_file_url(value):
+        raise ValueError("L'URL du document doit appartenir au site SharePoint configuré")
+    return value
 
 
 # Schémas Pydantic pour les requêtes/réponses
@@ -24,6 +70,8 @@ class ContractCreate(BaseModel):
     notice_period_days: int = Field(..., ge=0)
     sharepoint_file_url: str | None = None
 
+    _check_sharepoint_file_url = field_validator("sharepoint_file_url")(_validate_sharepoint_file_url)
+
 
 class ContractUpdate(BaseModel):
     """Schéma pour la mise à jour d'un contrat."""
@@ -37,6 +85,8 @@ class ContractUpdate(BaseModel):
     sharepoint_file_url: str | None = None
     status: str | None = None
 
+    _check_sharepoint_file_url = field_validator("sharepoint_file_url")(_validate_sharepoint_file_url)
+
 
 class ContractResponse(BaseModel):
     """Schéma de réponse pour un contrat."""
@@ -58,11 +108,23 @@ class ContractResponse(BaseModel):
     timeline_color: str
     annual_cost: float
     duration_years: float
+    document_status: str | None = None
+    document_size: int | None = None
+    document_checked_at: datetime | None = None
 
     class Config:
         from_attributes = True
 
 
+class DocumentStatus(BaseModel):
+    """État du document SharePoint d'un contrat."""
+    contract_id: UUID
+    status: str  # "ok", "not_found", "error" ou "no_document"
+    size: int | None = None
+    etag: str | None = None
+    last_modified: datetime | None = None
+
+
 class TimelineItem(BaseModel):
     """Élément pour la timeline."""
     id: str
@@ -76,7 +138,57 @@ class TimelineItem(BaseModel):
 
 
 # Router
-router = APIRouter(prefix="/contracts", tags=["contracts"])
+router = APIRouter(prefix="/contracts", tags=["contracts"], route_class=TracedRoute)
+
+# Colonnes de la table reprises telles quelles dans ContractResponse
+_RESPONSE_COLUMNS = tuple(
+    column for column in Contract.__table__.columns
+    if column.name in ContractResponse.model_fields
+)
+
+
+def get_as_of(
+    as_of: date | None = Query(
+        default=None,
+        description="Date d'évaluation des champs calculés (par défaut : aujourd'hui), pour les simulations"
+    )
+) -> date:
+    """
+    Dépendance : date d'évaluation de la requête, fixée une seule fois pour
+    que tous les contrats d'une réponse soient évalués au même jour.
+    """
+    return as_of or date.today()
+
+
+def contract_responses(contracts: Sequence, as_of: date) -> List[Dict]:
+    """
+    Construit les réponses de plusieurs contrats : colonnes de la table et
+    champs dérivés calculés en bloc (`compute_derived_fields`) à la date
+    `as_of`.
+    
+    Args:
+        contracts: Contrats (modèles ou lignes portant les colonnes de la table)
+        as_of: Date d'évaluation
+    
+    Returns:
+        List[Dict]: Données des réponses, dans l'ordre des contrats
+    """
+    derived = compute_derived_fields(
+        [contract.end_date for contract in contracts],
+        [contract.notice_period_days for contract in contracts],
+        [contract.amount for contract in contracts],
+        [contract.duration_months for contract in contracts],
+        as_of
+    )
+    derived_columns = [derived[name] for name in DERIVED_FIELDS]
+    names = [column.name for column in _RESPONSE_COLUMNS]
+    return [
+        {
+            **{name: getattr(contract, name) for name in names},
+            **dict(zip(DERIVED_FIELDS, values)),
+        }
+        for contract, values in zip(contracts, zip(*derived_columns))
+    ]
 
 
 @router.get("/", response_model=List[ContractResponse])
@@ -84,7 +196,8 @@ async def list_contracts(
     skip: int = 0,
     limit: int = 100,
     status_filter: str | None = None,
-    db: Session = Depends(get_db)
+    as_of: date = Depends(get_as_of),
+    db: Session = Depends(get_read_db)
 ):
     """
     Liste tous les contrats avec pagination optionnelle.
@@ -93,27 +206,34 @@ async def list_contracts(
         skip: Nombre d'éléments à sauter
         limit: Nombre maximum d'éléments à retourner
         status_filter: Filtre optionnel par statut
+        as_of: Date d'évaluation des champs calculés
         db: Session de base de données
     
     Returns:
         List[ContractResponse]: Liste des contrats
     """
-    query = db.query(Contract)
+    # Lignes de colonnes plutôt que des modèles : pas de carte d'identité
+    query = db.query(*_RESPONSE_COLUMNS)
     
     if status_filter:
         query = query.filter(Contract.status == status_filter)
     
-    contracts = query.offset(skip).limit(limit).all()
-    return contracts
+    rows = query.offset(skip).limit(limit).all()
+    return contract_responses(rows, as_of)
 
 
 @router.get("/{contract_id}", response_model=ContractResponse)
-async def get_contract(contract_id: UUID, db: Session = Depends(get_db)):
+async def get_contract(
+    contract_id: UUID,
+    as_of: date = Depends(get_as_of),
+    db: Session = Depends(get_read_db)
+):
     """
     Récupère un contrat spécifique par son ID.
     
     Args:
         contract_id: UUID du contrat
+        as_of: Date d'évaluation des champs calculés
         db: Session de base de données
     
     Returns:
@@ -130,7 +250,7 @@ async def get_contract(contract_id: UUID, db: Session = Depends(get_db)):
             detail=f"Contrat {contract_id} non trouvé"
         )
     
-    return contract
+    return contract_responses([contract], as_of)[0]
 
 
 @router.post("/", response_model=ContractResponse, status_code=status.HTTP_201_CREATED)
@@ -154,10 +274,12 @@ async def create_contract(contract_data: ContractCreate, db: Session = Depends(g
     
     contract = Contract(**contract_data.model_dump())
     db.add(contract)
+    bump_cache_version(db, TIMELINE_CACHE_NAME)
     db.commit()
+    timeline_snapshots.invalidate()
     db.refresh(contract)
     
-    return contract
+    return contract_responses([contract], date.today())[0]
 
 
 @router.put("/{contract_id}", response_model=ContractResponse)
@@ -193,10 +315,12 @@ async def update_contract(
     for field, value in update_data.items():
         setattr(contract, field, value)
     
+    bump_cache_version(db, TIMELINE_CACHE_NAME)
     db.commit()
+    timeline_snapshots.invalidate()
     db.refresh(contract)
     
-    return contract
+    return contract_responses([contract], date.today())[0]
 
 
 @router.delete("/{contract_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -220,25 +344,327 @@ async def delete_contract(contract_id: UUID, db: Session = Depends(get_db)):
         )
     
     db.delete(contract)
+    bump_cache_version(db, TIMELINE_CACHE_NAME)
     db.commit()
+    timeline_snapshots.invalidate()
 
 
-@router.get("/timeline/data", response_model=List[TimelineItem])
-async def get_timeline_data(db: Session = Depends(get_db)):
+async def _iter_upstream(response: httpx.Response) -> AsyncIterator[bytes]:
+    """Relaie le corps d'une réponse Graph morceau par morceau, puis la ferme."""
+    try:
+        async for chunk in response.aiter_raw(settings.document_stream_chunk_size):
+            yield chunk
+    finally:
+        await response.aclose()
+
+
+def _graph_http_exception(error: httpx.HTTPError | GraphAuthError | SharePointUrlError) -> HTTPException:
+    """Traduit une erreur Graph en erreur HTTP pour le client."""
+    if isinstance(error, SharePointUrlError):
+        return HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(error))
+    if isinstance(error, GraphAuthError):
+        return HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail="Authentification auprès de SharePoint impossible"
+        )
+    if isinstance(error, httpx.HTTPStatusError):
+        if error.response.status_code == status.HTTP_404_NOT_FOUND:
+            return HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Document introuvable sur SharePoint"
+            )
+        return HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=f"Erreur SharePoint: {error.response.status_code}"
+        )
+    return HTTPException(
+        status_code=status.HTTP_502_BAD_GATEWAY,
+        detail=f"SharePoint injoignable: {error}"
+    )
+
+
+def _parse_byte_range(range_header: str, size: int) -> Tuple[int, int] | None:
     """
-    Récupère les données formatées pour la timeline.
-    Inclut les contrats avec leur période de préavis.
+    Analyse un en-tête Range portant sur une seule plage d'octets.
     
     Args:
+        range_header: Valeur de l'en-tête (ex: "bytes=0-1023")
+        size: Taille du fichier
+    
+    Returns:
+        Tuple[int, int] | None: Bornes incluses, ou None pour servir le
+            fichier entier (plages multiples ou syntaxe non gérée)
+    
+    Raises:
+        HTTPException: 416 si la plage est hors du fichier
+    """
+    unit, _, spec = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    
+    start_text, _, end_text = spec.strip().partition("-")
+    try:
+        if start_text:
+            start = int(start_text)
+            end = int(end_text) if end_text else size - 1
+        else:
+            # Suffixe : les N derniers octets
+            start = max(size - int(end_text), 0)
+            end = size - 1
+    except ValueError:
+        return None
+    
+    if start >= size or start > end:
+        raise HTTPException(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            detail="Plage demandée invalide",
+            headers={"Content-Range": f"bytes */{size}"}
+        )
+    return start, min(end, size - 1)
+
+
+async def _iter_file_range(cached_file: BinaryIO, start: int, length: int) -> AsyncIterator[bytes]:
+    """Lit une plage d'un fichier en cache déjà ouvert, morceau par morceau, puis le ferme."""
+    async with anyio.wrap_file(cached_file) as async_file:
+        await async_file.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = await async_file.read(min(settings.document_stream_chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def _cached_document_response(
+    cached_file: BinaryIO,
+    metadata: DocumentMetadata,
+    range_header: str | None
+) -> Response:
+    """
+    Sert un document depuis le cache disque. Le fichier est ouvert avant
+    la réponse : une éviction par un autre worker pendant l'envoi ne le
+    rend pas illisible (pas de 500 sur un chemin disparu).
+    """
+    headers = {"accept-ranges": "bytes", "etag": metadata.etag}
+    try:
+        byte_range = _parse_byte_range(range_header, metadata.size) if range_header else None
+    except HTTPException:
+        cached_file.close()
+        raise
+    
+    if byte_range is None:
+        headers["content-length"] = str(metadata.size)
+        return StreamingResponse(
+            _iter_file_range(cached_file, 0, metadata.size),
+            media_type=metadata.mime_type,
+            headers=headers
+        )
+    
+    start, end = byte_range
+    headers["content-range"] = f"bytes {start}-{end}/{metadata.size}"
+    headers["content-length"] = str(end - start + 1)
+    return StreamingResponse(
+        _iter_file_range(cached_file, start, end - start + 1),
+        status_code=status.HTTP_206_PARTIAL_CONTENT,
+        media_type=metadata.mime_type,
+        headers=headers
+    )
+
+
+@router.get("/documents/status", response_model=List[DocumentStatus])
+@route_cost(5)
+async def list_document_statuses(
+    skip: int = 0,
+    limit: int = 100,
+    status_filter: str | None = None,
+    db: Session = Depends(get_read_db),
+    graph: GraphService = Depends(get_graph_service),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    Indique pour chaque contrat si son document SharePoint existe, avec sa
+    taille et sa date de modification. Les métadonnées sont récupérées par
+    lots de 20 via le JSON batching de Graph ; les URLs hors du site
+    SharePoint configuré ne sont pas interrogées (état "error").
+    
+    Args:
+        skip: Nombre d'éléments à sauter
+        limit: Nombre maximum d'éléments à retourner
+        status_filter: Filtre optionnel par statut
         db: Session de base de données
+        graph: Service Graph
+        current_user: Utilisateur authentifié
+    
+    Returns:
+        List[DocumentStatus]: État du document de chaque contrat
+    """
+    query = db.query(Contract.id, Contract.sharepoint_file_url)
+    
+    if status_filter:
+        query = query.filter(Contract.status == status_filter)
+    
+    rows = query.offset(skip).limit(limit).all()
+    file_urls = {contract_id: url for contract_id, url in rows if url}
+    
+    try:
+        results = await graph.get_shared_items_metadata(file_urls) if file_urls else {}
+    except (httpx.HTTPError, GraphAuthError) as e:
+        raise _graph_http_exception(e)
+    
+    statuses = []
+    for contract_id, url in rows:
+        if not url:
+            statuses.append(DocumentStatus(contract_id=contract_id, status="no_document"))
+            continue
+        
+        code, item = results.get(contract_id, (0, {}))
+        if code == status.HTTP_200_OK:
+            statuses.append(DocumentStatus(
+                contract_id=contract_id,
+                status="ok",
+                size=item.get("size"),
+                etag=item.get("eTag"),
+                last_modified=item.get("lastModifiedDateTime")
+            ))
+        elif code == status.HTTP_404_NOT_FOUND:
+            statuses.append(DocumentStatus(contract_id=contract_id, status="not_found"))
+        else:
+            statuses.append(DocumentStatus(contract_id=contract_id, status="error"))
+    
+    return statuses
+
+
+@router.get("/{contract_id}/document")
+@route_cost(2)
+async def get_contract_document(
+    contract_id: UUID,
+    request: Request,
+    db: Session = Depends(get_read_db),
+    graph: GraphService = Depends(get_graph_service),
+    cache: DocumentCache | None = Depends(get_document_cache),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    Sert le document SharePoint lié au contrat.
+    Les documents déjà consultés sont servis depuis le cache disque ; sinon
+    le fichier est relayé en streaming (et mis en cache au passage lorsque
+    le fichier entier est demandé). Les requêtes HTTP Range sont prises en
+    charge, ce qui permet aux visionneuses PDF de charger les pages à la demande.
+    
+    Args:
+        contract_id: UUID du contrat
+        request: Requête entrante (en-tête Range)
+        db: Session de base de données
+        graph: Service Graph
+        cache: Cache disque des documents (None si désactivé)
+        current_user: Utilisateur authentifié
+    
+    Returns:
+        Response: Contenu du fichier (200, 206 ou 416)
+    
+    Raises:
+        HTTPException: 404 si le contrat ou le document n'existe pas,
+            403 si son URL est hors du site SharePoint configuré,
+            502 si SharePoint est injoignable ou refuse le token applicatif
+    """
+    contract = db.query(Contract).filter(Contract.id == contract_id).first()
+    
+    if not contract:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Contrat {contract_id} non trouvé"
+        )
+    
+    if not contract.sharepoint_file_url:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Aucun document associé au contrat {contract_id}"
+        )
+    
+    file_url = contract.sharepoint_file_url
+    range_header = request.headers.get("range")
+    metadata = None
+    
+    try:
+        if cache is not None:
+            metadata = await cache.resolve_metadata(graph, file_url)
+            cached_file = await cache.open(metadata.item_id, metadata.etag)
+            if cached_file is not None:
+                return _cached_document_response(cached_file, metadata, range_header)
+        
+        upstream = await graph.open_file_stream(file_url, range_header=range_header)
+    except (httpx.HTTPError, GraphAuthError, SharePointUrlError) as e:
+        raise _graph_http_exception(e)
+    
+    headers = {
+        name: upstream.headers[name]
+        for name in _DOCUMENT_PROXY_HEADERS
+        if name in upstream.headers
+    }
+    headers.setdefault("accept-ranges", "bytes")
+    
+    body = _iter_upstream(upstream)
+    if (
+        metadata is not None
+        and upstream.status_code == status.HTTP_200_OK
+        and "content-encoding" not in upstream.headers
+        and cache.can_store(metadata)
+    ):
+        body = cache.tee(upstream, metadata)
+    
+    return StreamingResponse(
+        body,
+        status_code=upstream.status_code,
+        headers=headers,
+        background=BackgroundTask(upstream.aclose)
+    )
+
+
+# Colonnes lues pour la timeline
+_TIMELINE_COLUMNS = (
+    Contract.id,
+    Contract.name,
+    Contract.supplier,
+    Contract.amount,
+    Contract.duration_months,
+    Contract.end_date,
+    Contract.notice_period_days,
+    Contract.sharepoint_file_url,
+    Contract.document_status,
+)
+
+
+def build_contract_timeline(db: Session, today: date | None = None) -> List[TimelineItem]:
+    """
+    Construit les éléments de timeline des contrats : échéance et, si
+    applicable, période de préavis. Couleurs et préavis sont calculés en
+    bloc à la date `today`.
+    
+    Args:
+        db: Session de base de données
+        today: Date d'évaluation (aujourd'hui par défaut)
     
     Returns:
         List[TimelineItem]: Éléments de la timeline
     """
-    contracts = db.query(Contract).all()
+    today = today or date.today()
+    contracts = db.query(*_TIMELINE_COLUMNS).all()
+    derived = compute_derived_fields(
+        [contract.end_date for contract in contracts],
+        [contract.notice_period_days for contract in contracts],
+        [contract.amount for contract in contracts],
+        [contract.duration_months for contract in contracts],
+        today
+    )
     timeline_items = []
     
-    for contract in contracts:
+    for contract, color, notice_start, in_notice in zip(
+        contracts,
+        derived["timeline_color"],
+        derived["notice_start_date"],
+        derived["is_in_notice_period"]
+    ):
         # Jalon (point) pour la date de fin
         milestone = TimelineItem(
             id=f"contract-milestone-{contract.id}",
@@ -246,25 +672,26 @@ async def get_timeline_data(db: Session = Depends(get_db)):
             title=f"{contract.name} - Échéance",
             start=contract.end_date.isoformat(),
             end=None,
-            color=contract.timeline_color,
+            color=color,
             metadata={
                 "contract_id": str(contract.id),
                 "supplier": contract.supplier,
                 "amount": float(contract.amount),
-                "sharepoint_url": contract.sharepoint_file_url
+                "sharepoint_url": contract.sharepoint_file_url,
+                "document_status": contract.document_status
             }
         )
         timeline_items.append(milestone)
         
         # Barre pour la période de préavis (si applicable)
-        if contract.is_in_notice_period or contract.notice_start_date >= date.today():
+        if in_notice or notice_start >= today:
             notice_bar = TimelineItem(
                 id=f"contract-notice-{contract.id}",
                 type="contract-notice",
                 title=f"{contract.name} - Préavis",
-                start=contract.notice_start_date.isoformat(),
+                start=notice_start.isoformat(),
                 end=contract.end_date.isoformat(),
-                color=contract.timeline_color,
+                color=color,
                 metadata={
                     "contract_id": str(contract.id),
                     "supplier": contract.supplier,
@@ -274,3 +701,49 @@ async def get_timeline_data(db: Session = Depends(get_db)):
             timeline_items.append(notice_bar)
     
     return timeline_items
+
+
+_timeline_adapter = TypeAdapter(List[TimelineItem])
+
+
+def encode_contract_timeline(db: Session, today: date) -> bytes:
+    """Construit la timeline et l'encode en JSON (corps de réponse)."""
+    return _timeline_adapter.dump_json(build_contract_timeline(db, today))
+
+
+# Instantané encodé de la timeline, reconstruit à chaque changement de
+# version (écritures de contrats) ou de date
+timeline_snapshots = TimelineSnapshotStore(
+    encode_contract_timeline,
+    TIMELINE_CACHE_NAME,
+    version_check_seconds=settings.contract_timeline_version_check_seconds
+)
+
+
+@router.get("/timeline/data", response_model=List[TimelineItem])
+@route_cost(5)
+async def get_timeline_data(
+    request: Request,
+    as_of: date = Depends(get_as_of),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Récupère les données formatées pour la timeline.
+    Inclut les contrats avec leur période de préavis.
+    Sert l'instantané déjà encodé du jour (gzip si accepté, 304 si
+    inchangé) ; une autre date d'évaluation est calculée à la demande.
+    
+    Args:
+        request: Requête HTTP (Accept-Encoding, If-None-Match)
+        as_of: Date d'évaluation (couleurs, préavis)
+        db: Session de base de données (autre date que le jour ;
+            l'instantané utilise ses propres sessions)
+    
+    Returns:
+        Response: Éléments de la timeline (JSON)
+    """
+    if as_of != date.today():
+        body = await run_in_threadpool(encode_contract_timeline, db, as_of)
+        return Response(body, media_type="application/json")
+    snapshot = await timeline_snapshots.get()
+    return snapshot.response(request.headers)
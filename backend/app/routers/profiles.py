@@ -0,0 +1,69 @@
+"""
+Router d'administration des profils de requêtes (voir app.profiling).
+"""
+import os
+from datetime import datetime
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import FileResponse
+from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
+
+from app.auth import Principal, get_current_admin_user
+from app.config import settings
+from app.profiling import PROFILE_SUFFIX, list_profiles
+from app.tracing import TracedRoute
+
+
+router = APIRouter(prefix="/admin/profiles", tags=["administration"], route_class=TracedRoute)
+
+
+class ProfileInfo(BaseModel):
+    """Profil de requête conservé."""
+    name: str
+    size: int
+    created_at: datetime
+
+
+@router.get("/", response_model=List[ProfileInfo])
+async def get_profiles(
+    current_user: Principal = Depends(get_current_admin_user)
+):
+    """
+    Liste les profils conservés, du plus récent au plus ancien.
+
+    Args:
+        current_user: Administrateur connecté
+
+    Returns:
+        List[ProfileInfo]: Profils disponibles
+    """
+    return await run_in_threadpool(list_profiles, settings.profiling_dir)
+
+
+@router.get("/{name}")
+async def get_profile(
+    name: str,
+    current_user: Principal = Depends(get_current_admin_user)
+):
+    """
+    Télécharge un profil (flame graph HTML pyinstrument).
+
+    Args:
+        name: Nom du fichier de profil
+        current_user: Administrateur connecté
+
+    Returns:
+        FileResponse: Profil HTML
+
+    Raises:
+        HTTPException: Si le profil n'existe pas
+    """
+    path = os.path.join(settings.profiling_dir, os.path.basename(name))
+    if not name.endswith(PROFILE_SUFFIX) or not os.path.isfile(path):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profil non trouvé"
+        )
+    return FileResponse(path, media_type="text/html")
@@ -0,0 +1,187 @@
+"""
+Router pour l'authentification SSO avec Microsoft Entra ID.
+Inclus dans l'application uniquement si `enable_sso` est actif : ni ce
+module ni msal ne sont chargés au démarrage sinon.
+"""
+from fastapi import APIRouter, HTTPException, status, Query, Depends
+from fastapi.responses import RedirectResponse
+from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
+import secrets
+
+from app.services.graph_service import GraphService, get_graph_service
+from app.concurrency import ExecutorSaturated, ExecutorTimeout
+from app.state_store import StateStore, get_state_store
+from app.tracing import TracedRoute
+
+
+# Schémas Pydantic
+class UserInfo(BaseModel):
+    """Informations utilisateur."""
+    id: str
+    display_name: str
+    email: str
+    job_title: str | None = None
+
+
+class TokenResponse(BaseModel):
+    """Réponse contenant le token d'accès."""
+    access_token: str
+    token_type: str = "bearer"
+    expires_in: int
+    refresh_token: str | None = None
+
+
+# Router
+router = APIRouter(prefix="/auth", tags=["authentication"], route_class=TracedRoute)
+
+
+@router.get("/login")
+async def login(
+    graph: GraphService = Depends(get_graph_service),
+    state_store: StateStore = Depends(get_state_store)
+):
+    """
+    Initie le flux d'authentification SSO.
+    Redirige l'utilisateur vers Microsoft Entra ID.
+    
+    Args:
+        graph: Service Graph
+        state_store: Stockage des états CSRF
+    
+    Returns:
+        RedirectResponse: Redirection vers la page de connexion Microsoft
+    """
+    # Génération d'un état CSRF pour sécuriser le callback
+    state = secrets.token_urlsafe(32)
+    # Stockage en base (bloquant) hors de la boucle d'événements
+    await run_in_threadpool(state_store.put, state)
+    
+    # Génération de l'URL d'authentification
+    auth_url = await graph.get_auth_url(state=state)
+    
+    return RedirectResponse(url=auth_url)
+
+
+@router.get("/callback")
+async def auth_callback(
+    code: str = Query(..., description="Code d'autorisation"),
+    state: str = Query(..., description="État CSRF"),
+    graph: GraphService = Depends(get_graph_service),
+    state_store: StateStore = Depends(get_state_store)
+):
+    """
+    Callback OAuth après authentification.
+    Échange le code d'autorisation contre un token d'accès.
+    
+    Args:
+        code: Code d'autorisation reçu de Microsoft
+        state: État CSRF pour validation
+        graph: Service Graph
+        state_store: Stockage des états CSRF
+    
+    Returns:
+        TokenResponse: Token d'accès et informations
+    
+    Raises:
+        HTTPException: En cas d'erreur d'authentification
+    """
+    # Validation et consommation de l'état CSRF (usage unique)
+    if not await run_in_threadpool(state_store.consume, state):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="État CSRF invalide ou expiré"
+        )
+    
+    try:
+        # Échange du code contre un token
+        token_data = await graph.authenticate_user(code)
+        
+        return TokenResponse(
+            access_token=token_data["access_token"],
+            expires_in=token_data.get("expires_in", 3600),
+            refresh_token=token_data.get("refresh_token")
+        )
+    
+    except (ExecutorSaturated, ExecutorTimeout):
+        # Surcharge ou lenteur côté Microsoft : 503 / 504 plutôt que 401
+        raise
+    
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=f"Erreur d'authentification: {str(e)}"
+        )
+
+
+@router.get("/me", response_model=UserInfo)
+async def get_current_user(
+    access_token: str = Query(..., description="Token d'accès Microsoft"),
+    graph: GraphService = Depends(get_graph_service)
+):
+    """
+    Récupère les informations de l'utilisateur connecté.
+    
+    Args:
+        access_token: Token d'accès Microsoft
+        graph: Service Graph
+    
+    Returns:
+        UserInfo: Informations utilisateur
+    
+    Raises:
+        HTTPException: En cas d'erreur
+    """
+    try:
+        user_data = await graph.get_user_info(access_token)
+        
+        return UserInfo(
+            id=user_data["id"],
+            display_name=user_data.get("displayName", ""),
+            email=user_data.get("mail", user_data.get("userPrincipalName", "")),
+            job_title=user_data.get("jobTitle")
+        )
+    
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=f"Erreur lors de la récupération des informations utilisateur: {str(e)}"
+        )
+
+
+@router.post("/refresh")
+async def refresh_access_token(
+    refresh_token: str = Query(..., description="Token de rafraîchissement"),
+    graph: GraphService = Depends(get_graph_service)
+):
+    """
+    Rafraîchit le token d'accès.
+    
+    Args:
+        refresh_token: Token de rafraîchissement
+        graph: Service Graph
+    
+    Returns:
+        TokenResponse: Nouveau token d'accès
+    
+    Raises:
+        HTTPException: En cas d'erreur
+    """
+    try:
+        token_data = await graph.refresh_token(refresh_token)
+        
+        return TokenResponse(
+            access_token=token_data["access_token"],
+            expires_in=token_data.get("expires_in", 3600),
+            refresh_token=token_data.get("refresh_token")
+        )
+    
+    except (ExecutorSaturated, ExecutorTimeout):
+        # Surcharge ou lenteur côté Microsoft : 503 / 504 plutôt que 401
+        raise
+    
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=f"Erreur lors du rafraîchissement du token: {str(e)}"
+        )
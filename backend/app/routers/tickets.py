@@ -3,19 +3,16 @@ Router pour les tickets Zammad.
 """
 from fastapi import APIRouter, Depends, Query
 from typing import List
-from datetime import date, timedelta
+from datetime import date
 
-from app.services.zammad_service import ZammadService
+from app.services.zammad_service import ZammadService, default_stats_period, get_zammad_service
 from app.models.ticket import Ticket, TicketStats
 from app.routers.contracts import TimelineItem
+from app.rate_limit import route_cost
+from app.tracing import TracedRoute
 
 
-router = APIRouter(prefix="/tickets", tags=["tickets"])
-
-
-def get_zammad_service() -> ZammadService:
-    """Dépendance pour obtenir le service Zammad."""
-    return ZammadService()
+router = APIRouter(prefix="/tickets", tags=["tickets"], route_class=TracedRoute)
 
 
 @router.get("/projects", response_model=List[Ticket])
@@ -36,6 +33,7 @@ async def get_project_tickets(
 
 
 @router.get("/stats", response_model=List[TicketStats])
+@route_cost(20)
 async def get_ticket_statistics(
     start_date: date = Query(default=None, description="Date de début (par défaut: 30 jours avant aujourd'hui)"),
     end_date: date = Query(default=None, description="Date de fin (par défaut: aujourd'hui)"),
@@ -55,10 +53,9 @@ async def get_ticket_statistics(
         List[TicketStats]: Statistiques par jour
     """
     # Valeurs par défaut
-    if not end_date:
-        end_date = date.today()
-    if not start_date:
-        start_date = end_date - timedelta(days=30)
+    default_start, default_end = default_stats_period(end_date)
+    start_date = start_date or default_start
+    end_date = end_date or default_end
     
     stats = await zammad.get_closed_tickets_stats(
         start_date=start_date,
@@ -0,0 +1,409 @@
+"""
+Planificateur de tâches d'arrière-plan du processus.
+
+Chaque tâche est exécutée à intervalle fixe ou selon une expression cron
+(5 champs, heures UTC), avec une gigue aléatoire pour désynchroniser les
+workers. Une exécution n'en chevauche jamais une autre de la même tâche.
+
+Les tâches `leader_only` ne sont exécutées que par le worker leader de la
+grappe : le leader détient un verrou consultatif PostgreSQL sur une
+connexion dédiée ; si elle est perdue (processus arrêté, base redémarrée),
+un autre worker prend le relais. Hors PostgreSQL, le processus est leader.
+"""
+import asyncio
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, FrozenSet, List, Optional
+
+from sqlalchemy import text
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.database import advisory_lock_key, engine
+from app.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+_job_runs_total = REGISTRY.counter(
+    "scheduler_job_runs_total",
+    "Exécutions des tâches planifiées par résultat (success, error, timeout)",
+    labelnames=("job", "result"),
+)
+_job_skipped_total = REGISTRY.counter(
+    "scheduler_job_skipped_total",
+    "Exécutions sautées (not_leader, overlap)",
+    labelnames=("job", "reason"),
+)
+_job_seconds = REGISTRY.histogram(
+    "scheduler_job_seconds",
+    "Durée d'exécution des tâches planifiées",
+    labelnames=("job",),
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0, 900.0),
+)
+_job_last_success = REGISTRY.gauge(
+    "scheduler_job_last_success_timestamp_seconds",
+    "Horodatage (epoch) de la dernière exécution réussie",
+    labelnames=("job",),
+)
+_leader = REGISTRY.gauge(
+    "scheduler_leader",
+    "1 si ce worker est leader des tâches planifiées",
+)
+
+
+# ========== EXPRESSIONS CRON ==========
+
+# (minimum, maximum) de chaque champ : minute, heure, jour, mois, jour de
+# semaine (dimanche : 0 ou 7)
+_CRON_BOUNDS = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+
+def _parse_cron_field(expression: str, minimum: int, maximum: int) -> FrozenSet[int]:
+    values = set()
+    for part in expression.split(","):
+        base, _, step_text = part.partition("/")
+        step = int(step_text) if step_text else 1
+        if base == "*":
+            start, end = minimum, maximum
+        elif "-" in base:
+            start_text, end_text = base.split("-", 1)
+            start, end = int(start_text), int(end_text)
+        else:
+            start = int(base)
+            end = maximum if step_text else start
+        if step < 1 or start > end:
+            raise ValueError(f"Champ cron invalide: {part!r}")
+        values.update(range(start, end + 1, step))
+    if not values or min(values) < minimum or max(values) > maximum:
+        raise ValueError(f"Champ cron hors limites: {expression!r}")
+    return frozenset(values)
+
+
+class CronSchedule:
+    """
+    Expression cron à 5 champs (minute heure jour mois jour-de-semaine) :
+    `*`, listes, intervalles et pas (`*/15`, `1-5`, `0,30`). Comme cron, si
+    le jour du mois et le jour de semaine sont tous deux restreints, l'un
+    ou l'autre suffit.
+    """
+
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Expression cron invalide (5 champs attendus): {expression!r}")
+        try:
+            self.minutes, self.hours, self.days, self.months, self.weekdays = (
+                _parse_cron_field(value, *bounds) for value, bounds in zip(fields, _CRON_BOUNDS)
+            )
+        except ValueError as e:
+            raise ValueError(f"Expression cron invalide {expression!r}: {e}") from e
+        self.weekdays = frozenset(0 if value == 7 else value for value in self.weekdays)
+        self.expression = expression
+        self._days_restricted = fields[2] != "*"
+        self._weekdays_restricted = fields[4] != "*"
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day_ok = moment.day in self.days
+        weekday_ok = (moment.weekday() + 1) % 7 in self.weekdays
+        if self._days_restricted and self._weekdays_restricted:
+            return day_ok or weekday_ok
+        return day_ok and weekday_ok
+
+    def next_after(self, after: datetime) -> datetime:
+        """
+        Prochaine échéance strictement postérieure à `after`.
+
+        Args:
+            after: Instant de référence
+
+        Returns:
+            datetime: Échéance (même fuseau que `after`)
+
+        Raises:
+            ValueError: Si l'expression n'a aucune échéance (ex. 30 février)
+        """
+        moment = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = after.year + 5
+        while moment.year <= limit:
+            if moment.month not in self.months:
+                moment = (moment.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(moment):
+                moment = moment.replace(hour=0, minute=0) + timedelta(days=1)
+            elif moment.hour not in self.hours:
+                moment = moment.replace(minute=0) + timedelta(hours=1)
+            elif moment.minute not in self.minutes:
+                moment += timedelta(minutes=1)
+            else:
+                return moment
+        raise ValueError(f"Expression cron sans échéance: {self.expression!r}")
+
+
+# ========== ÉLECTION DU LEADER ==========
+
+class LeaderElection:
+    """
+    Élection d'un leader par verrou consultatif PostgreSQL de session.
+    Le verrou est pris sur une connexion dédiée, gardée ouverte tant que le
+    worker est leader et vérifiée périodiquement.
+
+    Les opérations sur cette connexion s'exécutent dans le pool de threads,
+    sous un verrou : annuler la boucle n'interrompt pas une tentative en
+    cours, que `release` attend avant de libérer le verrou consultatif (une
+    tentative aboutissant après l'arrêt rend aussitôt le verrou).
+    """
+
+    def __init__(self, name: str = "scheduler", bind=None):
+        self.key = advisory_lock_key(name)
+        self.bind = bind or engine
+        self._connection = None
+        self._is_leader = self.bind.dialect.name != "postgresql"
+        self._lock = threading.Lock()
+        self._stopped = False
+
+    @property
+    def is_leader(self) -> bool:
+        return self._is_leader
+
+    def _set_leader(self, value: bool) -> None:
+        if value != self._is_leader:
+            logger.info("Planificateur : %s", "leader" if value else "n'est plus leader")
+        self._is_leader = value
+        _leader.set(1 if value else 0)
+
+    def _try_acquire(self) -> bool:
+        with self._lock:
+            if self._stopped:
+                return False
+            connection = self.bind.connect()
+            try:
+                acquired = bool(connection.execute(
+                    text("SELECT pg_try_advisory_lock(:key)"), {"key": self.key}
+                ).scalar())
+                # Verrou de session : il survit à la fin de la transaction
+                connection.commit()
+            except Exception:
+                connection.close()
+                raise
+            if acquired:
+                self._connection = connection
+            else:
+                connection.close()
+            return acquired
+
+    def _check_alive(self) -> bool:
+        with self._lock:
+            if self._connection is None:
+                return False
+            try:
+                self._connection.execute(text("SELECT 1"))
+                self._connection.commit()
+                return True
+            except Exception:
+                self._connection.invalidate()
+                self._connection.close()
+                self._connection = None
+                return False
+
+    def _release(self) -> None:
+        with self._lock:
+            self._stopped = True
+            connection, self._connection = self._connection, None
+            if connection is not None:
+                self._unlock(connection)
+
+    def _unlock(self, connection) -> None:
+        try:
+            connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": self.key})
+            connection.commit()
+        except Exception:
+            connection.invalidate()
+        finally:
+            connection.close()
+
+    async def run(self, retry_interval: float) -> None:
+        """
+        Boucle d'élection : tente de devenir leader, puis vérifie que la
+        connexion qui porte le verrou est toujours valide.
+
+        Args:
+            retry_interval: Période des tentatives et vérifications (secondes)
+        """
+        _leader.set(1 if self._is_leader else 0)
+        if self.bind.dialect.name != "postgresql":
+            return
+        self._stopped = False
+        while True:
+            try:
+                if self._connection is None:
+                    self._set_leader(await run_in_threadpool(self._try_acquire))
+                else:
+                    self._set_leader(await run_in_threadpool(self._check_alive))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Élection du leader impossible: %s", e)
+                self._set_leader(False)
+            await asyncio.sleep(retry_interval)
+
+    async def release(self) -> None:
+        """
+        Abandonne le rôle de leader (arrêt du worker), après la fin d'une
+        éventuelle tentative d'acquisition en cours.
+        """
+        if self.bind.dialect.name != "postgresql":
+            return
+        await run_in_threadpool(self._release)
+        self._set_leader(False)
+
+
+# ========== PLANIFICATEUR ==========
+
+@dataclass
+class Job:
+    """
+    Tâche planifiée.
+
+    Attributes:
+        name: Nom (étiquette des métriques et des journaux)
+        func: Coroutine sans argument à exécuter
+        interval: Période en secondes (exclusif avec `cron`)
+        cron: Expression cron à 5 champs, heures UTC
+        jitter: Délai aléatoire ajouté à chaque échéance (secondes)
+        timeout: Durée maximale d'une exécution (None = illimitée)
+        leader_only: True = un seul worker de la grappe l'exécute
+        run_at_start: Première exécution dès le démarrage (intervalle uniquement)
+    """
+    name: str
+    func: Callable[[], Awaitable[object]]
+    interval: Optional[float] = None
+    cron: Optional[str] = None
+    jitter: float = 0.0
+    timeout: Optional[float] = None
+    leader_only: bool = True
+    run_at_start: bool = False
+    running: bool = field(default=False, init=False)
+    _cron: Optional[CronSchedule] = field(default=None, init=False, repr=False)
+
+    def __post_init__(self):
+        if (self.interval is None) == (self.cron is None):
+            raise ValueError(f"Tâche {self.name}: indiquer soit `interval`, soit `cron`")
+        if self.interval is not None and self.interval <= 0:
+            raise ValueError(f"Tâche {self.name}: intervalle invalide")
+        if self.cron is not None:
+            self._cron = CronSchedule(self.cron)
+
+    def next_delay(self, now: datetime, first: bool = False) -> float:
+        """Délai (secondes) avant la prochaine exécution, gigue comprise."""
+        jitter = random.uniform(0, self.jitter) if self.jitter > 0 else 0.0
+        if self._cron is not None:
+            return (self._cron.next_after(now) - now).total_seconds() + jitter
+        if first and self.run_at_start:
+            return jitter
+        return self.interval + jitter
+
+
+class Scheduler:
+    """Exécute les tâches enregistrées dans la boucle d'événements du worker."""
+
+    def __init__(self, election: Optional[LeaderElection] = None):
+        self.election = election
+        self._jobs: Dict[str, Job] = {}
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def jobs(self) -> List[Job]:
+        return list(self._jobs.values())
+
+    def add_job(self, job: Job) -> Job:
+        """
+        Enregistre une tâche (avant `start`).
+
+        Raises:
+            ValueError: Si une tâche du même nom existe déjà
+        """
+        if job.name in self._jobs:
+            raise ValueError(f"Tâche déjà enregistrée: {job.name}")
+        self._jobs[job.name] = job
+        return job
+
+    def _is_leader(self) -> bool:
+        return self.election is None or self.election.is_leader
+
+    async def run_job(self, name: str) -> Optional[str]:
+        """
+        Exécute une tâche maintenant (hors échéance), avec les mêmes règles.
+
+        Args:
+            name: Nom de la tâche
+
+        Returns:
+            Optional[str]: Résultat (success, error, timeout) ou None si sautée
+        """
+        job = self._jobs[name]
+        if job.leader_only and not self._is_leader():
+            _job_skipped_total.inc(job=job.name, reason="not_leader")
+            return None
+        if job.running:
+            _job_skipped_total.inc(job=job.name, reason="overlap")
+            logger.warning("Tâche %s toujours en cours : exécution sautée", job.name)
+            return None
+
+        job.running = True
+        start = time.perf_counter()
+        try:
+            if job.timeout is not None:
+                await asyncio.wait_for(job.func(), job.timeout)
+            else:
+                await job.func()
+            result = "success"
+            _job_last_success.set(time.time(), job=job.name)
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            result = "timeout"
+            logger.warning("Tâche %s interrompue après %.0f s", job.name, job.timeout)
+        except Exception as e:
+            result = "error"
+            logger.exception("Erreur lors de la tâche %s: %s", job.name, e)
+        finally:
+            job.running = False
+            _job_seconds.observe(time.perf_counter() - start, job=job.name)
+        _job_runs_total.inc(job=job.name, result=result)
+        return result
+
+    async def _job_loop(self, job: Job) -> None:
+        first = True
+        while True:
+            delay = job.next_delay(datetime.now(timezone.utc), first=first)
+            first = False
+            await asyncio.sleep(max(delay, 0.0))
+            await self.run_job(job.name)
+
+    async def start(self) -> None:
+        """Démarre l'élection du leader et les boucles des tâches."""
+        if self._tasks:
+            return
+        if self.election is not None:
+            self._tasks.append(asyncio.create_task(
+                self.election.run(settings.scheduler_leader_retry_seconds)
+            ))
+        for job in self._jobs.values():
+            self._tasks.append(asyncio.create_task(self._job_loop(job), name=f"job-{job.name}"))
+        logger.info("Planificateur démarré (%d tâches)", len(self._jobs))
+
+    async def stop(self) -> None:
+        """Arrête les tâches (les exécutions en cours sont annulées) et libère le verrou."""
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self.election is not None:
+            await self.election.release()
+
+
+# Planificateur du processus (tâches enregistrées au démarrage, voir app.main)
+scheduler = Scheduler(LeaderElection())
@@ -0,0 +1,155 @@
+"""
+Lancement du serveur HTTP : `python -m app.server`.
+
+- `SERVER_MODE=development` : un processus uvicorn avec rechargement
+  automatique sur modification du code ;
+- `SERVER_MODE=production` : gunicorn et workers uvicorn (uvloop,
+  httptools), un worker par CPU disponible, application préchargée avant
+  le fork, recyclage des workers après `server_max_requests` requêtes et
+  arrêt progressif sur SIGTERM (les requêtes en cours sont terminées).
+"""
+import math
+import os
+from typing import Any, Dict, Optional
+
+from app.config import settings
+
+try:
+    from gunicorn.app.base import BaseApplication
+    from uvicorn.workers import UvicornWorker
+except ImportError:  # gunicorn n'est utilisé qu'en production (Linux)
+    BaseApplication = None
+    UvicornWorker = None
+
+APP_PATH = "app.main:app"
+
+# Marge laissée au cycle de vie (lifespan) après l'arrêt des connexions
+_LIFESPAN_SHUTDOWN_MARGIN_SECONDS = 5
+
+_CGROUP_CPU_MAX = "/sys/fs/cgroup/cpu.max"
+
+
+def available_cpus(cpu_max_path: str = _CGROUP_CPU_MAX) -> int:
+    """
+    Nombre de CPU utilisables par le processus : affinité, bornée par le
+    quota cgroup v2 (limite `cpus` d'un conteneur).
+
+    Args:
+        cpu_max_path: Fichier `cpu.max` du cgroup
+
+    Returns:
+        int: Nombre de CPU (au moins 1)
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # macOS, Windows
+        cpus = os.cpu_count() or 1
+    try:
+        with open(cpu_max_path, encoding="ascii") as cpu_max:
+            quota, period = cpu_max.read().split()[:2]
+        if quota != "max":
+            cpus = min(cpus, math.ceil(int(quota) / int(period)))
+    except (OSError, ValueError):
+        pass
+    return max(cpus, 1)
+
+
+def worker_count() -> int:
+    """Nombre de workers : `server_workers`, ou un par CPU disponible si 0."""
+    return settings.server_workers if settings.server_workers > 0 else available_cpus()
+
+
+def gunicorn_options() -> Dict[str, Any]:
+    """Options gunicorn du mode production."""
+    return {
+        "bind": f"{settings.server_host}:{settings.server_port}",
+        "workers": worker_count(),
+        "worker_class": "app.server.ProductionWorker",
+        "preload_app": settings.server_preload,
+        "keepalive": settings.server_keepalive_seconds,
+        "backlog": settings.server_backlog,
+        "timeout": settings.server_timeout_seconds,
+        "graceful_timeout": settings.server_graceful_timeout_seconds + _LIFESPAN_SHUTDOWN_MARGIN_SECONDS,
+        "max_requests": settings.server_max_requests,
+        "max_requests_jitter": settings.server_max_requests_jitter if settings.server_max_requests else 0,
+        # Repris par UvicornWorker (proxy_headers) : adresse client réelle
+        "forwarded_allow_ips": settings.server_forwarded_allow_ips,
+        "post_fork": post_fork,
+    }
+
+
+def post_fork(server, worker) -> None:
+    """
+    Hook gunicorn exécuté dans chaque worker après le fork : les connexions
+    éventuellement ouvertes par le processus maître pendant le préchargement
+    ne doivent pas être partagées entre processus.
+    """
+    from app.database import engine, read_engine
+
+    for db_engine in (engine, read_engine):
+        if db_engine is not None:
+            db_engine.dispose(close=False)
+
+
+if UvicornWorker is not None:
+    class ProductionWorker(UvicornWorker):
+        """Worker uvicorn avec uvloop et httptools explicites."""
+
+        CONFIG_KWARGS = {
+            "loop": "uvloop",
+            "http": "httptools",
+            "lifespan": "on",
+            "timeout_graceful_shutdown": settings.server_graceful_timeout_seconds,
+        }
+
+
+if BaseApplication is not None:
+    class ProductionServer(BaseApplication):
+        """Application gunicorn configurée par `gunicorn_options()`."""
+
+        def __init__(self, options: Optional[Dict[str, Any]] = None):
+            self.options = options or gunicorn_options()
+            super().__init__()
+
+        def load_config(self) -> None:
+            for key, value in self.options.items():
+                if key in self.cfg.settings and value is not None:
+                    self.cfg.set(key.lower(), value)
+
+        def load(self):
+            from app.main import app
+            return app
+
+
+def run_development() -> None:
+    """Un processus uvicorn avec rechargement automatique."""
+    import uvicorn
+
+    uvicorn.run(
+        APP_PATH,
+        host=settings.server_host,
+        port=settings.server_port,
+        reload=True,
+        reload_dirs=[os.path.dirname(os.path.abspath(__file__))],
+        timeout_keep_alive=settings.server_keepalive_seconds,
+        proxy_headers=True,
+        forwarded_allow_ips=settings.server_forwarded_allow_ips,
+    )
+
+
+def run_production() -> None:
+    """gunicorn et workers uvicorn."""
+    if BaseApplication is None:
+        raise RuntimeError("Le mode production nécessite gunicorn (pip install gunicorn)")
+    ProductionServer().run()
+
+
+def main() -> None:
+    if settings.server_mode == "production":
+        run_production()
+    else:
+        run_development()
+
+
+if __name__ == "__main__":
+    main()
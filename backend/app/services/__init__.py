@@ -1,7 +1,7 @@
 """
 Services de l'application Cockpit IT.
 """
-from app.services.zammad_service import ZammadService
-from app.services.graph_service import GraphService
+from app.services.zammad_service import ZammadService, get_zammad_service
+from app.services.graph_service import GraphService, get_graph_service
 
-__all__ = ["ZammadService", "GraphService"]
+__all__ = ["ZammadService", "get_zammad_service", "GraphService", "get_graph_service"]
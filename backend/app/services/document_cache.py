@@ -0,0 +1,312 @@
+"""
+Cache disque des documents SharePoint des contrats.
+Les fichiers sont indexés par identifiant de driveItem et eTag, dans la
+limite d'un budget en octets (éviction LRU).
+
+Le répertoire est partagé par tous les workers : le budget s'applique à
+son contenu réel, relu après chaque ajout, et non à l'index du processus.
+"""
+import hashlib
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import AsyncIterator, BinaryIO, Dict, List, Optional, Tuple
+
+import anyio
+import httpx
+
+from app.config import settings
+from app.metrics import cache_requests_total
+
+_TMP_SUFFIX = ".part"
+
+# Téléchargement en cours au-delà de cette ancienneté : abandonné (worker arrêté)
+_STALE_TMP_SECONDS = 3600
+
+# Nombre maximal d'URLs dont les métadonnées sont mémorisées
+_MAX_METADATA_ENTRIES = 1024
+
+
+@dataclass(frozen=True)
+class DocumentMetadata:
+    """Métadonnées utiles d'un fichier SharePoint."""
+    item_id: str
+    etag: str
+    size: int
+    mime_type: str
+    name: str
+
+    @classmethod
+    def from_drive_item(cls, item: Dict) -> "DocumentMetadata":
+        """Construit les métadonnées à partir d'un driveItem Graph."""
+        return cls(
+            item_id=item["id"],
+            etag=item.get("eTag", ""),
+            size=int(item.get("size", 0)),
+            mime_type=item.get("file", {}).get("mimeType", "application/octet-stream"),
+            name=item.get("name", ""),
+        )
+
+
+class DocumentCache:
+    """
+    Cache de fichiers sur disque avec budget en octets et éviction LRU.
+
+    Un fichier est identifié par (driveItem, eTag) : une nouvelle version du
+    document produit une nouvelle clé et l'ancienne est supprimée. Les
+    métadonnées SharePoint sont elles-mêmes mémorisées pendant
+    `revalidate_seconds` (au plus `_MAX_METADATA_ENTRIES` URLs) pour éviter
+    un appel Graph à chaque consultation.
+
+    L'ordre LRU entre workers repose sur la date d'accès des fichiers, mise
+    à jour à chaque lecture depuis le cache. Un fichier servi est ouvert dès
+    la lecture de l'index : son éviction par un autre worker pendant l'envoi
+    n'interrompt pas la réponse.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, revalidate_seconds: float = 300.0):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.revalidate_seconds = revalidate_seconds
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._items: Dict[str, str] = {}
+        self._total_bytes = 0
+        self._metadata: "OrderedDict[str, Tuple[float, DocumentMetadata]]" = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+    @property
+    def total_bytes(self) -> int:
+        """Taille totale des fichiers en cache."""
+        return self._total_bytes
+
+    @staticmethod
+    def _item_prefix(item_id: str) -> str:
+        return hashlib.sha256(item_id.encode("utf-8")).hexdigest()[:32]
+
+    @classmethod
+    def file_name(cls, item_id: str, etag: str) -> str:
+        """
+        Nom du fichier en cache pour une version de document.
+
+        Args:
+            item_id: Identifiant du driveItem
+            etag: eTag de la version
+
+        Returns:
+            str: Nom de fichier (préfixe du document + empreinte de l'eTag)
+        """
+        etag_hash = hashlib.sha256(etag.encode("utf-8")).hexdigest()[:16]
+        return f"{cls._item_prefix(item_id)}-{etag_hash}"
+
+    def path_for(self, name: str) -> str:
+        """Chemin absolu d'un fichier du cache."""
+        return os.path.join(self.directory, name)
+
+    def _scan(self) -> List[Tuple[float, str, int]]:
+        """
+        Fichiers finalisés du répertoire (date d'accès, nom, taille), par
+        date d'accès croissante ; les téléchargements abandonnés sont supprimés.
+        """
+        files = []
+        now = time.time()
+        for entry in os.scandir(self.directory):
+            try:
+                if not entry.is_file():
+                    continue
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue  # Supprimé par un autre worker
+            if entry.name.endswith(_TMP_SUFFIX):
+                # Un autre worker peut être en train d'écrire ce fichier
+                if now - stat.st_mtime > _STALE_TMP_SECONDS:
+                    self._unlink(entry.path)
+                continue
+            files.append((max(stat.st_atime, stat.st_mtime), entry.name, stat.st_size))
+        return sorted(files)
+
+    @staticmethod
+    def _unlink(path: str) -> None:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+    def _load_index(self) -> None:
+        """
+        Reconstruit l'index à partir du contenu du répertoire (ordre d'accès),
+        en appliquant le budget au répertoire entier (tous les workers).
+        Ne garde que la version la plus récente de chaque document.
+        """
+        files = self._scan()
+        latest: Dict[str, str] = {}
+        for _, name, _ in files:
+            prefix = name.split("-", 1)[0]
+            if prefix in latest:
+                self._unlink(self.path_for(latest[prefix]))
+            latest[prefix] = name
+
+        entries: "OrderedDict[str, int]" = OrderedDict(
+            (name, size) for _, name, size in files
+            if latest[name.split("-", 1)[0]] == name
+        )
+        total_bytes = sum(entries.values())
+        while total_bytes > self.max_bytes and entries:
+            name, size = entries.popitem(last=False)
+            total_bytes -= size
+            self._unlink(self.path_for(name))
+
+        with self._lock:
+            self._entries = entries
+            self._items = {name.split("-", 1)[0]: name for name in entries}
+            self._total_bytes = total_bytes
+
+    def get(self, item_id: str, etag: str) -> Optional[BinaryIO]:
+        """
+        Ouvre le fichier en cache, s'il existe (appel bloquant : depuis la
+        boucle d'événements, utiliser `open`).
+
+        Args:
+            item_id: Identifiant du driveItem
+            etag: eTag attendu
+
+        Returns:
+            BinaryIO | None: Fichier ouvert en lecture (à fermer) ou None
+        """
+        name = self.file_name(item_id, etag)
+        with self._lock:
+            if name in self._entries:
+                path = self.path_for(name)
+                try:
+                    cached_file = open(path, "rb")
+                except FileNotFoundError:
+                    # Supprimé par un autre worker partageant le répertoire
+                    self._remove(name)
+                else:
+                    try:
+                        # Date d'accès : ordre LRU partagé entre workers
+                        os.utime(cached_file.fileno())
+                    except OSError:
+                        pass
+                    self._entries.move_to_end(name)
+                    cache_requests_total.inc(cache="document", result="hit")
+                    return cached_file
+        cache_requests_total.inc(cache="document", result="miss")
+        return None
+
+    async def open(self, item_id: str, etag: str) -> Optional[BinaryIO]:
+        """`get` exécuté hors de la boucle d'événements."""
+        return await anyio.to_thread.run_sync(self.get, item_id, etag)
+
+    def can_store(self, metadata: DocumentMetadata) -> bool:
+        """Indique si un document est éligible au cache (taille)."""
+        return 0 < metadata.size <= min(settings.document_cache_max_file_bytes, self.max_bytes)
+
+    def _commit(self, tmp_path: str, name: str) -> None:
+        """
+        Publie un fichier finalisé (renommage atomique) puis applique le
+        budget au répertoire partagé. Exécuté hors de la boucle d'événements.
+        """
+        prefix = name.split("-", 1)[0]
+        os.replace(tmp_path, self.path_for(name))
+        with self._lock:
+            previous = self._items.get(prefix)
+            if previous and previous != name:
+                self._remove(previous)
+        self._load_index()
+
+    def _remove(self, name: str) -> None:
+        size = self._entries.pop(name, 0)
+        self._total_bytes -= size
+        prefix = name.split("-", 1)[0]
+        if self._items.get(prefix) == name:
+            del self._items[prefix]
+        self._unlink(self.path_for(name))
+
+    async def tee(
+        self,
+        response: httpx.Response,
+        metadata: DocumentMetadata
+    ) -> AsyncIterator[bytes]:
+        """
+        Relaie une réponse Graph tout en l'écrivant dans le cache.
+        Le fichier n'est ajouté au cache que si le téléchargement est complet.
+
+        Args:
+            response: Réponse Graph en streaming (contenu complet, non compressé)
+            metadata: Métadonnées du document
+
+        Yields:
+            bytes: Morceaux du fichier
+        """
+        name = self.file_name(metadata.item_id, metadata.etag)
+        tmp_path = f"{self.path_for(name)}.{uuid.uuid4().hex}{_TMP_SUFFIX}"
+        written = 0
+        completed = False
+        try:
+            async with await anyio.open_file(tmp_path, "wb") as cache_file:
+                async for chunk in response.aiter_raw(settings.document_stream_chunk_size):
+                    await cache_file.write(chunk)
+                    written += len(chunk)
+                    yield chunk
+            completed = True
+        finally:
+            await response.aclose()
+            if completed and written == metadata.size:
+                await anyio.to_thread.run_sync(self._commit, tmp_path, name)
+            else:
+                await anyio.to_thread.run_sync(self._unlink, tmp_path)
+
+    async def resolve_metadata(self, graph, file_url: str) -> DocumentMetadata:
+        """
+        Retourne les métadonnées d'un document, revalidées auprès de Graph
+        au plus une fois par `revalidate_seconds`.
+
+        Args:
+            graph: Service Graph
+            file_url: URL SharePoint du document
+
+        Returns:
+            DocumentMetadata: Métadonnées courantes
+
+        Raises:
+            httpx.HTTPError: Si Graph est en erreur
+        """
+        now = time.monotonic()
+        cached = self._metadata.get(file_url)
+        if cached and now - cached[0] < self.revalidate_seconds:
+            self._metadata.move_to_end(file_url)
+            return cached[1]
+
+        metadata = DocumentMetadata.from_drive_item(
+            await graph.get_shared_item_metadata(file_url)
+        )
+        self._metadata.pop(file_url, None)
+        self._metadata[file_url] = (now, metadata)
+        while len(self._metadata) > _MAX_METADATA_ENTRIES:
+            self._metadata.popitem(last=False)
+        return metadata
+
+
+_document_cache: Optional[DocumentCache] = None
+
+
+def get_document_cache() -> Optional[DocumentCache]:
+    """
+    Retourne le cache disque des documents, ou None s'il est désactivé.
+
+    Returns:
+        DocumentCache | None: Cache du processus
+    """
+    global _document_cache
+    if _document_cache is None and settings.document_cache_dir:
+        _document_cache = DocumentCache(
+            settings.document_cache_dir,
+            settings.document_cache_max_bytes,
+            settings.document_cache_revalidate_seconds
+        )
+    return _document_cache
@@ -2,10 +2,116 @@
 Service pour interagir avec Microsoft Graph API.
 Gère l'authentification SSO et l'accès aux fichiers SharePoint.
 """
-import msal
+import asyncio
+import base64
+import os
+import threading
 import httpx
-from typing import Dict, Optional
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import TYPE_CHECKING, Any, Dict, Hashable, Iterator, Optional, Tuple
+from urllib.parse import unquote, urlsplit
+from app.concurrency import BoundedExecutor
 from app.config import settings
+from app.metrics import track_upstream
+from app.tracing import SPAN_KIND_CLIENT, httpx_inject_traceparent, start_span
+
+if TYPE_CHECKING:
+    import msal
+
+# Scope des appels applicatifs (client credentials)
+APP_SCOPES = ["https://graph.microsoft.com/.default"]
+
+# Nombre maximal de requêtes par appel JSON batching ($batch) de Graph
+GRAPH_BATCH_SIZE = 20
+
+# Champs de driveItem utiles aux métadonnées de documents
+DRIVE_ITEM_SELECT = "id,eTag,size,name,file,lastModifiedDateTime"
+
+
+class GraphAuthError(Exception):
+    """Échec de l'obtention d'un token applicatif pour Graph."""
+
+
+class SharePointUrlError(ValueError):
+    """URL de fichier hors du site SharePoint configuré (`sharepoint_site_url`)."""
+
+
+def is_site_file_url(file_url: str, site_url: Optional[str] = None) -> bool:
+    """
+    Indique si une URL de fichier appartient au site SharePoint configuré.
+    Le token applicatif donne accès à tout le tenant : seules les URLs du
+    site de l'application peuvent lui être soumises.
+    
+    Args:
+        file_url: URL web du fichier SharePoint
+        site_url: URL du site (par défaut `sharepoint_site_url`)
+    
+    Returns:
+        bool: True si l'URL est sous le site (même origine, même préfixe de chemin)
+    """
+    site = urlsplit(site_url or settings.sharepoint_site_url)
+    try:
+        url = urlsplit(file_url)
+    except ValueError:
+        return False
+    if url.scheme.lower() != site.scheme.lower() or url.netloc.lower() != site.netloc.lower():
+        return False
+    segments = unquote(url.path).split("/")
+    if "." in segments or ".." in segments:
+        return False
+    site_path = site.path.rstrip("/")
+    return url.path == site_path or url.path.startswith(site_path + "/")
+
+
+def _retry_after_seconds(value: Any, default: float = 1.0) -> float:
+    """
+    Délai d'un en-tête Retry-After : nombre de secondes ou date HTTP.
+    Une valeur absente ou illisible vaut `default`.
+    """
+    if value is None:
+        return default
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        pass
+    try:
+        retry_at = parsedate_to_datetime(str(value))
+    except (TypeError, ValueError):
+        return default
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def ensure_site_file_url(file_url: str) -> str:
+    """
+    Vérifie qu'une URL de fichier appartient au site SharePoint configuré.
+    
+    Raises:
+        SharePointUrlError: Si l'URL est hors du site
+    """
+    if not is_site_file_url(file_url):
+        raise SharePointUrlError("L'URL du document doit appartenir au site SharePoint configuré")
+    return file_url
+
+
+@contextmanager
+def _graph_call(endpoint: str) -> Iterator[None]:
+    """Mesure (métriques et span client) un appel HTTP à Graph."""
+    with track_upstream("graph", endpoint):
+        with start_span(f"graph {endpoint}", kind=SPAN_KIND_CLIENT, **{"peer.service": "graph"}):
+            yield
+
+
+# Pool dédié aux appels MSAL (bibliothèque synchrone, I/O réseau bloquantes)
+msal_executor = BoundedExecutor(
+    "msal",
+    max_workers=settings.msal_workers,
+    max_pending=settings.msal_max_pending,
+    timeout=settings.msal_timeout_seconds
+)
 
 
 class GraphService:
@@ -28,14 +134,113 @@ class GraphService:
             "Sites.Read.All"
         ]
         
-        # Création de l'application MSAL
-        self.app = msal.ConfidentialClientApplication(
-            self.client_id,
-            authority=self.authority,
-            client_credential=self.client_secret
+        # Cache de tokens MSAL sérialisable, persisté sur disque.
+        # msal est importé ici (premier appel à Graph) et non au démarrage.
+        import msal
+
+        self.token_cache_path = settings.msal_token_cache_path
+        self.token_cache = msal.SerializableTokenCache()
+        self._token_cache_lock = threading.Lock()
+        self._load_token_cache()
+        
+        # Application MSAL créée à la première utilisation
+        self._app: Optional["msal.ConfidentialClientApplication"] = None
+        self._app_lock = threading.Lock()
+        
+        # Client HTTP partagé (pool de connexions keep-alive vers Graph)
+        self._http: Optional[httpx.AsyncClient] = None
+    
+    @property
+    def app(self) -> "msal.ConfidentialClientApplication":
+        """
+        Application MSAL du processus.
+        Sa construction effectue la découverte OpenID de l'autorité (appel
+        réseau) : elle n'a lieu qu'une fois, et est retentée en cas d'échec.
+        """
+        if self._app is None:
+            with self._app_lock:
+                if self._app is None:
+                    import msal
+
+                    self._app = msal.ConfidentialClientApplication(
+                        self.client_id,
+                        authority=self.authority,
+                        client_credential=self.client_secret,
+                        token_cache=self.token_cache
+                    )
+        return self._app
+    
+    @property
+    def http(self) -> httpx.AsyncClient:
+        """Client HTTP partagé, créé à la première utilisation."""
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.AsyncClient(
+                timeout=httpx.Timeout(30.0),
+                limits=httpx.Limits(
+                    max_connections=settings.graph_http_max_connections,
+                    max_keepalive_connections=settings.graph_http_max_keepalive
+                ),
+                event_hooks={"request": [httpx_inject_traceparent]}
+            )
+        return self._http
+    
+    async def aclose(self) -> None:
+        """Ferme le client HTTP et persiste le cache de tokens."""
+        await msal_executor.run(self._save_token_cache, operation="save_token_cache")
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+    
+    def _load_token_cache(self) -> None:
+        """Charge le cache de tokens persisté, s'il existe."""
+        if not self.token_cache_path or not os.path.exists(self.token_cache_path):
+            return
+        try:
+            with open(self.token_cache_path, "r", encoding="utf-8") as cache_file:
+                self.token_cache.deserialize(cache_file.read())
+        except (OSError, ValueError):
+            # Cache illisible : on repart d'un cache vide
+            pass
+    
+    def _save_token_cache(self) -> None:
+        """Persiste le cache de tokens s'il a changé (écriture atomique, fichier privé)."""
+        if not self.token_cache_path:
+            return
+        with self._token_cache_lock:
+            if not self.token_cache.has_state_changed:
+                return
+            directory = os.path.dirname(self.token_cache_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.token_cache_path}.{os.getpid()}.tmp"
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w", encoding="utf-8") as cache_file:
+                cache_file.write(self.token_cache.serialize())
+            os.replace(tmp_path, self.token_cache_path)
+            self.token_cache.has_state_changed = False
+    
+    def _msal_call(self, method_name: str, *args, **kwargs) -> Any:
+        """
+        Appelle une méthode de l'application MSAL puis persiste le cache.
+        Exécuté dans le pool MSAL, jamais sur la boucle d'événements.
+        """
+        result = getattr(self.app, method_name)(*args, **kwargs)
+        self._save_token_cache()
+        return result
+    
+    async def _run_msal(self, method_name: str, *args, **kwargs) -> Any:
+        """
+        Exécute un appel MSAL dans le pool dédié (délai et concurrence bornés).
+        
+        Raises:
+            ExecutorSaturated: Si trop d'appels MSAL sont en attente
+            ExecutorTimeout: Si l'appel dépasse `msal_timeout_seconds`
+        """
+        return await msal_executor.run(
+            self._msal_call, method_name, *args, operation=method_name, **kwargs
         )
     
-    def get_auth_url(self, state: str = None) -> str:
+    async def get_auth_url(self, state: str = None) -> str:
         """
         Génère l'URL d'authentification pour rediriger l'utilisateur.
         
@@ -45,7 +250,9 @@ class GraphService:
         Returns:
             str: URL d'authentification
         """
-        auth_url = self.app.get_authorization_request_url(
+        # Le premier appel construit l'application MSAL (découverte réseau)
+        auth_url = await self._run_msal(
+            "get_authorization_request_url",
             scopes=self.scopes,
             redirect_uri=self.redirect_uri,
             state=state
@@ -65,7 +272,8 @@ class GraphService:
         Raises:
             Exception: En cas d'erreur d'authentification
         """
-        result = self.app.acquire_token_by_authorization_code(
+        result = await self._run_msal(
+            "acquire_token_by_authorization_code",
             authorization_code,
             scopes=self.scopes,
             redirect_uri=self.redirect_uri
@@ -88,8 +296,8 @@ class GraphService:
         """
         headers = {"Authorization": f"Bearer {access_token}"}
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
+        with _graph_call("/me"):
+            response = await self.http.get(
                 f"{self.graph_endpoint}/me",
                 headers=headers,
                 timeout=30.0
@@ -110,8 +318,8 @@ class GraphService:
         """
         headers = {"Authorization": f"Bearer {access_token}"}
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
+        with _graph_call("file_content"):
+            response = await self.http.get(
                 file_url,
                 headers=headers,
                 timeout=60.0
@@ -119,6 +327,197 @@ class GraphService:
             response.raise_for_status()
             return response.content
     
+    @staticmethod
+    def encode_sharing_url(file_url: str) -> str:
+        """
+        Encode une URL SharePoint pour l'API `/shares` de Graph.
+        
+        Args:
+            file_url: URL web du fichier SharePoint
+        
+        Returns:
+            str: Identifiant de partage (`u!` + base64url sans remplissage)
+        """
+        encoded = base64.urlsafe_b64encode(file_url.encode("utf-8")).decode("ascii")
+        return "u!" + encoded.rstrip("=")
+    
+    def shared_item_url(self, file_url: str) -> str:
+        """
+        Construit l'URL Graph du driveItem correspondant à une URL SharePoint.
+        
+        Args:
+            file_url: URL web du fichier SharePoint
+        
+        Returns:
+            str: URL `/shares/{id}/driveItem`
+        """
+        return f"{self.graph_endpoint}/shares/{self.encode_sharing_url(file_url)}/driveItem"
+    
+    async def get_shared_item_metadata(self, file_url: str) -> Dict:
+        """
+        Récupère les métadonnées d'un fichier SharePoint à partir de son URL
+        (token applicatif). Appel léger, sans le contenu du fichier.
+        
+        Args:
+            file_url: URL web du fichier SharePoint
+        
+        Returns:
+            Dict: driveItem (id, eTag, size, file.mimeType, name...)
+        
+        Raises:
+            SharePointUrlError: Si l'URL est hors du site configuré
+        """
+        ensure_site_file_url(file_url)
+        access_token = await self.get_app_token()
+        with _graph_call("/shares/driveItem"):
+            response = await self.http.get(
+                self.shared_item_url(file_url),
+                headers={"Authorization": f"Bearer {access_token}"},
+                params={"$select": DRIVE_ITEM_SELECT},
+                timeout=30.0
+            )
+            response.raise_for_status()
+            return response.json()
+    
+    async def batch_get(
+        self,
+        requests: Dict[Hashable, Tuple[str, Dict[str, str]]]
+    ) -> Dict[Hashable, Tuple[int, Dict]]:
+        """
+        Exécute des GET Graph en lots de 20 via `$batch` (token applicatif).
+        Les lots sont envoyés en parallèle (`graph_batch_concurrency`) et les
+        requêtes limitées (429/503) sont rejouées une fois.
+        
+        Args:
+            requests: Clé -> (URL relative à l'endpoint Graph, en-têtes)
+        
+        Returns:
+            Dict: Clé -> (statut HTTP, corps JSON) ; statut 0 si le lot a échoué
+        """
+        access_token = await self.get_app_token()
+        semaphore = asyncio.Semaphore(settings.graph_batch_concurrency)
+        results: Dict[Hashable, Tuple[int, Dict]] = {}
+        
+        async def send_batch(keys: list) -> float:
+            """Envoie un lot, retourne le délai Retry-After maximal des limitations."""
+            batch_requests = []
+            for index, key in enumerate(keys):
+                url, headers = requests[key]
+                batch_request = {"id": str(index), "method": "GET", "url": url}
+                if headers:
+                    batch_request["headers"] = headers
+                batch_requests.append(batch_request)
+            body = {"requests": batch_requests}
+            async with semaphore:
+                try:
+                    with _graph_call("/$batch"):
+                        response = await self.http.post(
+                            f"{self.graph_endpoint}/$batch",
+                            headers={"Authorization": f"Bearer {access_token}"},
+                            json=body,
+                            timeout=60.0
+                        )
+                        response.raise_for_status()
+                        payload = response.json()
+                except httpx.HTTPError:
+                    for key in keys:
+                        results[key] = (0, {})
+                    return 0.0
+            
+            retry_after = 0.0
+            for item in payload.get("responses", []):
+                key = keys[int(item["id"])]
+                results[key] = (item.get("status", 0), item.get("body") or {})
+                if item.get("status") in (429, 503):
+                    headers = item.get("headers") or {}
+                    retry_after = max(retry_after, _retry_after_seconds(headers.get("Retry-After")))
+            return retry_after
+        
+        async def send_all(keys: list) -> float:
+            chunks = [keys[i:i + GRAPH_BATCH_SIZE] for i in range(0, len(keys), GRAPH_BATCH_SIZE)]
+            delays = await asyncio.gather(*(send_batch(chunk) for chunk in chunks))
+            return max(delays, default=0.0)
+        
+        delay = await send_all(list(requests))
+        throttled = [key for key, (code, _) in results.items() if code in (429, 503)]
+        if throttled:
+            await asyncio.sleep(min(delay, settings.graph_batch_max_retry_after_seconds))
+            await send_all(throttled)
+        
+        return results
+    
+    async def get_shared_items_metadata(
+        self,
+        file_urls: Dict[Hashable, str]
+    ) -> Dict[Hashable, Tuple[int, Dict]]:
+        """
+        Récupère en masse les métadonnées de fichiers SharePoint.
+        
+        Args:
+            file_urls: Clé (ex: ID de contrat) -> URL SharePoint
+        
+        Returns:
+            Dict: Clé -> (statut HTTP, driveItem) ; 403 sans appel à Graph
+                pour une URL hors du site configuré
+        """
+        results: Dict[Hashable, Tuple[int, Dict]] = {
+            key: (403, {}) for key, url in file_urls.items() if not is_site_file_url(url)
+        }
+        requests = {
+            key: (
+                f"/shares/{self.encode_sharing_url(url)}/driveItem?$select={DRIVE_ITEM_SELECT}",
+                {}
+            )
+            for key, url in file_urls.items()
+            if key not in results
+        }
+        if requests:
+            results.update(await self.batch_get(requests))
+        return results
+    
+    async def open_file_stream(
+        self,
+        file_url: str,
+        range_header: Optional[str] = None
+    ) -> httpx.Response:
+        """
+        Ouvre le contenu d'un fichier SharePoint en streaming (token applicatif).
+        Le corps n'est pas lu : l'appelant doit itérer puis fermer la réponse.
+        
+        Args:
+            file_url: URL web du fichier SharePoint
+            range_header: En-tête HTTP Range à transmettre (optionnel)
+        
+        Returns:
+            httpx.Response: Réponse 200 ou 206 en streaming
+        
+        Raises:
+            SharePointUrlError: Si l'URL est hors du site configuré
+            httpx.HTTPStatusError: Si Graph répond en erreur
+        """
+        ensure_site_file_url(file_url)
+        access_token = await self.get_app_token()
+        headers = {"Authorization": f"Bearer {access_token}"}
+        if range_header:
+            headers["Range"] = range_header
+        
+        # Graph redirige vers une URL de téléchargement pré-authentifiée ;
+        # httpx retire l'en-tête Authorization lors du changement d'origine
+        request = self.http.build_request(
+            "GET",
+            f"{self.shared_item_url(file_url)}/content",
+            headers=headers,
+            timeout=httpx.Timeout(60.0, connect=10.0)
+        )
+        with _graph_call("/shares/driveItem/content"):
+            response = await self.http.send(request, stream=True, follow_redirects=True)
+            
+            if response.is_error and response.status_code != 416:
+                await response.aclose()
+                response.raise_for_status()
+        
+        return response
+    
     async def get_sharepoint_file_metadata(
         self, 
         access_token: str, 
@@ -139,8 +538,8 @@ class GraphService:
         headers = {"Authorization": f"Bearer {access_token}"}
         endpoint = f"{self.graph_endpoint}/sites/{site_id}/drive/root:/{file_path}"
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
+        with _graph_call("/sites/drive/root"):
+            response = await self.http.get(
                 endpoint,
                 headers=headers,
                 timeout=30.0
@@ -148,7 +547,7 @@ class GraphService:
             response.raise_for_status()
             return response.json()
     
-    def refresh_token(self, refresh_token: str) -> Dict:
+    async def refresh_token(self, refresh_token: str) -> Dict:
         """
         Rafraîchit le token d'accès.
         
@@ -158,7 +557,8 @@ class GraphService:
         Returns:
             Dict: Nouveau token d'accès
         """
-        result = self.app.acquire_token_by_refresh_token(
+        result = await self._run_msal(
+            "acquire_token_by_refresh_token",
             refresh_token,
             scopes=self.scopes
         )
@@ -167,3 +567,50 @@ class GraphService:
             raise Exception(f"Erreur de rafraîchissement: {result.get('error_description')}")
         
         return result
+    
+    async def get_app_token(self) -> str:
+        """
+        Obtient un token applicatif (client credentials) pour Graph.
+        MSAL le sert depuis le cache tant qu'il est valide.
+        
+        Returns:
+            str: Token d'accès applicatif
+        
+        Raises:
+            GraphAuthError: En cas d'erreur d'authentification
+        """
+        result = await self._run_msal("acquire_token_for_client", scopes=APP_SCOPES)
+        
+        if "error" in result:
+            raise GraphAuthError(f"Erreur d'authentification applicative: {result.get('error_description')}")
+        
+        return result["access_token"]
+
+
+# Instance unique pour la durée de vie du processus
+_graph_service: Optional[GraphService] = None
+_graph_service_lock = threading.Lock()
+
+
+def get_graph_service() -> GraphService:
+    """
+    Retourne l'instance partagée du service Graph.
+    
+    Returns:
+        GraphService: Service Graph du processus
+    """
+    global _graph_service
+    if _graph_service is None:
+        with _graph_service_lock:
+            if _graph_service is None:
+                _graph_service = GraphService()
+    return _graph_service
+
+
+async def close_graph_service() -> None:
+    """Libère les ressources du service Graph partagé (arrêt de l'application)."""
+    global _graph_service
+    if _graph_service is not None:
+        await _graph_service.aclose()
+        _graph_service = None
+    msal_executor.shutdown()
@@ -0,0 +1,143 @@
+"""
+Contrôle périodique des liens SharePoint des contrats.
+Le résultat est stocké avec chaque contrat : la liste et la timeline
+affichent l'état des documents sans appel Graph pendant la requête.
+"""
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import bindparam, update
+from starlette.concurrency import run_in_threadpool
+
+from app.database import SessionLocal
+from app.models.contract import Contract
+from app.services.graph_service import (
+    DRIVE_ITEM_SELECT,
+    GraphService,
+    get_graph_service,
+    is_site_file_url,
+)
+from app.services.timeline_snapshot import TIMELINE_CACHE_NAME, bump_cache_version
+
+logger = logging.getLogger(__name__)
+
+_contracts = Contract.__table__
+
+# Mise à jour groupée par clé primaire ; updated_at est réaffecté à
+# lui-même pour ne pas déclencher son `onupdate` (ce n'est pas une
+# modification du contrat)
+_UPDATE_DOCUMENT_HEALTH = (
+    update(_contracts)
+    .where(_contracts.c.id == bindparam("b_contract_id"))
+    .values(
+        document_status=bindparam("b_status"),
+        document_size=bindparam("b_size"),
+        document_etag=bindparam("b_etag"),
+        document_checked_at=bindparam("b_checked_at"),
+        updated_at=_contracts.c.updated_at,
+    )
+)
+
+
+def _load_links() -> List[tuple]:
+    """Charge (id, URL, eTag connu, taille connue) des contrats ayant un document."""
+    db = SessionLocal()
+    try:
+        return db.query(
+            Contract.id,
+            Contract.sharepoint_file_url,
+            Contract.document_etag,
+            Contract.document_size
+        ).filter(Contract.sharepoint_file_url.isnot(None)).all()
+    finally:
+        db.close()
+
+
+def _store_results(rows: List[Dict], checked_at: datetime) -> None:
+    """Enregistre les résultats du contrôle en une seule transaction."""
+    db = SessionLocal()
+    try:
+        if rows:
+            db.execute(_UPDATE_DOCUMENT_HEALTH, rows)
+        db.execute(
+            update(_contracts)
+            .where(_contracts.c.sharepoint_file_url.is_(None))
+            .where(_contracts.c.document_status.is_distinct_from("no_document"))
+            .values(
+                document_status="no_document",
+                document_size=None,
+                document_etag=None,
+                document_checked_at=checked_at,
+                updated_at=_contracts.c.updated_at,
+            )
+        )
+        # L'état des documents figure dans la timeline
+        bump_cache_version(db, TIMELINE_CACHE_NAME)
+        db.commit()
+    finally:
+        db.close()
+
+
+async def scan_document_links(graph: Optional[GraphService] = None) -> Dict[str, int]:
+    """
+    Vérifie les liens SharePoint de tous les contrats.
+    Les métadonnées sont demandées par lots `$batch` (concurrence bornée) avec
+    `If-None-Match` sur l'eTag connu : un document inchangé répond 304.
+
+    Args:
+        graph: Service Graph (instance partagée par défaut)
+
+    Returns:
+        Dict[str, int]: Nombre de contrats par état
+    """
+    graph = graph or get_graph_service()
+    links = await run_in_threadpool(_load_links)
+    checked_at = datetime.utcnow()
+
+    requests = {}
+    for contract_id, url, etag, _ in links:
+        if not is_site_file_url(url):
+            # Hors du site configuré : jamais soumise au token applicatif
+            continue
+        headers = {"If-None-Match": etag} if etag else {}
+        requests[contract_id] = (
+            f"/shares/{graph.encode_sharing_url(url)}/driveItem?$select={DRIVE_ITEM_SELECT}",
+            headers
+        )
+
+    results = await graph.batch_get(requests) if requests else {}
+
+    rows = []
+    summary: Dict[str, int] = {}
+    for contract_id, _, etag, size in links:
+        code, item = results.get(contract_id, (0, {}))
+        if code == 200:
+            row_status, row_size, row_etag = "ok", item.get("size"), item.get("eTag")
+        elif code == 304:
+            row_status, row_size, row_etag = "ok", size, etag
+        elif code == 404:
+            row_status, row_size, row_etag = "not_found", None, None
+        else:
+            # Erreur transitoire : l'eTag connu est conservé
+            row_status, row_size, row_etag = "error", size, etag
+        summary[row_status] = summary.get(row_status, 0) + 1
+        rows.append({
+            "b_contract_id": contract_id,
+            "b_status": row_status,
+            "b_size": row_size,
+            "b_etag": row_etag,
+            "b_checked_at": checked_at,
+        })
+
+    await run_in_threadpool(_store_results, rows, checked_at)
+    return summary
+
+
+async def run_link_health_check() -> None:
+    """Tâche planifiée : contrôle les liens et journalise le résumé."""
+    summary = await scan_document_links()
+    logger.info(
+        "Contrôle des liens SharePoint terminé: %s", summary,
+        extra={"summary": summary}
+    )
@@ -0,0 +1,207 @@
+"""
+Instantané versionné de la timeline des contrats.
+
+La timeline est construite une fois, puis gardée déjà encodée (JSON et sa
+variante gzip) : une lecture ne fait que renvoyer ces octets. L'instantané
+est reconstruit lorsque :
+- la version partagée (table `cache_versions`) change : chaque création,
+  modification ou suppression de contrat l'incrémente dans sa transaction ;
+- la date change (couleurs et préavis dépendent du jour).
+
+Le worker qui écrit voit la nouvelle version immédiatement ; les autres la
+relisent au plus toutes les `contract_timeline_version_check_seconds`.
+"""
+import gzip
+import hashlib
+import time
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Callable, Mapping, Optional
+
+from fastapi import Response, status
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.caching import SingleFlightCache
+from app.database import SessionLocal
+from app.metrics import cache_requests_total
+from app.models.cache_version import CacheVersion
+
+TIMELINE_CACHE_NAME = "contract_timeline"
+
+_GZIP_LEVEL = 6
+
+
+def read_cache_version(db: Session, name: str) -> int:
+    """Version courante d'un cache partagé (0 si jamais incrémentée)."""
+    version = db.execute(select(CacheVersion.version).where(CacheVersion.name == name)).scalar()
+    return version or 0
+
+
+def bump_cache_version(db: Session, name: str) -> None:
+    """
+    Incrémente la version d'un cache partagé, dans la transaction de
+    l'écriture qui le rend obsolète (validée avec elle).
+
+    Args:
+        db: Session de l'écriture
+        name: Nom du cache
+    """
+    now = datetime.utcnow()
+    result = db.execute(
+        update(CacheVersion)
+        .where(CacheVersion.name == name)
+        .values(version=CacheVersion.version + 1, updated_at=now)
+    )
+    if result.rowcount == 0:
+        db.execute(insert(CacheVersion).values(name=name, version=1, updated_at=now))
+
+
+def _accepts_gzip(accept_encoding: str) -> bool:
+    for coding in accept_encoding.split(","):
+        name, _, params = coding.strip().partition(";")
+        if name.strip().lower() == "gzip":
+            return params.replace(" ", "").lower() not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+@dataclass(frozen=True)
+class TimelineSnapshot:
+    """Timeline encodée pour une version et une date données."""
+    version: int
+    as_of: date
+    body: bytes
+    gzip_body: bytes
+    etag: str
+
+    @property
+    def gzip_etag(self) -> str:
+        return self.etag[:-1] + '-gzip"'
+
+    def response(self, request_headers: Mapping[str, str]) -> Response:
+        """
+        Réponse HTTP de l'instantané : 304 si le client l'a déjà, corps gzip
+        si accepté, sinon JSON brut.
+
+        Args:
+            request_headers: En-têtes de la requête
+
+        Returns:
+            Response: Réponse prête à l'envoi
+        """
+        use_gzip = _accepts_gzip(request_headers.get("accept-encoding", ""))
+        headers = {
+            "ETag": self.gzip_etag if use_gzip else self.etag,
+            "Cache-Control": "no-cache",
+            "Vary": "Accept-Encoding",
+        }
+        if_none_match = request_headers.get("if-none-match", "")
+        known = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        if self.etag in known or self.gzip_etag in known or "*" in known:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        if use_gzip:
+            headers["Content-Encoding"] = "gzip"
+            return Response(self.gzip_body, media_type="application/json", headers=headers)
+        return Response(self.body, media_type="application/json", headers=headers)
+
+
+class TimelineSnapshotStore:
+    """
+    Instantané courant de la timeline et version partagée connue du worker.
+
+    Args:
+        encode: Construit et encode (JSON) la timeline à une date, avec une
+            session de base de données
+        name: Nom du cache dans `cache_versions`
+        version_check_seconds: Intervalle de relecture de la version partagée
+        session_factory: Fabrique des sessions des reconstructions ; une
+            reconstruction partagée par plusieurs requêtes n'emprunte jamais
+            la session de l'une d'elles (fermée si son client se déconnecte)
+    """
+
+    def __init__(
+        self,
+        encode: Callable[[Session, date], bytes],
+        name: str = TIMELINE_CACHE_NAME,
+        version_check_seconds: float = 1.0,
+        session_factory: Callable[[], Session] = SessionLocal
+    ):
+        self.encode = encode
+        self.name = name
+        self.version_check_seconds = version_check_seconds
+        self.session_factory = session_factory
+        self._snapshot: Optional[TimelineSnapshot] = None
+        self._version: Optional[int] = None
+        self._version_checked_at = 0.0
+        self._generation = 0
+        # Regroupement des reconstructions concurrentes (rien n'y est conservé)
+        self._refreshes = SingleFlightCache("timeline_refresh", ttl_seconds=0)
+
+    @property
+    def snapshot(self) -> Optional[TimelineSnapshot]:
+        return self._snapshot
+
+    def invalidate(self) -> None:
+        """Force la relecture de la version partagée (écriture de ce worker)."""
+        self._generation += 1
+        self._version = None
+
+    def _fresh_snapshot(self, today: date) -> Optional[TimelineSnapshot]:
+        snapshot = self._snapshot
+        if (
+            snapshot is not None
+            and self._version is not None
+            and time.monotonic() - self._version_checked_at < self.version_check_seconds
+            and snapshot.version == self._version
+            and snapshot.as_of == today
+        ):
+            return snapshot
+        return None
+
+    def _refresh(self, today: date, generation: int) -> TimelineSnapshot:
+        db = self.session_factory()
+        try:
+            # Version lue avant les contrats : un instantané ne peut être plus
+            # ancien que sa version (au pire, une reconstruction de trop)
+            version = read_cache_version(db, self.name)
+            if generation == self._generation:
+                self._version = version
+                self._version_checked_at = time.monotonic()
+            snapshot = self._snapshot
+            if snapshot is not None and snapshot.version == version and snapshot.as_of == today:
+                cache_requests_total.inc(cache="timeline", result="hit")
+                return snapshot
+            cache_requests_total.inc(cache="timeline", result="miss")
+            body = self.encode(db, today)
+        finally:
+            db.close()
+
+        snapshot = TimelineSnapshot(
+            version=version,
+            as_of=today,
+            body=body,
+            gzip_body=gzip.compress(body, compresslevel=_GZIP_LEVEL, mtime=0),
+            etag='"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"',
+        )
+        self._snapshot = snapshot
+        return snapshot
+
+    async def get(self) -> TimelineSnapshot:
+        """
+        Retourne l'instantané du jour, reconstruit hors de la boucle
+        d'événements s'il est obsolète (session dédiée, ouverte et fermée
+        dans le thread de reconstruction).
+
+        Returns:
+            TimelineSnapshot: Instantané à jour
+        """
+        today = date.today()
+        snapshot = self._fresh_snapshot(today)
+        if snapshot is not None:
+            cache_requests_total.inc(cache="timeline", result="hit")
+            return snapshot
+        generation = self._generation
+        return await self._refreshes.get_or_load(
+            today, lambda: run_in_threadpool(self._refresh, today, generation)
+        )
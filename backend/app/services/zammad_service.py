@@ -1,18 +1,45 @@
 """
 Service pour interagir avec l'API Zammad.
 """
+import asyncio
+import logging
+import threading
 import httpx
-from typing import List, Dict
-from datetime import datetime, date
+from typing import List, Dict, Optional, Tuple
+from datetime import datetime, date, timedelta
 from collections import defaultdict
+from app.caching import SingleFlightCache
 from app.config import settings
+from app.metrics import track_upstream
+from app.logging_config import debug_sampled
+from app.tracing import SPAN_KIND_CLIENT, inject_traceparent, start_span
 from app.models.ticket import Ticket, TicketStats
 
+logger = logging.getLogger(__name__)
+
+# Période par défaut des statistiques de tickets clos
+DEFAULT_STATS_DAYS = 30
+
+
+def default_stats_period(end_date: Optional[date] = None) -> Tuple[date, date]:
+    """
+    Période par défaut des statistiques : les 30 jours précédant `end_date`
+    (aujourd'hui par défaut).
+    
+    Returns:
+        Tuple[date, date]: Dates de début et de fin
+    """
+    end_date = end_date or date.today()
+    return end_date - timedelta(days=DEFAULT_STATS_DAYS), end_date
+
 
 class ZammadService:
     """
     Service pour interagir avec l'API Zammad.
     Gère la récupération des tickets et le calcul des statistiques.
+    
+    Les connexions HTTP sont mutualisées (client partagé) et les tickets
+    projet et statistiques sont gardés en cache `zammad_cache_ttl_seconds`.
     """
     
     def __init__(self):
@@ -23,14 +50,42 @@ class ZammadService:
             "Authorization": f"Token token={self.api_token}",
             "Content-Type": "application/json"
         }
+        self.cache = SingleFlightCache("zammad", settings.zammad_cache_ttl_seconds)
+        self._http: Optional[httpx.AsyncClient] = None
+    
+    @property
+    def http(self) -> httpx.AsyncClient:
+        """Client HTTP partagé, créé à la première utilisation."""
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.AsyncClient(
+                timeout=httpx.Timeout(30.0),
+                limits=httpx.Limits(
+                    max_connections=settings.zammad_http_max_connections,
+                    max_keepalive_connections=settings.zammad_http_max_keepalive
+                )
+            )
+        return self._http
     
-    async def _make_request(self, endpoint: str, params: Dict = None) -> Dict:
+    async def aclose(self) -> None:
+        """Ferme le client HTTP."""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+    
+    async def _make_request(
+        self,
+        endpoint: str,
+        params: Dict = None,
+        metric_endpoint: Optional[str] = None
+    ) -> Dict:
         """
         Effectue une requête HTTP vers l'API Zammad.
         
         Args:
             endpoint: Endpoint de l'API (ex: "/api/v1/tickets")
             params: Paramètres de requête optionnels
+            metric_endpoint: Libellé de l'endpoint pour les métriques, sans
+                identifiant variable (par défaut `endpoint`)
         
         Returns:
             Dict: Réponse JSON de l'API
@@ -39,18 +94,38 @@ class ZammadService:
             httpx.HTTPError: En cas d'erreur HTTP
         """
         url = f"{self.api_url}{endpoint}"
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=self.headers, params=params, timeout=30.0)
-            response.raise_for_status()
-            return response.json()
+        label = metric_endpoint or endpoint
+        with track_upstream("zammad", label):
+            with start_span(f"zammad GET {label}", kind=SPAN_KIND_CLIENT, **{"peer.service": "zammad"}):
+                headers = inject_traceparent(dict(self.headers))
+                response = await self.http.get(url, headers=headers, params=params)
+                response.raise_for_status()
+                debug_sampled(
+                    logger, "Zammad GET %s -> %d (%d octets)",
+                    label, response.status_code, len(response.content)
+                )
+                return response.json()
     
     async def get_project_tickets(self) -> List[Ticket]:
         """
-        Récupère tous les tickets avec le tag #Projet.
+        Récupère tous les tickets avec le tag #Projet (en cache).
         
         Returns:
             List[Ticket]: Liste des tickets projet
         """
+        try:
+            return await self.cache.get_or_load("project_tickets", self._fetch_project_tickets)
+        except httpx.HTTPError as e:
+            logger.error("Erreur lors de la récupération des tickets projet: %s", e)
+            return []
+    
+    async def _fetch_project_tickets(self) -> List[Ticket]:
+        """
+        Interroge Zammad pour les tickets projet.
+        
+        Raises:
+            httpx.HTTPError: En cas d'erreur HTTP
+        """
         # Recherche des tickets avec le tag spécifique
         search_query = f"tags:{self.project_tag}"
         params = {
@@ -59,43 +134,38 @@ class ZammadService:
             "expand": "true"
         }
         
-        try:
-            data = await self._make_request("/api/v1/tickets/search", params)
-            
-            tickets = []
-            # Gestion du format de réponse (List ou Dict avec assets)
-            tickets_source = data
-            if isinstance(data, dict):
-                tickets_source = data.get("assets", {}).get("Ticket", {}).values()
-            
-            for ticket_data in tickets_source:
-                if not isinstance(ticket_data, dict):
-                    continue
-                    
-                # Conversion des dates
-                created_at = datetime.fromisoformat(ticket_data["created_at"].replace("Z", "+00:00"))
-                updated_at = datetime.fromisoformat(ticket_data["updated_at"].replace("Z", "+00:00"))
-                close_at = None
-                if ticket_data.get("close_at"):
-                    close_at = datetime.fromisoformat(ticket_data["close_at"].replace("Z", "+00:00"))
+        data = await self._make_request("/api/v1/tickets/search", params)
+        
+        tickets = []
+        # Gestion du format de réponse (List ou Dict avec assets)
+        tickets_source = data
+        if isinstance(data, dict):
+            tickets_source = data.get("assets", {}).get("Ticket", {}).values()
+        
+        for ticket_data in tickets_source:
+            if not isinstance(ticket_data, dict):
+                continue
                 
-                ticket = Ticket(
-                    id=ticket_data["id"],
-                    title=ticket_data["title"],
-                    state=ticket_data.get("state", "unknown"),
-                    tags=ticket_data.get("tags", []),
-                    created_at=created_at,
-                    updated_at=updated_at,
-                    close_at=close_at,
-                    priority=ticket_data.get("priority", "normal")
-                )
-                tickets.append(ticket)
+            # Conversion des dates
+            created_at = datetime.fromisoformat(ticket_data["created_at"].replace("Z", "+00:00"))
+            updated_at = datetime.fromisoformat(ticket_data["updated_at"].replace("Z", "+00:00"))
+            close_at = None
+            if ticket_data.get("close_at"):
+                close_at = datetime.fromisoformat(ticket_data["close_at"].replace("Z", "+00:00"))
             
-            return tickets
+            ticket = Ticket(
+                id=ticket_data["id"],
+                title=ticket_data["title"],
+                state=ticket_data.get("state", "unknown"),
+                tags=ticket_data.get("tags", []),
+                created_at=created_at,
+                updated_at=updated_at,
+                close_at=close_at,
+                priority=ticket_data.get("priority", "normal")
+            )
+            tickets.append(ticket)
         
-        except httpx.HTTPError as e:
-            print(f"Erreur lors de la récupération des tickets projet: {e}")
-            return []
+        return tickets
     
     async def get_closed_tickets_stats(
         self, 
@@ -104,7 +174,7 @@ class ZammadService:
         exclude_project_tag: bool = True
     ) -> List[TicketStats]:
         """
-        Récupère les statistiques des tickets clos pour l'histogramme.
+        Récupère les statistiques des tickets clos pour l'histogramme (en cache).
         Exclut les tickets avec le tag #Projet par défaut.
         
         Args:
@@ -115,6 +185,36 @@ class ZammadService:
         Returns:
             List[TicketStats]: Statistiques par jour
         """
+        try:
+            return await self._load_closed_tickets_stats(start_date, end_date, exclude_project_tag)
+        except httpx.HTTPError as e:
+            logger.error("Erreur lors de la récupération des statistiques: %s", e)
+            return []
+    
+    async def _load_closed_tickets_stats(
+        self,
+        start_date: date,
+        end_date: date,
+        exclude_project_tag: bool
+    ) -> List[TicketStats]:
+        """Statistiques depuis le cache ou Zammad (erreurs HTTP propagées)."""
+        return await self.cache.get_or_load(
+            ("closed_stats", start_date, end_date, exclude_project_tag),
+            lambda: self._fetch_closed_tickets_stats(start_date, end_date, exclude_project_tag)
+        )
+    
+    async def _fetch_closed_tickets_stats(
+        self,
+        start_date: date,
+        end_date: date,
+        exclude_project_tag: bool
+    ) -> List[TicketStats]:
+        """
+        Interroge Zammad pour les tickets clos de la période et les compte par jour.
+        
+        Raises:
+            httpx.HTTPError: En cas d'erreur HTTP
+        """
         # Construction de la requête de recherche
         search_query = f"state:closed AND close_at:[{start_date.isoformat()} TO {end_date.isoformat()}]"
         if exclude_project_tag:
@@ -126,38 +226,54 @@ class ZammadService:
             "expand": "true"
         }
         
-        try:
-            data = await self._make_request("/api/v1/tickets/search", params)
-            
-            # Comptage par jour
-            daily_counts = defaultdict(int)
-            
-            # Gestion du format de réponse (List ou Dict avec assets)
-            tickets_source = data
-            if isinstance(data, dict):
-                tickets_source = data.get("assets", {}).get("Ticket", {}).values()
-            
-            for ticket_data in tickets_source:
-                if not isinstance(ticket_data, dict):
-                    continue
-                    
-                if ticket_data.get("close_at"):
-                    close_date = datetime.fromisoformat(
-                        ticket_data["close_at"].replace("Z", "+00:00")
-                    ).date()
-                    daily_counts[close_date.isoformat()] += 1
-            
-            # Conversion en liste de TicketStats
-            stats = [
-                TicketStats(date=date_str, count=count)
-                for date_str, count in sorted(daily_counts.items())
-            ]
-            
-            return stats
+        data = await self._make_request("/api/v1/tickets/search", params)
         
-        except httpx.HTTPError as e:
-            print(f"Erreur lors de la récupération des statistiques: {e}")
-            return []
+        # Comptage par jour
+        daily_counts = defaultdict(int)
+        
+        # Gestion du format de réponse (List ou Dict avec assets)
+        tickets_source = data
+        if isinstance(data, dict):
+            tickets_source = data.get("assets", {}).get("Ticket", {}).values()
+        
+        for ticket_data in tickets_source:
+            if not isinstance(ticket_data, dict):
+                continue
+                
+            if ticket_data.get("close_at"):
+                close_date = datetime.fromisoformat(
+                    ticket_data["close_at"].replace("Z", "+00:00")
+                ).date()
+                daily_counts[close_date.isoformat()] += 1
+        
+        # Conversion en liste de TicketStats
+        return [
+            TicketStats(date=date_str, count=count)
+            for date_str, count in sorted(daily_counts.items())
+        ]
+    
+    async def ping(self) -> None:
+        """
+        Vérifie l'accès à l'API (profil de l'utilisateur du token).
+        
+        Raises:
+            httpx.HTTPError: En cas d'erreur HTTP
+        """
+        await self._make_request("/api/v1/users/me")
+    
+    async def warm_up(self) -> None:
+        """
+        Précharge le cache : tickets projet et statistiques de la période par
+        défaut (ouvre au passage les connexions vers Zammad).
+        
+        Raises:
+            httpx.HTTPError: En cas d'erreur HTTP
+        """
+        start_date, end_date = default_stats_period()
+        await asyncio.gather(
+            self.cache.get_or_load("project_tickets", self._fetch_project_tickets),
+            self._load_closed_tickets_stats(start_date, end_date, True)
+        )
     
     async def get_ticket_by_id(self, ticket_id: int) -> Ticket | None:
         """
@@ -170,7 +286,10 @@ class ZammadService:
             Ticket | None: Le ticket ou None si non trouvé
         """
         try:
-            data = await self._make_request(f"/api/v1/tickets/{ticket_id}")
+            data = await self._make_request(
+                f"/api/v1/tickets/{ticket_id}",
+                metric_endpoint="/api/v1/tickets/{id}"
+            )
             
             created_at = datetime.fromisoformat(data["created_at"].replace("Z", "+00:00"))
             updated_at = datetime.fromisoformat(data["updated_at"].replace("Z", "+00:00"))
@@ -190,5 +309,36 @@ class ZammadService:
             )
         
         except httpx.HTTPError as e:
-            print(f"Erreur lors de la récupération du ticket {ticket_id}: {e}")
+            logger.error(
+                "Erreur lors de la récupération du ticket %s: %s", ticket_id, e,
+                extra={"ticket_id": ticket_id}
+            )
             return None
+
+
+# Instance unique pour la durée de vie du processus
+_zammad_service: Optional[ZammadService] = None
+_zammad_service_lock = threading.Lock()
+
+
+def get_zammad_service() -> ZammadService:
+    """
+    Retourne l'instance partagée du service Zammad.
+    
+    Returns:
+        ZammadService: Service Zammad du processus
+    """
+    global _zammad_service
+    if _zammad_service is None:
+        with _zammad_service_lock:
+            if _zammad_service is None:
+                _zammad_service = ZammadService()
+    return _zammad_service
+
+
+async def close_zammad_service() -> None:
+    """Libère les ressources du service Zammad partagé (arrêt de l'application)."""
+    global _zammad_service
+    if _zammad_service is not None:
+        await _zammad_service.aclose()
+        _zammad_service = None
@@ -0,0 +1,148 @@
+"""
+Stockage des états CSRF du flux SSO avec expiration.
+"""
+import heapq
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import delete
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.oauth_state import OAuthState
+
+
+class StateStore(ABC):
+    """Interface d'un stockage d'états CSRF à usage unique."""
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+
+    @abstractmethod
+    def put(self, state: str) -> None:
+        """
+        Enregistre un nouvel état.
+
+        Args:
+            state: État CSRF généré
+        """
+
+    @abstractmethod
+    def consume(self, state: str) -> bool:
+        """
+        Consomme un état : il est supprimé et ne peut plus être réutilisé.
+
+        Args:
+            state: État CSRF reçu au callback
+
+        Returns:
+            bool: True si l'état existait et n'était pas expiré
+        """
+
+
+class InMemoryStateStore(StateStore):
+    """
+    États en mémoire (un seul worker).
+    Insertion et consommation en O(1) ; l'expiration est amortie grâce à un
+    tas ordonné par date d'expiration, purgé par le début à chaque appel.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        super().__init__(ttl_seconds)
+        self._states: Dict[str, float] = {}
+        self._expiry_heap: List[Tuple[float, str]] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def _purge_expired(self, now: float) -> None:
+        while self._expiry_heap and self._expiry_heap[0][0] <= now:
+            expires_at, state = heapq.heappop(self._expiry_heap)
+            # L'état a pu être consommé entre-temps
+            if self._states.get(state) == expires_at:
+                del self._states[state]
+
+    def put(self, state: str) -> None:
+        now = time.monotonic()
+        expires_at = now + self.ttl_seconds
+        with self._lock:
+            self._purge_expired(now)
+            self._states[state] = expires_at
+            heapq.heappush(self._expiry_heap, (expires_at, state))
+
+    def consume(self, state: str) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            self._purge_expired(now)
+            expires_at = self._states.pop(state, None)
+        return expires_at is not None and expires_at > now
+
+
+class DatabaseStateStore(StateStore):
+    """
+    États stockés dans PostgreSQL (table `oauth_states`), partagés entre workers.
+    La consommation est un DELETE atomique ; les états expirés sont purgés
+    au plus une fois par `cleanup_interval_seconds`.
+    """
+
+    def __init__(self, ttl_seconds: float, cleanup_interval_seconds: float = 60.0):
+        super().__init__(ttl_seconds)
+        self.cleanup_interval_seconds = cleanup_interval_seconds
+        self._last_cleanup = float("-inf")
+
+    def _maybe_cleanup(self, db) -> None:
+        now = time.monotonic()
+        if now - self._last_cleanup < self.cleanup_interval_seconds:
+            return
+        self._last_cleanup = now
+        db.execute(delete(OAuthState).where(OAuthState.expires_at <= datetime.utcnow()))
+
+    def put(self, state: str) -> None:
+        db = SessionLocal()
+        try:
+            self._maybe_cleanup(db)
+            db.add(OAuthState(
+                state=state,
+                expires_at=datetime.utcnow() + timedelta(seconds=self.ttl_seconds)
+            ))
+            db.commit()
+        finally:
+            db.close()
+
+    def consume(self, state: str) -> bool:
+        db = SessionLocal()
+        try:
+            result = db.execute(
+                delete(OAuthState).where(
+                    OAuthState.state == state,
+                    OAuthState.expires_at > datetime.utcnow()
+                )
+            )
+            self._maybe_cleanup(db)
+            db.commit()
+            return result.rowcount == 1
+        finally:
+            db.close()
+
+
+_state_store: Optional[StateStore] = None
+
+
+def get_state_store() -> StateStore:
+    """
+    Retourne le stockage d'états configuré (`csrf_state_backend`).
+
+    Returns:
+        StateStore: Stockage "database" (partagé) ou "memory" (un seul worker)
+    """
+    global _state_store
+    if _state_store is None:
+        if settings.csrf_state_backend == "memory":
+            _state_store = InMemoryStateStore(settings.csrf_state_ttl_seconds)
+        else:
+            _state_store = DatabaseStateStore(settings.csrf_state_ttl_seconds)
+    return _state_store
@@ -0,0 +1,506 @@
+"""
+Traçage distribué minimal (spans W3C Trace Context).
+
+Chaque requête HTTP ouvre un span serveur (en reprenant l'en-tête
+`traceparent` entrant) ; les handlers de routes, la sérialisation, les
+appels Zammad/Graph et les requêtes SQL y rattachent des spans enfants via
+une variable de contexte. Les appels sortants propagent `traceparent`, avec
+la décision d'échantillonnage réelle (drapeau `sampled`) : une requête non
+échantillonnée transmet sa trace sans produire de spans.
+Les spans terminés sont exportés par un thread dédié au format OTLP/JSON
+(une requête d'export par ligne), lisible hors ligne ou par le récepteur
+`otlpjsonfile` d'un collecteur OpenTelemetry.
+"""
+import inspect
+import json
+import logging
+import os
+import queue
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import Headers
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+from app.monitoring import UNMATCHED_ROUTE, route_template
+
+logger = logging.getLogger(__name__)
+
+# Types de span OTLP
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+
+# Statuts de span OTLP
+STATUS_UNSET = 0
+STATUS_ERROR = 2
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+
+@dataclass
+class Span:
+    """Opération chronométrée d'une trace."""
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str] = None
+    kind: int = SPAN_KIND_INTERNAL
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: Optional[int] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    status: int = STATUS_UNSET
+    status_message: str = ""
+    sampled: bool = True
+
+    @property
+    def traceparent(self) -> str:
+        """En-tête W3C `traceparent` désignant ce span comme parent."""
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Ajoute un attribut au span."""
+        self.attributes[key] = value
+
+    def record_error(self, exc: BaseException) -> None:
+        """Marque le span en erreur."""
+        self.status = STATUS_ERROR
+        self.status_message = f"{type(exc).__name__}: {exc}"
+
+    def end(self, end_ns: Optional[int] = None) -> None:
+        """Termine le span et le transmet à l'exportateur (s'il est échantillonné)."""
+        if self.end_ns is None:
+            self.end_ns = end_ns or time.time_ns()
+            if self.sampled:
+                _exporter.export(self)
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    """Span actif dans le contexte courant (None hors trace, échantillonnée ou non)."""
+    return _current_span.get()
+
+
+def _sampled_parent() -> Optional[Span]:
+    """Span actif s'il est échantillonné (parent des spans enfants)."""
+    span = _current_span.get()
+    return span if span is not None and span.sampled else None
+
+
+def _new_id(bits: int) -> str:
+    return f"{random.getrandbits(bits):0{bits // 4}x}"
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[tuple]:
+    """
+    Décode un en-tête `traceparent` (version 00).
+
+    Args:
+        value: Valeur de l'en-tête
+
+    Returns:
+        tuple | None: (trace_id, span_id parent, échantillonné) ou None si invalide
+    """
+    match = _TRACEPARENT.match((value or "").strip().lower())
+    if not match or match.group(1) == "0" * 32 or match.group(2) == "0" * 16:
+        return None
+    return match.group(1), match.group(2), bool(int(match.group(3), 16) & 0x01)
+
+
+@contextmanager
+def start_span(name: str, kind: int = SPAN_KIND_INTERNAL, **attributes: Any) -> Iterator[Optional[Span]]:
+    """
+    Ouvre un span enfant du span courant pour la durée du bloc.
+    Hors trace (traçage désactivé ou requête non échantillonnée), aucun span
+    n'est créé et le bloc reçoit None.
+
+    Args:
+        name: Nom de l'opération
+        kind: Type de span (interne, client...)
+        **attributes: Attributs du span
+    """
+    parent = _sampled_parent()
+    if parent is None:
+        yield None
+        return
+    span = Span(
+        name=name,
+        trace_id=parent.trace_id,
+        span_id=_new_id(64),
+        parent_id=parent.span_id,
+        kind=kind,
+        attributes=attributes,
+    )
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as exc:
+        span.record_error(exc)
+        raise
+    finally:
+        _current_span.reset(token)
+        span.end()
+
+
+def inject_traceparent(headers: Dict[str, str]) -> Dict[str, str]:
+    """
+    Ajoute l'en-tête `traceparent` du span courant à des en-têtes sortants.
+
+    Args:
+        headers: En-têtes de la requête sortante (modifiés en place)
+
+    Returns:
+        Dict[str, str]: Les mêmes en-têtes
+    """
+    span = _current_span.get()
+    if span is not None:
+        headers["traceparent"] = span.traceparent
+    return headers
+
+
+async def httpx_inject_traceparent(request) -> None:
+    """Hook de requête httpx propageant `traceparent` (clients mutualisés)."""
+    span = _current_span.get()
+    if span is not None:
+        request.headers["traceparent"] = span.traceparent
+
+
+def _attribute_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _attributes(values: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": key, "value": _attribute_value(value)} for key, value in values.items()]
+
+
+def to_otlp(spans: List[Span], service_name: str) -> Dict[str, Any]:
+    """
+    Encode des spans en requête d'export OTLP/JSON (ExportTraceServiceRequest).
+
+    Args:
+        spans: Spans terminés
+        service_name: Valeur de l'attribut de ressource `service.name`
+
+    Returns:
+        Dict: Document OTLP/JSON
+    """
+    encoded = []
+    for span in spans:
+        item = {
+            "traceId": span.trace_id,
+            "spanId": span.span_id,
+            "name": span.name,
+            "kind": span.kind,
+            "startTimeUnixNano": str(span.start_ns),
+            "endTimeUnixNano": str(span.end_ns),
+            "attributes": _attributes(span.attributes),
+            "status": {"code": span.status},
+        }
+        if span.parent_id:
+            item["parentSpanId"] = span.parent_id
+        if span.status_message:
+            item["status"]["message"] = span.status_message
+        encoded.append(item)
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": _attributes({"service.name": service_name})},
+            "scopeSpans": [{"scope": {"name": __name__}, "spans": encoded}],
+        }]
+    }
+
+
+class FileSpanExporter:
+    """
+    Exportateur de spans vers un fichier OTLP/JSON (une ligne par lot).
+    L'écriture a lieu dans un thread dédié ; au-delà de `max_queue` spans en
+    attente, les nouveaux spans sont abandonnés plutôt que de ralentir les
+    requêtes.
+    """
+
+    def __init__(self, max_queue: int = 10000, batch_size: int = 512, flush_interval: float = 1.0):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._queue: "queue.Queue[Optional[Span]]" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        """Met un span terminé en file d'export."""
+        if not settings.tracing_enabled:
+            return
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        stop = False
+        while not stop:
+            batch: List[Span] = []
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    span = self._queue.get(timeout=max(deadline - time.monotonic(), 0.01))
+                except queue.Empty:
+                    break
+                if span is None:
+                    stop = True
+                    break
+                batch.append(span)
+            if batch:
+                try:
+                    self._write(batch)
+                except OSError as e:
+                    logger.warning("Erreur lors de l'export des spans: %s", e)
+
+    def _write(self, spans: List[Span]) -> None:
+        path = settings.tracing_export_path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Rotation simple : le fichier plein est renommé en `.1`
+        if os.path.exists(path) and os.path.getsize(path) >= settings.tracing_export_max_bytes:
+            os.replace(path, f"{path}.1")
+        line = json.dumps(to_otlp(spans, settings.app_name), separators=(",", ":"))
+        with open(path, "a", encoding="utf-8") as export_file:
+            export_file.write(line + "\n")
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """Exporte les spans en attente puis arrête le thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join(timeout)
+
+
+_exporter = FileSpanExporter()
+
+
+def shutdown_tracing() -> None:
+    """Vide la file d'export (arrêt de l'application)."""
+    _exporter.shutdown()
+
+
+class TracingMiddleware:
+    """
+    Middleware ASGI ouvrant le span serveur de chaque requête HTTP.
+
+    Une trace entrante (`traceparent`) est poursuivie (même identifiant) et
+    son drapeau `sampled` respecté : une trace non échantillonnée en amont
+    ne l'est pas ici. Une trace échantillonnée n'est suivie d'office que si
+    elle provient d'une adresse de confiance (`tracing_trusted_ips`) ; sinon,
+    comme une requête sans trace, elle est échantillonnée selon
+    `tracing_sample_rate` (un client ne peut forcer le traçage de ses requêtes).
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    @staticmethod
+    def _sampled(scope: Scope, parent: Optional[tuple]) -> bool:
+        if parent is not None:
+            if not parent[2]:
+                return False
+            client = scope.get("client")
+            if client and client[0] in settings.tracing_trusted_ips:
+                return True
+        return random.random() < settings.tracing_sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        parent = parse_traceparent(Headers(scope=scope).get("traceparent"))
+        trace_id, parent_id = parent[:2] if parent else (_new_id(128), None)
+        if not self._sampled(scope, parent):
+            # Contexte propagé (drapeau 00) et identifiant de trace journalisé,
+            # sans span exporté ni instrumentation
+            token = _current_span.set(Span(
+                name="unsampled",
+                trace_id=trace_id,
+                span_id=_new_id(64),
+                parent_id=parent_id,
+                sampled=False,
+            ))
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                _current_span.reset(token)
+            return
+
+        span = Span(
+            name=f"{scope['method']} {scope['path']}",
+            trace_id=trace_id,
+            span_id=_new_id(64),
+            parent_id=parent_id,
+            kind=SPAN_KIND_SERVER,
+            attributes={"http.method": scope["method"], "http.target": scope["path"]},
+        )
+        token = _current_span.set(span)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                span.set_attribute("http.status_code", message["status"])
+                if message["status"] >= 500:
+                    span.status = STATUS_ERROR
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException as exc:
+            span.record_error(exc)
+            raise
+        finally:
+            _current_span.reset(token)
+            route = route_template(scope)
+            if route != UNMATCHED_ROUTE:
+                span.name = f"{scope['method']} {route}"
+                span.set_attribute("http.route", route)
+            span.end()
+
+
+class TracedRoute(APIRoute):
+    """
+    Route FastAPI découpée en spans : `handler` (dépendances comprises),
+    `endpoint` (fonction de la route) et `serialize` (validation et
+    encodage de la réponse après le retour de l'endpoint).
+    """
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs: Any):
+        super().__init__(path, endpoint, **kwargs)
+        call = self.dependant.call
+        route_path = self.path_format
+
+        if inspect.iscoroutinefunction(call):
+            async def traced_call(*args, **kw):
+                with start_span(f"endpoint {route_path}"):
+                    try:
+                        return await call(*args, **kw)
+                    finally:
+                        _mark_endpoint_end()
+        else:
+            def traced_call(*args, **kw):
+                with start_span(f"endpoint {route_path}"):
+                    try:
+                        return call(*args, **kw)
+                    finally:
+                        _mark_endpoint_end()
+
+        self.dependant.call = traced_call
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        route = self
+
+        async def traced_handler(request: Request):
+            parent = _sampled_parent()
+            if parent is None:
+                return await handler(request)
+            timings: Dict[str, int] = {}
+            timings_token = _endpoint_timings.set(timings)
+            try:
+                with start_span(f"handler {route.path}", **{"http.route": route.path}) as span:
+                    response = await handler(request)
+                    if "endpoint_end_ns" in timings:
+                        Span(
+                            name=f"serialize {route.path}",
+                            trace_id=span.trace_id,
+                            span_id=_new_id(64),
+                            parent_id=span.span_id,
+                            start_ns=timings["endpoint_end_ns"],
+                        ).end()
+                    return response
+            finally:
+                _endpoint_timings.reset(timings_token)
+
+        return traced_handler
+
+
+# Fin de l'endpoint de la requête en cours (début de la sérialisation) ;
+# le dictionnaire est partagé avec le thread des endpoints synchrones
+_endpoint_timings: ContextVar[Optional[Dict[str, int]]] = ContextVar("endpoint_timings", default=None)
+
+
+def _mark_endpoint_end() -> None:
+    timings = _endpoint_timings.get()
+    if timings is not None:
+        timings["endpoint_end_ns"] = time.time_ns()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_query_span(conn, cursor, statement, parameters, context, executemany):
+    parent = _sampled_parent()
+    span = None
+    if parent is not None:
+        span = Span(
+            name="db.query",
+            trace_id=parent.trace_id,
+            span_id=_new_id(64),
+            parent_id=parent.span_id,
+            kind=SPAN_KIND_CLIENT,
+            attributes={
+                "db.system": conn.engine.dialect.name,
+                "db.statement": " ".join(statement.split())[:1000],
+            },
+        )
+    conn.info.setdefault("trace_spans", []).append(span)
+    if context is not None:
+        context.query_span_started = True
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _end_query_span(conn, cursor, statement, parameters, context, executemany):
+    span = conn.info["trace_spans"].pop()
+    if span is not None:
+        span.end()
+
+
+@event.listens_for(Engine, "handle_error")
+def _fail_query_span(exception_context):
+    """
+    Instruction en échec : termine son span (`after_cursor_execute` n'est
+    pas appelé). Un échec antérieur à `before_cursor_execute` (connexion,
+    compilation) n'a pas de span et ne doit pas fermer celui d'une autre
+    instruction.
+    """
+    context = exception_context.execution_context
+    conn = exception_context.connection
+    if conn is None or not getattr(context, "query_span_started", False):
+        return
+    spans = conn.info.get("trace_spans")
+    if spans:
+        span = spans.pop()
+        if span is not None:
+            span.record_error(exception_context.original_exception)
+            span.end()
@@ -0,0 +1,168 @@
+"""
+Préchauffage au démarrage et état de disponibilité (readiness) du worker.
+
+Avant de se déclarer prêt, chaque worker ouvre ses pools de connexions
+(base de données, client HTTP Zammad) et remplit les caches consultés par
+la page d'accueil : tickets projet, statistiques des 30 derniers jours et
+timeline des contrats. Les étapes s'exécutent en parallèle dans un budget
+de temps (`warmup_budget_seconds`) : une étape qui le dépasse est
+abandonnée et le worker se déclare prêt malgré tout, ses caches se
+remplissant alors à la première requête.
+"""
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Optional
+
+from sqlalchemy import text
+from starlette.concurrency import run_in_threadpool
+
+from app.database import engine, read_engine
+from app.metrics import REGISTRY
+from app.routers.contracts import timeline_snapshots
+from app.services.zammad_service import get_zammad_service
+
+logger = logging.getLogger(__name__)
+
+_ready = REGISTRY.gauge(
+    "app_ready",
+    "1 si le worker est prêt à recevoir du trafic (préchauffage terminé)",
+)
+_warmup_step_seconds = REGISTRY.gauge(
+    "warmup_step_seconds",
+    "Durée de chaque étape du préchauffage au démarrage",
+    labelnames=("step",),
+)
+_warmup_steps_total = REGISTRY.counter(
+    "warmup_steps_total",
+    "Étapes du préchauffage par résultat (success, error, timeout)",
+    labelnames=("step", "result"),
+)
+
+
+class Readiness:
+    """État de disponibilité du worker et résultat des étapes du préchauffage."""
+
+    def __init__(self):
+        self.ready = False
+        self.steps: Dict[str, Dict] = {}
+        _ready.set(0)
+
+    def set_ready(self, ready: bool = True) -> None:
+        """Déclare le worker prêt (ou non, à l'arrêt)."""
+        self.ready = ready
+        _ready.set(1 if ready else 0)
+
+    def record(self, step: str, result: str, seconds: float) -> None:
+        """Enregistre le résultat d'une étape."""
+        self.steps[step] = {"result": result, "seconds": round(seconds, 3)}
+        _warmup_step_seconds.set(seconds, step=step)
+        _warmup_steps_total.inc(step=step, result=result)
+
+    def reset(self) -> None:
+        """Revient à l'état initial (non prêt, aucune étape)."""
+        self.steps.clear()
+        self.set_ready(False)
+
+
+readiness = Readiness()
+
+
+def _open_pool(db_engine) -> int:
+    """
+    Ouvre les connexions permanentes du pool d'un moteur (taille du pool) et
+    les y rend, prêtes à l'emploi.
+
+    Returns:
+        int: Nombre de connexions ouvertes
+    """
+    size = db_engine.pool.size() if hasattr(db_engine.pool, "size") else 1
+    connections = []
+    try:
+        for _ in range(max(size, 1)):
+            connection = db_engine.connect()
+            connections.append(connection)
+            connection.execute(text("SELECT 1"))
+    finally:
+        for connection in connections:
+            connection.close()
+    return len(connections)
+
+
+async def warm_database() -> None:
+    """Ouvre les pools du primaire et du réplica."""
+    for db_engine in (engine, read_engine):
+        if db_engine is not None:
+            await run_in_threadpool(_open_pool, db_engine)
+
+
+async def warm_zammad() -> None:
+    """Tickets projet et statistiques par défaut (client HTTP partagé)."""
+    await get_zammad_service().warm_up()
+
+
+async def warm_contract_timeline() -> None:
+    """Instantané encodé de la timeline des contrats du jour."""
+    await timeline_snapshots.get()
+
+
+WARMUP_STEPS: Dict[str, Callable[[], Awaitable[None]]] = {
+    "database": warm_database,
+    "zammad": warm_zammad,
+    "contract_timeline": warm_contract_timeline,
+}
+
+
+async def _timed(step: str, func: Callable[[], Awaitable[None]]) -> None:
+    started = time.perf_counter()
+    try:
+        await func()
+    except asyncio.CancelledError:
+        readiness.record(step, "timeout", time.perf_counter() - started)
+        raise
+    except Exception as e:
+        readiness.record(step, "error", time.perf_counter() - started)
+        logger.warning("Préchauffage %s en échec : %s", step, e, extra={"step": step})
+    else:
+        readiness.record(step, "success", time.perf_counter() - started)
+
+
+async def run_warmup(
+    budget_seconds: float,
+    steps: Optional[Dict[str, Callable[[], Awaitable[None]]]] = None
+) -> Dict[str, Dict]:
+    """
+    Exécute les étapes du préchauffage en parallèle, puis déclare le worker
+    prêt. Les étapes encore en cours à l'épuisement du budget sont annulées.
+
+    Args:
+        budget_seconds: Durée maximale du préchauffage
+        steps: Étapes (nom -> coroutine), `WARMUP_STEPS` par défaut
+
+    Returns:
+        Dict[str, Dict]: Résultat et durée de chaque étape
+    """
+    started = time.perf_counter()
+    tasks = [
+        asyncio.create_task(_timed(step, func), name=f"warmup-{step}")
+        for step, func in (steps or WARMUP_STEPS).items()
+    ]
+    try:
+        _, pending = await asyncio.wait(tasks, timeout=budget_seconds)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+    finally:
+        # Annulation du préchauffage lui-même (arrêt pendant le démarrage)
+        for task in tasks:
+            task.cancel()
+
+    elapsed = time.perf_counter() - started
+    readiness.set_ready()
+    logger.info(
+        "Préchauffage terminé en %.0f ms (%s)",
+        elapsed * 1000,
+        ", ".join(f"{step} {step_result['result']}" for step, step_result in readiness.steps.items()),
+        extra={"warmup_seconds": elapsed, "steps": readiness.steps}
+    )
+    return dict(readiness.steps)
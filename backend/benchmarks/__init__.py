@@ -0,0 +1,4 @@
+"""
+Benchmarks des chemins critiques du backend (micro et macro).
+Voir benchmarks/README.md.
+"""
@@ -0,0 +1,240 @@
+"""
+Jeux de données synthétiques déterministes (contrats, tickets Zammad).
+
+Les lignes sont produites par blocs de `CHUNK_SIZE`, chaque bloc ayant son
+propre générateur dérivé de la graine : le résultat ne dépend que de la
+graine et du nombre de lignes, quel que soit le mode d'insertion.
+Les distributions (fournisseurs, durées, préavis, montants, délais de
+résolution) imitent un parc réel ; elles servent aux benchmarks et au
+script `scripts/generate_dataset.py`.
+"""
+import math
+import random
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from itertools import accumulate
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+CHUNK_SIZE = 10_000
+
+SUPPLIERS = [
+    "Microsoft", "Orange Business", "OVHcloud", "Salesforce", "Atlassian",
+    "Adobe", "Cisco", "Dell", "HP", "SAP", "Oracle", "Veeam", "Fortinet",
+    "Sophos", "Lenovo", "Bouygues Telecom", "SFR Business", "Citrix",
+    "VMware", "Zoom", "Docusign", "Sage", "Cegid", "Canon",
+]
+# Répartition de type Zipf : quelques fournisseurs concentrent les contrats
+SUPPLIER_WEIGHTS = [1 / (rank ** 1.1) for rank in range(1, len(SUPPLIERS) + 1)]
+
+PRODUCTS = [
+    "Licences", "Support", "Maintenance", "Hébergement", "Téléphonie",
+    "Infogérance", "Sauvegarde", "Réseau", "Sécurité", "Impression",
+]
+DURATIONS_MONTHS = [(12, 45), (24, 15), (36, 25), (48, 5), (60, 10)]
+NOTICE_PERIODS_DAYS = [(30, 35), (60, 20), (90, 30), (180, 10), (365, 5)]
+DOCUMENT_STATUSES = [("ok", 85), ("not_found", 5), ("error", 2)]
+
+TICKET_STATES = [("closed", 70), ("open", 15), ("new", 8), ("pending reminder", 7)]
+TICKET_PRIORITIES = [("2 normal", 75), ("1 low", 10), ("3 high", 15)]
+TICKET_TAGS = ["vpn", "poste", "messagerie", "imprimante", "réseau", "compte", "logiciel"]
+
+# Montant maximal de la colonne Numeric(10, 2)
+MAX_AMOUNT = Decimal("99999999.99")
+
+CONTRACT_COLUMNS: Tuple[str, ...] = (
+    "id", "name", "supplier", "amount", "duration_months", "start_date", "end_date",
+    "notice_period_days", "sharepoint_file_url", "document_status", "document_size",
+    "document_etag", "document_checked_at", "status", "created_at", "updated_at",
+)
+TICKET_COLUMNS: Tuple[str, ...] = (
+    "id", "title", "state", "tags", "created_at", "updated_at", "close_at",
+    "priority", "synced_at",
+)
+
+
+def _weighted(rng: random.Random, choices: Sequence[Tuple], k: int) -> List:
+    values = [value for value, _ in choices]
+    cum_weights = list(accumulate(weight for _, weight in choices))
+    return rng.choices(values, cum_weights=cum_weights, k=k)
+
+
+def _chunks(count: int) -> Iterator[Tuple[int, int]]:
+    # Les tirages par colonne portent toujours sur CHUNK_SIZE lignes, y compris
+    # pour le dernier bloc, afin que les premières lignes ne dépendent pas de `count`
+    for index, start in enumerate(range(0, count, CHUNK_SIZE)):
+        yield index, min(CHUNK_SIZE, count - start)
+
+
+def iter_contract_chunks(
+    count: int,
+    seed: int = 42,
+    today: Optional[date] = None
+) -> Iterator[List[tuple]]:
+    """
+    Génère des contrats par blocs de tuples (ordre `CONTRACT_COLUMNS`).
+    Les échéances vont de 2 ans dans le passé à 5 ans dans le futur pour
+    couvrir tous les statuts (expiré, préavis, actif).
+
+    Args:
+        count: Nombre de contrats
+        seed: Graine du générateur
+        today: Date de référence (aujourd'hui par défaut)
+
+    Yields:
+        List[tuple]: Bloc de lignes
+    """
+    today = today or date.today()
+    for chunk_index, size in _chunks(count):
+        rng = random.Random(f"contracts-{seed}-{chunk_index}")
+        suppliers = rng.choices(SUPPLIERS, weights=SUPPLIER_WEIGHTS, k=CHUNK_SIZE)
+        durations = _weighted(rng, DURATIONS_MONTHS, CHUNK_SIZE)
+        notices = _weighted(rng, NOTICE_PERIODS_DAYS, CHUNK_SIZE)
+        rows = []
+        for i in range(size):
+            number = chunk_index * CHUNK_SIZE + i
+            duration = durations[i]
+            end_date = today + timedelta(days=rng.randint(-730, 1825))
+            start_date = end_date - timedelta(days=round(duration * 365 / 12))
+            created_at = datetime.combine(start_date, datetime.min.time()) - timedelta(
+                days=rng.randint(0, 60)
+            )
+            # Montant annuel log-normal (médiane 12 000 €), proportionnel à la durée
+            annual = rng.lognormvariate(math.log(12_000), 1.2)
+            amount = min(Decimal(round(annual * duration / 12 * 100)) / 100, MAX_AMOUNT)
+            if rng.random() < 0.8:
+                url = f"https://contoso.sharepoint.com/sites/it/Contrats/contrat-{number}.pdf"
+                document_status = _weighted(rng, DOCUMENT_STATUSES, 1)[0]
+                document_size = rng.randint(20_000, 5_000_000) if document_status == "ok" else None
+            else:
+                url, document_status, document_size = None, "no_document", None
+            rows.append((
+                uuid.UUID(int=rng.getrandbits(128), version=4),
+                f"{PRODUCTS[number % len(PRODUCTS)]} {suppliers[i]} #{number}",
+                suppliers[i],
+                max(amount, Decimal("100.00")),
+                duration,
+                start_date,
+                end_date,
+                notices[i],
+                url,
+                document_status,
+                document_size,
+                None,
+                None,
+                "active",
+                created_at,
+                created_at,
+            ))
+        yield rows
+
+
+def iter_ticket_chunks(
+    count: int,
+    seed: int = 42,
+    project_tag: str = "#Projet",
+    now: Optional[datetime] = None
+) -> Iterator[List[tuple]]:
+    """
+    Génère des tickets (cache Zammad) par blocs de tuples (ordre `TICKET_COLUMNS`).
+    Créations sur 3 ans (moins le week-end), délais de résolution
+    log-normaux (médiane 24 h), 10 % de tickets projet.
+
+    Args:
+        count: Nombre de tickets (identifiants 1..count)
+        seed: Graine du générateur
+        project_tag: Tag des tickets projet
+        now: Instant de référence (naïf, UTC)
+
+    Yields:
+        List[tuple]: Bloc de lignes
+    """
+    now = now or datetime.utcnow().replace(microsecond=0)
+    span_seconds = 3 * 365 * 86400
+    for chunk_index, size in _chunks(count):
+        rng = random.Random(f"tickets-{seed}-{chunk_index}")
+        states = _weighted(rng, TICKET_STATES, CHUNK_SIZE)
+        priorities = _weighted(rng, TICKET_PRIORITIES, CHUNK_SIZE)
+        rows = []
+        for i in range(size):
+            ticket_id = chunk_index * CHUNK_SIZE + i + 1
+            created_at = now - timedelta(seconds=rng.randint(0, span_seconds))
+            if created_at.weekday() >= 5 and rng.random() < 0.8:
+                created_at -= timedelta(days=created_at.weekday() - 4)
+            state = states[i]
+            close_at = None
+            if state == "closed":
+                close_at = created_at + timedelta(hours=rng.lognormvariate(math.log(24), 1.0))
+                if close_at > now:
+                    close_at = now
+            tags = []
+            if rng.random() < 0.10:
+                tags.append(project_tag)
+            tags.extend(rng.sample(TICKET_TAGS, rng.choice((0, 0, 1, 1, 2))))
+            rows.append((
+                ticket_id,
+                f"{PRODUCTS[ticket_id % len(PRODUCTS)]} - demande {ticket_id}",
+                state,
+                tags,
+                created_at,
+                close_at or created_at + timedelta(hours=rng.randint(1, 72)),
+                close_at,
+                priorities[i],
+                now,
+            ))
+        yield rows
+
+
+def make_contract_rows(count: int, seed: int = 42, today: Optional[date] = None) -> List[Dict]:
+    """
+    Génère des lignes de la table `contracts` (dictionnaires de colonnes).
+
+    Args:
+        count: Nombre de contrats
+        seed: Graine du générateur
+        today: Date de référence (aujourd'hui par défaut)
+
+    Returns:
+        List[Dict]: Lignes prêtes pour un INSERT groupé
+    """
+    return [
+        dict(zip(CONTRACT_COLUMNS, row))
+        for chunk in iter_contract_chunks(count, seed, today)
+        for row in chunk
+    ]
+
+
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    if value is None:
+        return None
+    return value.replace(tzinfo=timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+def make_ticket_payload(
+    count: int,
+    seed: int = 42,
+    project_tag: str = "#Projet",
+    now: Optional[datetime] = None
+) -> Dict:
+    """
+    Génère une réponse de recherche Zammad (`/api/v1/tickets/search` avec
+    `expand=true`, format `assets`).
+
+    Args:
+        count: Nombre de tickets
+        seed: Graine du générateur
+        project_tag: Tag des tickets projet
+        now: Instant de référence
+
+    Returns:
+        Dict: Corps JSON tel que renvoyé par Zammad
+    """
+    tickets = {}
+    for chunk in iter_ticket_chunks(count, seed, project_tag, now):
+        for row in chunk:
+            ticket = dict(zip(TICKET_COLUMNS, row))
+            del ticket["synced_at"]
+            for key in ("created_at", "updated_at", "close_at"):
+                ticket[key] = _iso(ticket[key])
+            tickets[str(ticket["id"])] = ticket
+    return {"tickets": [int(key) for key in tickets], "assets": {"Ticket": tickets}}
@@ -0,0 +1,82 @@
+"""
+Faux serveur Zammad (HTTP local) pour les benchmarks de bout en bout.
+Les réponses sont pré-générées ; une latence réseau peut être simulée.
+"""
+import asyncio
+import socket
+import threading
+import time
+from typing import Dict
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+
+def create_app(payload: Dict, project_tag: str, latency: float = 0.0) -> Starlette:
+    """
+    Construit l'application du faux Zammad.
+
+    Args:
+        payload: Réponse de recherche (format `assets`) contenant tous les tickets
+        project_tag: Tag des tickets projet
+        latency: Latence ajoutée à chaque réponse (secondes)
+    """
+    tickets = payload["assets"]["Ticket"]
+    project = {key: t for key, t in tickets.items() if project_tag in t["tags"]}
+    closed = {key: t for key, t in tickets.items() if t["close_at"]}
+    search_bodies = {
+        "project": JSONResponse({"tickets": [t["id"] for t in project.values()], "assets": {"Ticket": project}}).body,
+        "closed": JSONResponse({"tickets": [t["id"] for t in closed.values()], "assets": {"Ticket": closed}}).body,
+    }
+
+    async def search(request: Request) -> Response:
+        if latency:
+            await asyncio.sleep(latency)
+        query = request.query_params.get("query", "")
+        body = search_bodies["closed" if query.startswith("state:closed") else "project"]
+        return Response(body, media_type="application/json")
+
+    async def ticket(request: Request) -> Response:
+        if latency:
+            await asyncio.sleep(latency)
+        item = tickets.get(request.path_params["ticket_id"])
+        if item is None:
+            return JSONResponse({"error": "Not found"}, status_code=404)
+        return JSONResponse(item)
+
+    return Starlette(routes=[
+        Route("/api/v1/tickets/search", search),
+        Route("/api/v1/tickets/{ticket_id}", ticket),
+    ])
+
+
+class FakeZammadServer:
+    """Serveur uvicorn exécuté dans un thread, sur un port libre local."""
+
+    def __init__(self, app: Starlette):
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            self.port = probe.getsockname()[1]
+        config = uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="warning", lifespan="off")
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, name="fake-zammad", daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def __enter__(self) -> "FakeZammadServer":
+        self._thread.start()
+        deadline = time.monotonic() + 10
+        while not self._server.started:
+            if time.monotonic() > deadline:
+                raise RuntimeError("Le faux serveur Zammad n'a pas démarré")
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._server.should_exit = True
+        self._thread.join(5)
@@ -0,0 +1,168 @@
+"""
+Mesure et enregistrement des résultats de benchmarks (JSON).
+"""
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(int(round(fraction * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def summarize(durations: List[float], operations: int = 1) -> Dict[str, float]:
+    """
+    Résume une série de durées (secondes) en statistiques.
+
+    Args:
+        durations: Durées mesurées
+        operations: Nombre d'opérations par mesure (pour le débit)
+
+    Returns:
+        Dict[str, float]: min, médiane, moyenne, p95, p99, écart type, ops/s
+    """
+    ordered = sorted(durations)
+    median = statistics.median(ordered)
+    return {
+        "samples": len(ordered),
+        "min": ordered[0],
+        "median": median,
+        "mean": statistics.fmean(ordered),
+        "p95": _percentile(ordered, 0.95),
+        "p99": _percentile(ordered, 0.99),
+        "stdev": statistics.stdev(ordered) if len(ordered) > 1 else 0.0,
+        "ops_per_second": operations / median if median > 0 else 0.0,
+    }
+
+
+def measure(
+    func: Callable[[], object],
+    repeat: int = 5,
+    warmup: int = 1,
+    operations: int = 1
+) -> Dict[str, float]:
+    """
+    Chronomètre une fonction (après échauffement) et résume les durées.
+
+    Args:
+        func: Fonction sans argument à mesurer
+        repeat: Nombre de mesures
+        warmup: Exécutions non mesurées
+        operations: Nombre d'opérations réalisées par appel
+
+    Returns:
+        Dict[str, float]: Statistiques (voir `summarize`)
+    """
+    for _ in range(warmup):
+        func()
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    stats = summarize(durations, operations)
+    stats["operations"] = operations
+    return stats
+
+
+def _git_revision() -> Dict[str, Optional[str]]:
+    def git(*args: str) -> Optional[str]:
+        try:
+            return subprocess.check_output(
+                ["git", *args], stderr=subprocess.DEVNULL, text=True
+            ).strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    return {
+        "commit": git("rev-parse", "HEAD"),
+        "branch": git("rev-parse", "--abbrev-ref", "HEAD"),
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+    }
+
+
+def environment() -> Dict:
+    """Contexte d'exécution enregistré avec les résultats."""
+    return {
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "git": _git_revision(),
+    }
+
+
+def write_results(path: str, results: Dict[str, Dict], parameters: Dict) -> None:
+    """
+    Enregistre les résultats d'une exécution.
+
+    Args:
+        path: Fichier JSON de sortie
+        results: Nom du benchmark -> statistiques
+        parameters: Paramètres de l'exécution (tailles, base...)
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as output:
+        json.dump(
+            {"environment": environment(), "parameters": parameters, "results": results},
+            output, indent=2, ensure_ascii=False
+        )
+        output.write("\n")
+
+
+def _per_operation(stats: Dict) -> float:
+    return stats["median"] / stats.get("operations", 1)
+
+
+def compare(
+    baseline_path: str,
+    current: Dict[str, Dict],
+    parameters: Optional[Dict] = None,
+    threshold: float = 0.10
+) -> List[str]:
+    """
+    Compare des résultats à une exécution de référence (médiane par opération).
+
+    Args:
+        baseline_path: Fichier JSON de référence
+        current: Résultats de l'exécution courante
+        parameters: Paramètres de l'exécution courante
+        threshold: Écart relatif au-delà duquel une régression est signalée
+
+    Returns:
+        List[str]: Lignes du rapport ; celles commençant par "REGRESSION"
+        signalent un ralentissement
+    """
+    with open(baseline_path, encoding="utf-8") as baseline_file:
+        baseline_run = json.load(baseline_file)
+    baseline = baseline_run["results"]
+    lines = []
+    if parameters is not None:
+        changed = sorted(
+            key for key, value in parameters.items()
+            if key != "suite" and baseline_run.get("parameters", {}).get(key, value) != value
+        )
+        if changed:
+            lines.append(f"WARNING    paramètres différents de la référence : {', '.join(changed)}")
+    for name, stats in sorted(current.items()):
+        reference = baseline.get(name)
+        if not reference or not reference.get("median"):
+            lines.append(f"NEW        {name}: {_per_operation(stats) * 1e6:.3f} µs/op")
+            continue
+        before, after = _per_operation(reference), _per_operation(stats)
+        ratio = after / before - 1
+        tag = "REGRESSION" if ratio > threshold else "IMPROVED  " if ratio < -threshold else "OK        "
+        lines.append(f"{tag} {name}: {before * 1e6:.3f} -> {after * 1e6:.3f} µs/op ({ratio:+.1%})")
+    return lines
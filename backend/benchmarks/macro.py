@@ -0,0 +1,151 @@
+"""
+Macro-benchmarks : débit et latence de bout en bout des routes principales
+(application complète, middlewares compris) contre SQLite ou PostgreSQL et
+un faux serveur Zammad.
+"""
+import asyncio
+import time
+from typing import Dict, List, Tuple
+
+import httpx
+from sqlalchemy import create_engine, delete, insert
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from benchmarks.datasets import make_contract_rows, make_ticket_payload
+from benchmarks.fake_zammad import FakeZammadServer, create_app
+from benchmarks.harness import summarize
+
+# Routes mesurées : (nom, chemin)
+ROUTES: List[Tuple[str, str]] = [
+    ("route.health", "/health"),
+    ("route.contracts_list", "/contracts/?limit=100"),
+    ("route.contracts_timeline", "/contracts/timeline/data"),
+    ("route.tickets_stats", "/tickets/stats"),
+    ("route.tickets_timeline", "/tickets/timeline/data"),
+]
+
+INSERT_BATCH_SIZE = 5_000
+
+
+@compiles(UUID, "sqlite")
+def _compile_uuid_sqlite(type_, compiler, **kw):
+    # SQLite n'a pas de type UUID : stockage texte (benchmarks uniquement)
+    return "CHAR(32)"
+
+
+def prepare_database(database_url: str, rows: int, seed: int):
+    """
+    Crée les tables lues par les routes mesurées (contrats, versions des
+    caches partagés) et remplit les contrats avec un jeu déterministe.
+
+    Returns:
+        sessionmaker: Fabrique de sessions sur la base de benchmark
+    """
+    from app.database import Base
+    from app.models.cache_version import CacheVersion
+    from app.models.contract import Contract
+
+    connect_args = {"check_same_thread": False} if database_url.startswith("sqlite") else {}
+    engine = create_engine(database_url, connect_args=connect_args)
+    Base.metadata.create_all(engine, tables=[Contract.__table__, CacheVersion.__table__])
+    data = make_contract_rows(rows, seed)
+    with engine.begin() as conn:
+        conn.execute(delete(Contract))
+        for start in range(0, len(data), INSERT_BATCH_SIZE):
+            conn.execute(insert(Contract), data[start:start + INSERT_BATCH_SIZE])
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+async def _drive(client: httpx.AsyncClient, path: str, requests: int, concurrency: int) -> Dict:
+    latencies: List[float] = []
+    errors = 0
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            response = await client.get(path)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    stats = summarize(latencies)
+    stats["requests"] = requests
+    stats["concurrency"] = concurrency
+    stats["errors"] = errors
+    stats["throughput_rps"] = requests / elapsed if elapsed > 0 else 0.0
+    return stats
+
+
+def run(
+    database_url: str,
+    contracts: int,
+    tickets: int,
+    requests: int,
+    concurrency: int,
+    zammad_latency: float,
+    seed: int
+) -> Dict[str, Dict]:
+    """
+    Exécute les macro-benchmarks sur l'application FastAPI complète.
+
+    Args:
+        database_url: Base de benchmark (SQLite ou PostgreSQL jetable)
+        contracts: Nombre de contrats en base
+        tickets: Nombre de tickets servis par le faux Zammad
+        requests: Nombre de requêtes par route
+        concurrency: Requêtes simultanées
+        zammad_latency: Latence simulée du faux Zammad (secondes)
+        seed: Graine des jeux de données
+
+    Returns:
+        Dict[str, Dict]: Nom du benchmark -> statistiques
+    """
+    session_factory = prepare_database(database_url, contracts, seed)
+    payload = make_ticket_payload(tickets, seed)
+
+    with FakeZammadServer(create_app(payload, settings.zammad_project_tag, zammad_latency)) as zammad:
+        settings.zammad_api_url = zammad.url
+        settings.rate_limit_enabled = False
+
+        from app.database import get_db, get_read_db
+        from app.main import app
+        from app.routers.contracts import timeline_snapshots
+
+        def override_get_db():
+            db = session_factory()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        app.dependency_overrides[get_db] = override_get_db
+        app.dependency_overrides[get_read_db] = override_get_db
+        # Reconstructions de la timeline : sessions propres, hors dépendances
+        timeline_session_factory = timeline_snapshots.session_factory
+        timeline_snapshots.session_factory = session_factory
+
+        async def run_routes() -> Dict[str, Dict]:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                results = {}
+                for name, path in ROUTES:
+                    # Échauffement (caches, compilation des requêtes)
+                    await _drive(client, path, min(concurrency, requests), concurrency)
+                    results[name] = await _drive(client, path, requests, concurrency)
+                return results
+
+        try:
+            return asyncio.run(run_routes())
+        finally:
+            app.dependency_overrides.clear()
+            timeline_snapshots.session_factory = timeline_session_factory
@@ -0,0 +1,116 @@
+"""
+Micro-benchmarks : propriétés calculées des contrats, construction de la
+timeline, décodage des tickets Zammad et agrégation des clôtures par jour.
+"""
+import asyncio
+from datetime import date, timedelta
+from typing import Dict, List
+
+from app.models.contract import Contract, compute_derived_fields
+from app.routers.contracts import ContractResponse, build_contract_timeline
+from app.services.zammad_service import ZammadService
+from benchmarks.datasets import make_contract_rows, make_ticket_payload
+from benchmarks.harness import measure
+
+DERIVED_PROPERTIES = (
+    "notice_start_date", "days_until_end", "is_in_notice_period", "is_expired",
+    "computed_status", "timeline_color", "annual_cost", "duration_years",
+)
+
+
+class _ListQuery:
+    """Requête factice renvoyant des contrats déjà chargés."""
+
+    def __init__(self, items: List[Contract]):
+        self._items = items
+
+    def all(self) -> List[Contract]:
+        return self._items
+
+
+class _LoadedSession:
+    """Session factice : isole la construction de la timeline de la base."""
+
+    def __init__(self, contracts: List[Contract]):
+        self._contracts = contracts
+
+    def query(self, *entities) -> _ListQuery:
+        return _ListQuery(self._contracts)
+
+
+class _PayloadZammadService(ZammadService):
+    """Service Zammad renvoyant une réponse pré-générée (sans réseau)."""
+
+    def __init__(self, payload: Dict):
+        super().__init__()
+        self._payload = payload
+        # Mesure du décodage : aucun résultat gardé en cache entre deux appels
+        self.cache.ttl_seconds = 0
+
+    async def _make_request(self, endpoint, params=None, metric_endpoint=None):
+        return self._payload
+
+
+def run(contracts: int, tickets: int, repeat: int, seed: int) -> Dict[str, Dict]:
+    """
+    Exécute les micro-benchmarks.
+
+    Args:
+        contracts: Nombre de contrats en mémoire
+        tickets: Nombre de tickets dans la réponse Zammad
+        repeat: Nombre de mesures par benchmark
+        seed: Graine des jeux de données
+
+    Returns:
+        Dict[str, Dict]: Nom du benchmark -> statistiques
+    """
+    results = {}
+    loaded = [Contract(**row) for row in make_contract_rows(contracts, seed)]
+
+    def derived_properties():
+        for contract in loaded:
+            for name in DERIVED_PROPERTIES:
+                getattr(contract, name)
+
+    results["contract.derived_properties"] = measure(
+        derived_properties, repeat=repeat, operations=len(loaded)
+    )
+
+    # Mêmes champs, calculés en bloc colonne par colonne (routes de liste)
+    today = date.today()
+    results["contract.derived_fields_bulk"] = measure(
+        lambda: compute_derived_fields(
+            [contract.end_date for contract in loaded],
+            [contract.notice_period_days for contract in loaded],
+            [contract.amount for contract in loaded],
+            [contract.duration_months for contract in loaded],
+            today
+        ),
+        repeat=repeat, operations=len(loaded)
+    )
+
+    sample = loaded[:min(len(loaded), 10_000)]
+    results["contract.response_validation"] = measure(
+        lambda: [ContractResponse.model_validate(contract) for contract in sample],
+        repeat=repeat, operations=len(sample)
+    )
+
+    session = _LoadedSession(loaded)
+    results["timeline.build_items"] = measure(
+        lambda: build_contract_timeline(session),
+        repeat=repeat, operations=len(loaded)
+    )
+
+    payload = make_ticket_payload(tickets, seed)
+    zammad = _PayloadZammadService(payload)
+    results["zammad.decode_tickets"] = measure(
+        lambda: asyncio.run(zammad.get_project_tickets()),
+        repeat=repeat, operations=tickets
+    )
+
+    end = date.today()
+    results["zammad.daily_close_counts"] = measure(
+        lambda: asyncio.run(zammad.get_closed_tickets_stats(end - timedelta(days=30), end)),
+        repeat=repeat, operations=tickets
+    )
+    return results
@@ -0,0 +1,98 @@
+"""
+Point d'entrée des benchmarks.
+
+    python -m benchmarks.run --suite all
+    python -m benchmarks.run --suite micro --compare benchmarks/results/reference.json
+"""
+import argparse
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+# Configuration minimale pour exécuter les benchmarks hors ligne, en
+# l'absence de fichier .env ; les variables déjà définies restent prioritaires
+BENCHMARK_ENVIRONMENT = {
+    "ZAMMAD_API_URL": "http://127.0.0.1:9",
+    "ZAMMAD_API_TOKEN": "benchmark",
+    "AZURE_TENANT_ID": "benchmark",
+    "AZURE_CLIENT_ID": "benchmark",
+    "AZURE_CLIENT_SECRET": "benchmark",
+    "SHAREPOINT_SITE_URL": "https://contoso.sharepoint.com/sites/it",
+    "DATABASE_URL": "sqlite:///" + os.path.join(tempfile.gettempdir(), "cockpit_benchmark_app.db"),
+    "SECRET_KEY": "benchmark-secret-key",
+    "LOG_LEVEL": "WARNING",
+}
+if not os.path.exists(".env"):
+    for name, value in BENCHMARK_ENVIRONMENT.items():
+        os.environ.setdefault(name, value)
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmarks du backend Cockpit IT")
+    parser.add_argument("--suite", choices=["micro", "macro", "all"], default="all")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=5, help="Mesures par micro-benchmark")
+    parser.add_argument("--contracts", type=int, default=100_000, help="Contrats (micro)")
+    parser.add_argument("--tickets", type=int, default=10_000, help="Tickets Zammad")
+    parser.add_argument("--route-contracts", type=int, default=1_000, help="Contrats en base (macro)")
+    parser.add_argument("--requests", type=int, default=200, help="Requêtes par route (macro)")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--zammad-latency-ms", type=float, default=0.0)
+    parser.add_argument(
+        "--database-url",
+        default="sqlite:///" + os.path.join(tempfile.gettempdir(), "cockpit_benchmark.db"),
+        help="Base jetable pour les macro-benchmarks (SQLite ou PostgreSQL)"
+    )
+    parser.add_argument("--output", help="Fichier JSON de résultats (par défaut dans benchmarks/results/)")
+    parser.add_argument("--compare", help="Résultats de référence à comparer")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Seuil de régression (0.10 = 10 %%)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+
+    from benchmarks import harness, macro, micro
+
+    results = {}
+    if args.suite in ("micro", "all"):
+        results.update(micro.run(args.contracts, args.tickets, args.repeat, args.seed))
+    if args.suite in ("macro", "all"):
+        results.update(macro.run(
+            args.database_url,
+            args.route_contracts,
+            args.tickets,
+            args.requests,
+            args.concurrency,
+            args.zammad_latency_ms / 1000,
+            args.seed
+        ))
+
+    revision = harness.environment()["git"]["commit"] or "nogit"
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{datetime.utcnow():%Y%m%dT%H%M%S}-{revision[:10]}.json"
+    )
+    parameters = {key: value for key, value in vars(args).items() if key not in ("output", "compare")}
+    parameters["database_url"] = parameters["database_url"].split("@")[-1]
+    harness.write_results(output, results, parameters)
+
+    for name, stats in sorted(results.items()):
+        line = f"{name:32} médiane {stats['median'] * 1000:9.3f} ms  p95 {stats['p95'] * 1000:9.3f} ms"
+        if "throughput_rps" in stats:
+            line += f"  {stats['throughput_rps']:8.1f} req/s"
+        print(line)
+    print(f"Résultats enregistrés dans {output}")
+
+    if args.compare:
+        report = harness.compare(args.compare, results, parameters, args.threshold)
+        print("\n".join(report))
+        if any(line.startswith("REGRESSION") for line in report):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,13 @@
+-- Migration: Création de la table oauth_states
+-- Date: 2026-10-19
+-- Description: Stockage partagé entre workers des états CSRF du flux SSO
+
+CREATE TABLE IF NOT EXISTS oauth_states (
+    state VARCHAR(128) PRIMARY KEY,
+    expires_at TIMESTAMP NOT NULL
+);
+
+-- Index pour la purge des états expirés
+CREATE INDEX IF NOT EXISTS ix_oauth_states_expires_at ON oauth_states (expires_at);
+
+COMMENT ON TABLE oauth_states IS 'États CSRF à usage unique du flux SSO Microsoft Entra ID';
@@ -0,0 +1,11 @@
+-- Migration: Ajout de l'état des documents SharePoint à la table contracts
+-- Date: 2026-10-19
+-- Description: Colonnes renseignées par le contrôle périodique des liens sharepoint_file_url
+
+ALTER TABLE contracts
+ADD COLUMN IF NOT EXISTS document_status VARCHAR(20),
+ADD COLUMN IF NOT EXISTS document_size BIGINT,
+ADD COLUMN IF NOT EXISTS document_etag VARCHAR(255),
+ADD COLUMN IF NOT EXISTS document_checked_at TIMESTAMP;
+
+COMMENT ON COLUMN contracts.document_status IS 'ok, not_found, error ou no_document';
@@ -0,0 +1,137 @@
+"""
+Script de génération d'un jeu de données synthétique volumineux.
+Charge N contrats et M tickets (cache Zammad) dans la base configurée
+(DATABASE_URL) pour les tests de montée en charge et les benchmarks.
+
+Les données sont déterministes (graine) et produites par blocs ; avec
+PostgreSQL elles sont chargées par COPY, sinon par INSERT groupés.
+
+Exemple :
+    python scripts/generate_dataset.py --contracts 100000 --tickets 1000000 --truncate
+"""
+import argparse
+import csv
+import io
+import sys
+import os
+import time
+
+# Ajouter le répertoire parent au path pour les imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert, text
+
+from app.database import engine
+from app.models.contract import Contract
+from app.models.ticket import TicketCache
+from benchmarks.datasets import (
+    CONTRACT_COLUMNS,
+    TICKET_COLUMNS,
+    iter_contract_chunks,
+    iter_ticket_chunks,
+)
+
+
+def _pg_array(values):
+    """Littéral de tableau PostgreSQL (éléments toujours entre guillemets)."""
+    items = ('"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"' for value in values)
+    return "{" + ",".join(items) + "}"
+
+
+def _copy_chunks(table, columns, chunks):
+    """Charge les blocs par COPY FROM STDIN (format CSV, champ vide = NULL)."""
+    statement = f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+    raw = engine.raw_connection()
+    total = 0
+    try:
+        cursor = raw.cursor()
+        for rows in chunks:
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            for row in rows:
+                writer.writerow(_pg_array(v) if isinstance(v, list) else v for v in row)
+            buffer.seek(0)
+            cursor.copy_expert(statement, buffer)
+            total += len(rows)
+        raw.commit()
+    except Exception:
+        raw.rollback()
+        raise
+    finally:
+        raw.close()
+    return total
+
+
+def _insert_chunks(table, columns, chunks):
+    """Charge les blocs par INSERT groupés (executemany), en une transaction."""
+    total = 0
+    with engine.begin() as connection:
+        for rows in chunks:
+            connection.execute(insert(table), [dict(zip(columns, row)) for row in rows])
+            total += len(rows)
+    return total
+
+
+def load(table, columns, chunks):
+    """Charge des blocs de lignes dans une table et retourne le nombre de lignes."""
+    if engine.dialect.name == "postgresql":
+        return _copy_chunks(table.name, columns, chunks)
+    return _insert_chunks(table, columns, chunks)
+
+
+def generate_dataset(contracts, tickets, seed, truncate):
+    """Génère et charge le jeu de données."""
+    print(f"🗄️  Base : {engine.url.render_as_string(hide_password=True)}")
+
+    if truncate:
+        with engine.begin() as connection:
+            for table in (Contract.__table__, TicketCache.__table__):
+                if engine.dialect.name == "postgresql":
+                    connection.execute(text(f"TRUNCATE TABLE {table.name}"))
+                else:
+                    connection.execute(table.delete())
+        print("🧹 Tables contracts et ticket_cache vidées")
+
+    targets = [
+        (Contract.__table__, CONTRACT_COLUMNS, iter_contract_chunks(contracts, seed), contracts),
+        (TicketCache.__table__, TICKET_COLUMNS, iter_ticket_chunks(tickets, seed), tickets),
+    ]
+    for table, columns, chunks, count in targets:
+        if count <= 0:
+            continue
+        start = time.perf_counter()
+        loaded = load(table, columns, chunks)
+        elapsed = time.perf_counter() - start
+        print(f"✅ {loaded} lignes chargées dans {table.name} en {elapsed:.1f} s "
+              f"({loaded / elapsed:,.0f} lignes/s)")
+
+    if engine.dialect.name == "postgresql":
+        with engine.begin() as connection:
+            connection.execute(text("ANALYZE contracts"))
+            connection.execute(text("ANALYZE ticket_cache"))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Charge un jeu de données synthétique (contrats et tickets) dans la base configurée."
+    )
+    parser.add_argument("--contracts", type=int, default=100_000, help="Nombre de contrats")
+    parser.add_argument("--tickets", type=int, default=1_000_000, help="Nombre de tickets en cache")
+    parser.add_argument("--seed", type=int, default=42, help="Graine du générateur")
+    parser.add_argument(
+        "--truncate",
+        action="store_true",
+        help="Vide les tables contracts et ticket_cache avant le chargement (données existantes perdues)"
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        generate_dataset(args.contracts, args.tickets, args.seed, args.truncate)
+    except Exception as e:
+        print(f"❌ Erreur lors du chargement : {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
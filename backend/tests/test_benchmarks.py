@@ -0,0 +1,80 @@
+import json
+
+from app.config import settings
+from benchmarks import macro
+from benchmarks.datasets import (
+    CHUNK_SIZE,
+    TICKET_COLUMNS,
+    iter_ticket_chunks,
+    make_contract_rows,
+    make_ticket_payload,
+)
+from benchmarks.harness import compare, measure, summarize, write_results
+
+
+def test_datasets_are_deterministic():
+    assert make_contract_rows(50, seed=1) == make_contract_rows(50, seed=1)
+    assert make_contract_rows(50, seed=1) != make_contract_rows(50, seed=2)
+    payload = make_ticket_payload(20, seed=1)
+    assert len(payload["assets"]["Ticket"]) == 20
+    assert payload == make_ticket_payload(20, seed=1)
+
+
+def test_dataset_chunks_do_not_depend_on_count():
+    small = make_contract_rows(10, seed=3)
+    large = make_contract_rows(CHUNK_SIZE + 10, seed=3)
+    assert large[:10] == small
+    assert len({row["id"] for row in large}) == CHUNK_SIZE + 10
+
+    tickets = [row for chunk in iter_ticket_chunks(CHUNK_SIZE + 1, seed=3) for row in chunk]
+    assert [row[0] for row in tickets] == list(range(1, CHUNK_SIZE + 2))
+    closed = [dict(zip(TICKET_COLUMNS, row)) for row in tickets if row[2] == "closed"]
+    assert closed and all(t["close_at"] >= t["created_at"] for t in closed)
+
+
+def test_summarize_and_measure():
+    stats = summarize([0.3, 0.1, 0.2], operations=10)
+    assert stats["median"] == 0.2
+    assert stats["min"] == 0.1
+    assert stats["ops_per_second"] == 50.0
+
+    calls = []
+    stats = measure(lambda: calls.append(1), repeat=3, warmup=2, operations=4)
+    assert len(calls) == 5
+    assert stats["samples"] == 3 and stats["operations"] == 4
+
+
+def test_compare_flags_regressions(tmp_path):
+    baseline = tmp_path / "baseline.json"
+    write_results(str(baseline), {
+        "fast": {"median": 1.0, "operations": 10},
+        "slow": {"median": 1.0, "operations": 10},
+    }, {"contracts": 10})
+    assert json.loads(baseline.read_text())["parameters"] == {"contracts": 10}
+
+    report = compare(str(baseline), {
+        "fast": {"median": 0.5, "operations": 10},
+        "slow": {"median": 2.0, "operations": 10},
+        "added": {"median": 1.0},
+    }, {"contracts": 20})
+    assert report[0].startswith("WARNING")
+    assert any(line.startswith("REGRESSION slow") for line in report)
+    assert any(line.startswith("IMPROVED   fast") for line in report)
+    assert any(line.startswith("NEW        added") for line in report)
+
+
+def test_small_macro_suite_serves_every_route(tmp_path, monkeypatch):
+    # Réglages modifiés par la suite, restaurés après le test
+    monkeypatch.setattr(settings, "zammad_api_url", settings.zammad_api_url)
+    monkeypatch.setattr(settings, "rate_limit_enabled", settings.rate_limit_enabled)
+    results = macro.run(
+        database_url=f"sqlite:///{tmp_path / 'bench.db'}",
+        contracts=20,
+        tickets=20,
+        requests=4,
+        concurrency=2,
+        zammad_latency=0.0,
+        seed=1,
+    )
+    assert set(results) == {name for name, _ in macro.ROUTES}
+    assert all(stats["errors"] == 0 for stats in results.values()), results
@@ -0,0 +1,56 @@
+import asyncio
+import threading
+import pytest
+
+from app.concurrency import BoundedExecutor, ExecutorSaturated, ExecutorTimeout
+from app.metrics import REGISTRY
+
+
+def test_run_returns_result():
+    executor = BoundedExecutor("test_basic", max_workers=1, max_pending=2)
+    try:
+        assert asyncio.run(executor.run(pow, 2, 10)) == 1024
+        assert executor.pending == 0
+    finally:
+        executor.shutdown()
+
+
+def test_saturated_pool_rejects():
+    executor = BoundedExecutor("test_saturation", max_workers=1, max_pending=1)
+    release = threading.Event()
+
+    async def scenario():
+        first = asyncio.ensure_future(executor.run(release.wait))
+        await asyncio.sleep(0)
+        with pytest.raises(ExecutorSaturated):
+            await executor.run(release.wait)
+        release.set()
+        await first
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+
+
+def test_timeout_keeps_slot_until_thread_finishes():
+    executor = BoundedExecutor("test_timeout", max_workers=1, max_pending=1, timeout=0.01)
+    release = threading.Event()
+    try:
+        with pytest.raises(ExecutorTimeout):
+            asyncio.run(executor.run(release.wait))
+        assert executor.pending == 1
+        release.set()
+    finally:
+        executor.shutdown()
+
+
+def test_latency_is_recorded():
+    executor = BoundedExecutor("test_metrics", max_workers=1, max_pending=1)
+    try:
+        asyncio.run(executor.run(sum, [1, 2], operation="sum"))
+    finally:
+        executor.shutdown()
+    histogram = REGISTRY.histogram("executor_task_seconds", "")
+    labels = [key for key, _, _ in histogram.samples()]
+    assert ("test_metrics", "sum") in labels
@@ -6,7 +6,7 @@ import pytest
 from datetime import date, timedelta
 
 from app.main import app
-from app.database import get_db, Base
+from app.database import get_db, get_read_db, Base
 from app.models.contract import Contract
 
 # Configuration de la base de données de test en mémoire (SQLite)
@@ -40,6 +40,7 @@ def client(db_session):
             pass # Session fermée par la fixture db_session
 
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
     yield TestClient(app)
     app.dependency_overrides.clear()
 
@@ -0,0 +1,94 @@
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models.contract import DERIVED_FIELDS, Contract, compute_derived_fields
+from app.routers.contracts import ContractResponse, build_contract_timeline, contract_responses
+
+AS_OF = date(2026, 10, 19)
+
+
+def _contract(end_offset_days, notice_days=60, amount="1200.00", months=12):
+    end_date = AS_OF + timedelta(days=end_offset_days)
+    return Contract(
+        id=uuid.uuid4(),
+        name=f"Contrat {end_offset_days}",
+        supplier="Contoso",
+        amount=Decimal(amount),
+        duration_months=months,
+        start_date=end_date - timedelta(days=365),
+        end_date=end_date,
+        notice_period_days=notice_days,
+        status="active",
+    )
+
+
+CONTRACTS = [
+    _contract(-1),                 # expiré
+    _contract(0),                  # dernier jour, préavis urgent
+    _contract(30),                 # préavis, 30 jours
+    _contract(45),                 # préavis
+    _contract(61),                 # préavis pas encore commencé
+    _contract(400, amount="9000.00", months=36),
+    _contract(10, notice_days=0, months=0),
+]
+
+
+class _Session:
+    def __init__(self, contracts):
+        self.contracts = contracts
+
+    def query(self, *entities):
+        return self
+
+    def all(self):
+        return self.contracts
+
+
+def test_bulk_fields_match_model_properties(monkeypatch):
+    class Today(date):
+        @classmethod
+        def today(cls):
+            return AS_OF
+
+    monkeypatch.setattr("app.models.contract.date", Today)
+    derived = compute_derived_fields(
+        [contract.end_date for contract in CONTRACTS],
+        [contract.notice_period_days for contract in CONTRACTS],
+        [contract.amount for contract in CONTRACTS],
+        [contract.duration_months for contract in CONTRACTS],
+        AS_OF
+    )
+    for index, contract in enumerate(CONTRACTS):
+        for name in DERIVED_FIELDS:
+            assert derived[name][index] == getattr(contract, name), (contract.name, name)
+    assert derived["timeline_color"][:5] == ["#6B7280", "#EF4444", "#EF4444", "#F59E0B", "#10B981"]
+
+
+def test_contract_responses_use_a_single_evaluation_date():
+    responses = contract_responses(CONTRACTS, AS_OF + timedelta(days=50))
+    assert [response["computed_status"] for response in responses[:5]] == [
+        "expired", "expired", "expired", "expired", "in_notice"
+    ]
+    for response in responses:
+        ContractResponse.model_validate(response)
+
+
+def test_timeline_uses_the_evaluation_date():
+    items = build_contract_timeline(_Session(CONTRACTS), AS_OF)
+    colors = {item.id: item.color for item in items}
+    assert colors[f"contract-milestone-{CONTRACTS[0].id}"] == "#6B7280"
+    assert f"contract-notice-{CONTRACTS[0].id}" not in colors
+    assert colors[f"contract-notice-{CONTRACTS[4].id}"] == "#10B981"
+
+    later = build_contract_timeline(_Session(CONTRACTS), AS_OF + timedelta(days=2))
+    later = {item.id: item.color for item in later}
+    assert later[f"contract-milestone-{CONTRACTS[4].id}"] == "#F59E0B"
+
+
+def test_as_of_must_be_a_date():
+    response = TestClient(app).get("/contracts/", params={"as_of": "demain"})
+    assert response.status_code == 422
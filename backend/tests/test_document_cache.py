@@ -0,0 +1,143 @@
+import asyncio
+import httpx
+import pytest
+from fastapi import HTTPException
+
+from app.routers.contracts import _cached_document_response, _parse_byte_range
+from app.services import document_cache
+from app.services.document_cache import DocumentCache, DocumentMetadata
+
+
+def make_metadata(item_id="item", etag="v1", content=b"x" * 10):
+    return DocumentMetadata(
+        item_id=item_id, etag=etag, size=len(content), mime_type="application/pdf", name="a.pdf"
+    )
+
+
+def fill(cache, metadata, content):
+    async def scenario():
+        response = httpx.Response(200, stream=httpx.ByteStream(content))
+        return b"".join([chunk async for chunk in cache.tee(response, metadata)])
+    return asyncio.run(scenario())
+
+
+def cached(cache, item_id, etag="v1"):
+    """Contenu en cache (None si absent), lu comme par la route."""
+    cached_file = asyncio.run(cache.open(item_id, etag))
+    if cached_file is None:
+        return None
+    with cached_file:
+        return cached_file.read()
+
+
+def test_tee_stores_complete_download(tmp_path):
+    cache = DocumentCache(str(tmp_path), max_bytes=100)
+    metadata = make_metadata()
+    assert fill(cache, metadata, b"x" * 10) == b"x" * 10
+    assert cached(cache, "item") == b"x" * 10
+
+
+def test_file_evicted_while_sending_is_still_served(tmp_path):
+    cache = DocumentCache(str(tmp_path), max_bytes=100)
+    metadata = make_metadata()
+    fill(cache, metadata, b"x" * 10)
+    response = _cached_document_response(asyncio.run(cache.open("item", "v1")), metadata, None)
+    # Éviction par un autre worker entre la lecture de l'index et l'envoi
+    for path in tmp_path.iterdir():
+        path.unlink()
+
+    async def body():
+        return b"".join([chunk async for chunk in response.body_iterator])
+
+    assert asyncio.run(body()) == b"x" * 10
+    assert response.headers["content-length"] == "10"
+    assert cached(cache, "item") is None
+
+
+def test_truncated_download_is_not_cached(tmp_path):
+    cache = DocumentCache(str(tmp_path), max_bytes=100)
+    metadata = make_metadata(content=b"x" * 20)
+    fill(cache, metadata, b"x" * 10)
+    assert cached(cache, "item") is None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_new_etag_replaces_previous_version(tmp_path):
+    cache = DocumentCache(str(tmp_path), max_bytes=100)
+    fill(cache, make_metadata(etag="v1"), b"x" * 10)
+    fill(cache, make_metadata(etag="v2"), b"y" * 10)
+    assert cached(cache, "item") is None
+    assert cached(cache, "item", "v2") == b"y" * 10
+    assert cache.total_bytes == 10
+
+
+def test_least_recently_used_is_evicted(tmp_path):
+    cache = DocumentCache(str(tmp_path), max_bytes=25)
+    fill(cache, make_metadata(item_id="a"), b"a" * 10)
+    fill(cache, make_metadata(item_id="b"), b"b" * 10)
+    cached(cache, "a")
+    fill(cache, make_metadata(item_id="c"), b"c" * 10)
+    assert cached(cache, "b") is None
+    assert cached(cache, "a") is not None
+    assert cache.total_bytes == 20
+
+
+def test_budget_applies_to_the_directory_shared_by_workers(tmp_path):
+    first = DocumentCache(str(tmp_path), max_bytes=25)
+    second = DocumentCache(str(tmp_path), max_bytes=25)
+    fill(first, make_metadata(item_id="a"), b"a" * 10)
+    fill(second, make_metadata(item_id="b"), b"b" * 10)
+    fill(first, make_metadata(item_id="c"), b"c" * 10)
+    assert sum(path.stat().st_size for path in tmp_path.iterdir()) == 20
+    assert cached(first, "a") is None
+    assert cached(second, "c") is None  # index du second worker pas encore relu
+    assert cached(first, "b") is not None
+
+
+def test_in_progress_download_of_another_worker_is_kept(tmp_path):
+    partial = tmp_path / "abc-def.1234.part"
+    partial.write_bytes(b"x")
+    DocumentCache(str(tmp_path), max_bytes=100)
+    assert partial.exists()
+
+
+def test_metadata_memo_is_bounded(tmp_path, monkeypatch):
+    monkeypatch.setattr(document_cache, "_MAX_METADATA_ENTRIES", 2)
+    cache = DocumentCache(str(tmp_path), max_bytes=100)
+
+    class Graph:
+        async def get_shared_item_metadata(self, file_url):
+            return {"id": file_url, "eTag": "v1", "size": 1}
+
+    async def scenario():
+        for url in ("a", "b", "c"):
+            await cache.resolve_metadata(Graph(), url)
+
+    asyncio.run(scenario())
+    assert list(cache._metadata) == ["b", "c"]
+
+
+def test_index_is_rebuilt_from_directory(tmp_path):
+    cache = DocumentCache(str(tmp_path), max_bytes=100)
+    fill(cache, make_metadata(), b"x" * 10)
+    reloaded = DocumentCache(str(tmp_path), max_bytes=100)
+    assert cached(reloaded, "item") == b"x" * 10
+    assert reloaded.total_bytes == 10
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("bytes=0-9", (0, 9)),
+    ("bytes=90-", (90, 99)),
+    ("bytes=-10", (90, 99)),
+    ("bytes=50-500", (50, 99)),
+    ("bytes=0-1,5-6", None),
+    ("items=0-1", None),
+])
+def test_parse_byte_range(header, expected):
+    assert _parse_byte_range(header, 100) == expected
+
+
+def test_parse_byte_range_out_of_bounds():
+    with pytest.raises(HTTPException) as error:
+        _parse_byte_range("bytes=100-", 100)
+    assert error.value.status_code == 416
@@ -0,0 +1,295 @@
+import asyncio
+import json
+import os
+import stat
+import threading
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+
+from app.config import settings
+from app.main import app
+from app.routers.contracts import ContractUpdate
+from app.services import graph_service
+from app.services.graph_service import (
+    GraphAuthError,
+    GraphService,
+    SharePointUrlError,
+    close_graph_service,
+    get_graph_service,
+    is_site_file_url,
+)
+
+
+@pytest.fixture(autouse=True)
+def sharepoint_site(monkeypatch):
+    monkeypatch.setattr(settings, "sharepoint_site_url", "https://contoso.sharepoint.com")
+
+
+@pytest.fixture
+def cache_path(tmp_path, monkeypatch):
+    path = tmp_path / "msal" / "token_cache.json"
+    monkeypatch.setattr(settings, "msal_token_cache_path", str(path))
+    return path
+
+
+def test_graph_service_is_a_singleton(cache_path):
+    try:
+        assert get_graph_service() is get_graph_service()
+    finally:
+        asyncio.run(close_graph_service())
+    assert graph_service._graph_service is None
+
+
+def test_token_cache_is_persisted_privately_and_reloaded(cache_path):
+    service = GraphService()
+    service.token_cache.deserialize('{"AccessToken": {"k": {"secret": "x"}}}')
+    service.token_cache.has_state_changed = True
+    service._save_token_cache()
+
+    assert cache_path.exists()
+    assert stat.S_IMODE(os.stat(cache_path).st_mode) == 0o600
+
+    reloaded = GraphService()
+    assert "AccessToken" in reloaded.token_cache.serialize()
+
+
+def test_unchanged_token_cache_is_not_written(cache_path):
+    service = GraphService()
+    service._save_token_cache()
+    assert not cache_path.exists()
+
+
+class FakeMsalApp:
+    def __init__(self, result):
+        self.result = result
+        self.thread_id = None
+
+    def acquire_token_by_refresh_token(self, refresh_token, scopes):
+        self.thread_id = threading.get_ident()
+        return self.result
+
+
+def test_msal_calls_run_off_the_event_loop(cache_path):
+    service = GraphService()
+    service._app = FakeMsalApp({"access_token": "new-token"})
+
+    result = asyncio.run(service.refresh_token("refresh"))
+
+    assert result["access_token"] == "new-token"
+    assert service._app.thread_id != threading.get_ident()
+
+
+def test_msal_error_is_raised(cache_path):
+    service = GraphService()
+    service._app = FakeMsalApp({"error": "invalid_grant", "error_description": "expiré"})
+    with pytest.raises(Exception, match="expiré"):
+        asyncio.run(service.refresh_token("refresh"))
+
+
+class FakeClientCredentialsApp:
+    def acquire_token_for_client(self, scopes):
+        return {"access_token": "app-token"}
+
+
+def make_streaming_service(handler):
+    service = GraphService()
+    service._app = FakeClientCredentialsApp()
+    service._http = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return service
+
+
+def test_encode_sharing_url():
+    encoded = GraphService.encode_sharing_url("https://contoso.sharepoint.com/a.pdf")
+    assert encoded.startswith("u!")
+    assert "=" not in encoded and "/" not in encoded
+
+
+def test_site_file_urls_are_limited_to_the_configured_site():
+    site = "https://contoso.sharepoint.com/sites/achats"
+    assert is_site_file_url("https://contoso.sharepoint.com/sites/achats/Docs/a.pdf", site)
+    assert is_site_file_url("https://CONTOSO.sharepoint.com/sites/achats/a.pdf", site)
+    assert not is_site_file_url("https://contoso.sharepoint.com/sites/achats-rh/a.pdf", site)
+    assert not is_site_file_url("https://contoso.sharepoint.com/sites/rh/a.pdf", site)
+    assert not is_site_file_url("https://contoso.sharepoint.com/sites/achats/../rh/a.pdf", site)
+    assert not is_site_file_url("https://contoso.sharepoint.com/sites/achats/%2e%2e/rh/a.pdf", site)
+    assert not is_site_file_url("https://evil.example/sites/achats/a.pdf", site)
+    assert not is_site_file_url("https://user@contoso.sharepoint.com/sites/achats/a.pdf", site)
+    assert not is_site_file_url("http://contoso.sharepoint.com/sites/achats/a.pdf", site)
+
+
+def test_open_file_stream_rejects_urls_outside_the_site(cache_path):
+    requests = []
+
+    async def scenario():
+        service = make_streaming_service(lambda request: requests.append(request))
+        try:
+            await service.open_file_stream("https://fabrikam.sharepoint.com/secret.pdf")
+        finally:
+            await service.aclose()
+
+    with pytest.raises(SharePointUrlError):
+        asyncio.run(scenario())
+    assert requests == []
+
+
+def test_contract_document_url_must_belong_to_the_site():
+    assert ContractUpdate(sharepoint_file_url="https://contoso.sharepoint.com/a.pdf").sharepoint_file_url
+    assert ContractUpdate(sharepoint_file_url="").sharepoint_file_url is None
+    with pytest.raises(ValidationError):
+        ContractUpdate(sharepoint_file_url="https://fabrikam.sharepoint.com/secret.pdf")
+
+
+def test_contract_document_requires_authentication():
+    response = TestClient(app).get(
+        "/contracts/00000000-0000-0000-0000-000000000000/document"
+    )
+    assert response.status_code == 401
+
+
+def test_app_token_error_is_a_graph_auth_error(cache_path):
+    class FailingApp:
+        def acquire_token_for_client(self, scopes):
+            return {"error": "invalid_client", "error_description": "secret expiré"}
+
+    service = GraphService()
+    service._app = FailingApp()
+    with pytest.raises(GraphAuthError, match="secret expiré"):
+        asyncio.run(service.get_app_token())
+
+
+def test_open_file_stream_forwards_range(cache_path):
+    seen = {}
+
+    def handler(request):
+        seen["range"] = request.headers.get("range")
+        seen["auth"] = request.headers.get("authorization")
+        seen["path"] = request.url.path
+        return httpx.Response(
+            206,
+            stream=httpx.ByteStream(b"%PDF"),
+            headers={"Content-Range": "bytes 0-3/100"}
+        )
+
+    async def scenario():
+        service = make_streaming_service(handler)
+        response = await service.open_file_stream(
+            "https://contoso.sharepoint.com/a.pdf", range_header="bytes=0-3"
+        )
+        body = b"".join([chunk async for chunk in response.aiter_raw()])
+        await response.aclose()
+        await service.aclose()
+        return response, body
+
+    response, body = asyncio.run(scenario())
+    assert response.status_code == 206
+    assert body == b"%PDF"
+    assert seen["range"] == "bytes=0-3"
+    assert seen["auth"] == "Bearer app-token"
+    assert seen["path"].endswith("/driveItem/content")
+
+
+def test_open_file_stream_raises_on_error(cache_path):
+    async def scenario():
+        service = make_streaming_service(lambda request: httpx.Response(404))
+        try:
+            await service.open_file_stream("https://contoso.sharepoint.com/missing.pdf")
+        finally:
+            await service.aclose()
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(scenario())
+
+
+def test_metadata_is_fetched_in_batches_of_twenty(cache_path):
+    batches = []
+
+    def handler(request):
+        payload = json.loads(request.content)
+        batches.append(len(payload["requests"]))
+        responses = [
+            {"id": item["id"], "status": 200, "body": {"id": item["url"]}}
+            for item in payload["requests"]
+        ]
+        return httpx.Response(200, json={"responses": responses})
+
+    urls = {index: f"https://contoso.sharepoint.com/{index}.pdf" for index in range(45)}
+
+    async def scenario():
+        service = make_streaming_service(handler)
+        try:
+            return await service.get_shared_items_metadata(urls)
+        finally:
+            await service.aclose()
+
+    results = asyncio.run(scenario())
+    assert sorted(batches) == [5, 20, 20]
+    assert len(results) == 45
+    code, item = results[7]
+    assert code == 200
+    assert GraphService.encode_sharing_url(urls[7]) in item["id"]
+
+
+def test_metadata_is_not_requested_for_urls_outside_the_site(cache_path):
+    sent = []
+
+    def handler(request):
+        payload = json.loads(request.content)
+        sent.extend(item["url"] for item in payload["requests"])
+        responses = [{"id": item["id"], "status": 200, "body": {}} for item in payload["requests"]]
+        return httpx.Response(200, json={"responses": responses})
+
+    urls = {"ok": "https://contoso.sharepoint.com/a.pdf", "foreign": "https://fabrikam.sharepoint.com/b.pdf"}
+
+    async def scenario():
+        service = make_streaming_service(handler)
+        try:
+            return await service.get_shared_items_metadata(urls)
+        finally:
+            await service.aclose()
+
+    results = asyncio.run(scenario())
+    assert results["foreign"] == (403, {})
+    assert results["ok"][0] == 200
+    assert len(sent) == 1
+
+
+def test_document_statuses_require_authentication():
+    assert TestClient(app).get("/contracts/documents/status").status_code == 401
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("3", 3.0),
+    (None, 1.0),
+    ("bientôt", 1.0),
+    ("Wed, 21 Oct 2015 07:28:00 GMT", 0.0),
+])
+def test_retry_after_is_parsed_defensively(value, expected):
+    assert graph_service._retry_after_seconds(value) == expected
+
+
+def test_throttled_batch_items_are_retried_once(cache_path, monkeypatch):
+    monkeypatch.setattr(settings, "graph_batch_max_retry_after_seconds", 0)
+    calls = []
+
+    def handler(request):
+        payload = json.loads(request.content)
+        calls.append(len(payload["requests"]))
+        status_code = 429 if len(calls) == 1 else 200
+        responses = [
+            {"id": item["id"], "status": status_code, "headers": {"Retry-After": "1"}, "body": {}}
+            for item in payload["requests"]
+        ]
+        return httpx.Response(200, json={"responses": responses})
+
+    async def scenario():
+        service = make_streaming_service(handler)
+        try:
+            return await service.batch_get({"a": ("/me", {}), "b": ("/me", {})})
+        finally:
+            await service.aclose()
+
+    results = asyncio.run(scenario())
+    assert calls == [2, 2]
+    assert results["a"][0] == 200
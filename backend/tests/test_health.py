@@ -0,0 +1,135 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.pool import NullPool
+
+from app.health import HealthChecker, _ping_engine, _probe_connect_args, _probe_engine, health_checker
+from app.main import app
+from app.warmup import readiness
+
+
+def _checker(checks, ttl_seconds=60, timeout_seconds=1.0):
+    return HealthChecker(checks, ttl_seconds=ttl_seconds, timeout_seconds=timeout_seconds)
+
+
+@pytest.fixture
+def ready():
+    readiness.set_ready()
+    yield
+    readiness.reset()
+    health_checker.cache.clear()
+
+
+def test_probe_storm_checks_each_dependency_once():
+    calls = []
+
+    async def database():
+        calls.append("database")
+        # Marge : la boucle peut réveiller une attente un peu avant son terme
+        await asyncio.sleep(0.02)
+
+    checker = _checker({"database": database})
+
+    async def main():
+        return await asyncio.gather(*(checker.check_all() for _ in range(50)))
+
+    results = asyncio.run(main())
+    assert calls == ["database"]
+    assert all(result["database"]["status"] == "up" for result in results)
+    assert results[0]["database"]["latency_ms"] >= 10
+
+
+def test_failures_and_timeouts_are_reported_and_cached():
+    calls = []
+
+    async def broken():
+        calls.append("broken")
+        raise ConnectionError("connexion refusée")
+
+    async def slow():
+        await asyncio.sleep(10)
+
+    checker = _checker({"broken": broken, "slow": slow}, timeout_seconds=0.05)
+
+    async def main():
+        first = await checker.check_all()
+        second = await checker.check_all()
+        return first, second
+
+    first, second = asyncio.run(main())
+    assert first["broken"] == second["broken"]
+    assert first["broken"]["status"] == "down"
+    assert first["broken"]["error"] == "connexion refusée"
+    assert first["slow"]["status"] == "down"
+    assert "délai" in first["slow"]["error"]
+    assert calls == ["broken"]
+
+
+def test_results_expire_after_ttl():
+    calls = []
+
+    async def database():
+        calls.append("database")
+
+    checker = _checker({"database": database}, ttl_seconds=0)
+
+    async def main():
+        await checker.check("database")
+        await checker.check("database")
+
+    asyncio.run(main())
+    assert len(calls) == 2
+
+
+def test_liveness_does_not_check_dependencies(monkeypatch):
+    async def unreachable():
+        raise AssertionError("dépendance interrogée")
+
+    monkeypatch.setattr(health_checker, "checks", {"database": unreachable})
+    response = TestClient(app).get("/health/live")
+    assert response.status_code == 200
+    assert response.json() == {"status": "alive"}
+
+
+def test_readiness_reports_each_dependency(monkeypatch, ready):
+    async def up():
+        pass
+
+    async def down():
+        raise ConnectionError("injoignable")
+
+    client = TestClient(app)
+
+    monkeypatch.setattr(health_checker, "checks", {"database": up, "zammad": down})
+    health_checker.cache.clear()
+    response = client.get("/health/ready")
+    body = response.json()
+    assert response.status_code == 200
+    assert body["status"] == "degraded"
+    assert body["dependencies"]["database"]["status"] == "up"
+    assert body["dependencies"]["zammad"]["status"] == "down"
+    assert "latency_ms" in body["dependencies"]["zammad"]
+
+    monkeypatch.setattr(health_checker, "checks", {"database": down, "zammad": up})
+    health_checker.cache.clear()
+    response = client.get("/health/ready")
+    assert response.status_code == 503
+    assert response.json()["status"] == "unavailable"
+    assert 'health_dependency_up{dependency="database"} 0' in client.get("/metrics").text
+
+
+def test_database_probe_uses_a_dedicated_engine_with_driver_timeouts(tmp_path):
+    assert _probe_connect_args("postgresql", 2.5) == {
+        "connect_timeout": 3, "options": "-c statement_timeout=2500"
+    }
+    app_engine = create_engine(f"sqlite:///{tmp_path / 'probe.db'}")
+    _ping_engine(app_engine)
+    probe = _probe_engine(app_engine)
+    assert probe is not app_engine and isinstance(probe.pool, NullPool)
+    assert _probe_engine(app_engine) is probe
+    # Le pool de l'application n'est pas sollicité
+    assert app_engine.pool.checkedin() == 0
+    probe.dispose()
+    app_engine.dispose()
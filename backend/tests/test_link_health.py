@@ -0,0 +1,51 @@
+import asyncio
+
+from app.config import settings
+from app.services import link_health
+from app.services.graph_service import GraphService
+
+
+class FakeGraph:
+    encode_sharing_url = staticmethod(GraphService.encode_sharing_url)
+
+    def __init__(self, results):
+        self.results = results
+        self.requests = None
+
+    async def batch_get(self, requests):
+        self.requests = requests
+        return self.results
+
+
+def test_scan_uses_conditional_requests_and_stores_results(monkeypatch):
+    monkeypatch.setattr(settings, "sharepoint_site_url", "https://contoso.sharepoint.com")
+    links = [
+        ("changed", "https://contoso.sharepoint.com/a.pdf", '"v1"', 10),
+        ("unchanged", "https://contoso.sharepoint.com/b.pdf", '"v2"', 20),
+        ("missing", "https://contoso.sharepoint.com/c.pdf", None, None),
+        ("failing", "https://contoso.sharepoint.com/d.pdf", '"v4"', 40),
+        ("foreign", "https://fabrikam.sharepoint.com/e.pdf", None, None),
+    ]
+    stored = {}
+    monkeypatch.setattr(link_health, "_load_links", lambda: links)
+    monkeypatch.setattr(
+        link_health, "_store_results", lambda rows, checked_at: stored.update(rows=rows)
+    )
+    graph = FakeGraph({
+        "changed": (200, {"size": 11, "eTag": '"v1b"'}),
+        "unchanged": (304, {}),
+        "missing": (404, {}),
+        "failing": (0, {}),
+    })
+
+    summary = asyncio.run(link_health.scan_document_links(graph))
+
+    assert summary == {"ok": 2, "not_found": 1, "error": 2}
+    assert "foreign" not in graph.requests
+    assert graph.requests["unchanged"][1] == {"If-None-Match": '"v2"'}
+    assert graph.requests["missing"][1] == {}
+    rows = {row["b_contract_id"]: row for row in stored["rows"]}
+    assert (rows["changed"]["b_size"], rows["changed"]["b_etag"]) == (11, '"v1b"')
+    assert (rows["unchanged"]["b_size"], rows["unchanged"]["b_etag"]) == (20, '"v2"')
+    assert rows["missing"]["b_etag"] is None
+    assert (rows["failing"]["b_status"], rows["failing"]["b_etag"]) == ("error", '"v4"')
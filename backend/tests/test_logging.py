@@ -0,0 +1,101 @@
+import json
+import logging
+import queue
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.logging_config import (
+    ContextFilter,
+    JsonFormatter,
+    RequestIdMiddleware,
+    StructuredQueueHandler,
+    debug_sampled,
+)
+
+
+def _capture_logger(name):
+    records = queue.Queue()
+    handler = StructuredQueueHandler(records)
+    handler.addFilter(ContextFilter())
+    logger = logging.getLogger(name)
+    logger.handlers = [handler]
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    return logger, records
+
+
+def test_request_id_is_propagated_to_logs_and_response():
+    logger, records = _capture_logger("tests.request_id")
+    app = FastAPI()
+    app.add_middleware(RequestIdMiddleware)
+
+    @app.get("/ping")
+    def ping():
+        logger.info("pong %s", 1, extra={"contract_id": 42})
+        return {"ok": True}
+
+    client = TestClient(app)
+    response = client.get("/ping", headers={"X-Request-ID": "abc-123"})
+    assert response.headers["X-Request-ID"] == "abc-123"
+
+    entry = json.loads(JsonFormatter().format(records.get_nowait()))
+    assert entry["message"] == "pong 1"
+    assert entry["request_id"] == "abc-123"
+    assert entry["contract_id"] == 42
+    assert entry["level"] == "INFO"
+
+    generated = client.get("/ping", headers={"X-Request-ID": "bad id\n"}).headers["X-Request-ID"]
+    assert generated != "bad id\n" and len(generated) == 32
+
+
+def test_exception_is_serialised_in_emitting_thread():
+    logger, records = _capture_logger("tests.exception")
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logger.exception("échec")
+
+    record = records.get_nowait()
+    assert record.exc_info is None
+    entry = json.loads(JsonFormatter().format(record))
+    assert "ValueError: boom" in entry["exception"]
+
+
+def test_debug_sampled(monkeypatch):
+    logger, records = _capture_logger("tests.sampled")
+    monkeypatch.setattr(settings, "log_debug_sample_rate", 0.0)
+    debug_sampled(logger, "jamais")
+    assert records.empty()
+
+    monkeypatch.setattr(settings, "log_debug_sample_rate", 1.0)
+    debug_sampled(logger, "toujours")
+    assert records.get_nowait().getMessage() == "toujours"
+
+    logger.setLevel(logging.INFO)
+    debug_sampled(logger, "niveau inactif")
+    assert records.empty()
+
+
+def test_shutdown_detaches_queue_handler_and_setup_restarts():
+    from app import logging_config
+
+    root = logging.getLogger()
+    logging_config.shutdown_logging()
+    handlers, level = list(root.handlers), root.level
+    try:
+        logging_config.setup_logging()
+        assert any(isinstance(h, StructuredQueueHandler) for h in root.handlers)
+
+        logging_config.shutdown_logging()
+        assert not any(isinstance(h, StructuredQueueHandler) for h in root.handlers)
+        assert root.handlers
+
+        logging_config.setup_logging()
+        assert logging_config._listener is not None
+        assert [type(h) for h in root.handlers] == [StructuredQueueHandler]
+    finally:
+        logging_config.shutdown_logging()
+        root.handlers = handlers
+        root.setLevel(level)
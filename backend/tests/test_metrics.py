@@ -0,0 +1,61 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+import pytest
+
+from app.metrics import REGISTRY, Registry, track_upstream
+from app.monitoring import MetricsMiddleware
+
+
+def test_render_prometheus_text_format():
+    registry = Registry()
+    requests = registry.counter("demo_requests_total", "Requêtes", labelnames=("path",))
+    latency = registry.histogram("demo_seconds", "Latence", buckets=(0.1, 1.0))
+    gauge = registry.gauge("demo_inflight", "En cours")
+
+    requests.inc(path='/a"b')
+    latency.observe(0.05)
+    latency.observe(0.5)
+    latency.observe(5)
+    registry.add_collector(lambda: gauge.set(3))
+
+    text = registry.render()
+    assert "# TYPE demo_requests_total counter" in text
+    assert 'demo_requests_total{path="/a\\"b"} 1' in text
+    assert 'demo_seconds_bucket{le="0.1"} 1' in text
+    assert 'demo_seconds_bucket{le="1"} 2' in text
+    assert 'demo_seconds_bucket{le="+Inf"} 3' in text
+    assert "demo_seconds_count 3" in text
+    assert "demo_inflight 3" in text
+
+
+def test_track_upstream_counts_errors():
+    with track_upstream("test", "/ok"):
+        pass
+    with pytest.raises(RuntimeError):
+        with track_upstream("test", "/ko"):
+            raise RuntimeError("boom")
+
+    text = REGISTRY.render()
+    assert 'upstream_request_seconds_count{service="test",endpoint="/ok"} 1' in text
+    assert 'upstream_errors_total{service="test",endpoint="/ko"} 1' in text
+    assert 'upstream_errors_total{service="test",endpoint="/ok"}' not in text
+
+
+def test_middleware_labels_by_route_template():
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/items/{item_id}")
+    async def read_item(item_id: int):
+        return {"id": item_id}
+
+    client = TestClient(app)
+    for item_id in (1, 2, 3):
+        assert client.get(f"/items/{item_id}").status_code == 200
+    assert client.get("/unknown/path").status_code == 404
+
+    text = REGISTRY.render()
+    assert 'http_request_seconds_count{method="GET",route="/items/{item_id}"} 3' in text
+    assert 'http_responses_total{method="GET",route="/items/{item_id}",status="200"} 3' in text
+    assert 'http_responses_total{method="GET",route="unmatched",status="404"} 1' in text
+    assert "/items/1" not in text
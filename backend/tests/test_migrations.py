@@ -0,0 +1,68 @@
+from pathlib import Path
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.contract import Contract
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+# Schéma créé par l'application d'origine (Base.metadata.create_all), types
+# PostgreSQL transposés pour SQLite
+ORIGINAL_SCHEMA = [
+    "CREATE TABLE contracts (id CHAR(32) PRIMARY KEY, name VARCHAR(255) NOT NULL,"
+    " supplier VARCHAR(255) NOT NULL, amount NUMERIC(10, 2) NOT NULL,"
+    " duration_months INTEGER NOT NULL, start_date DATE NOT NULL, end_date DATE NOT NULL,"
+    " notice_period_days INTEGER NOT NULL, sharepoint_file_url TEXT, status VARCHAR(50),"
+    " created_at DATETIME, updated_at DATETIME)",
+    "CREATE INDEX ix_contracts_name ON contracts (name)",
+    "CREATE INDEX ix_contracts_end_date ON contracts (end_date)",
+    "CREATE INDEX ix_contracts_status ON contracts (status)",
+    "CREATE TABLE users (id CHAR(32) PRIMARY KEY, username VARCHAR(100) NOT NULL,"
+    " email VARCHAR(255) NOT NULL, hashed_password VARCHAR(255) NOT NULL,"
+    " full_name VARCHAR(255), is_active BOOLEAN, is_admin BOOLEAN, created_at DATETIME,"
+    " last_login DATETIME)",
+    "CREATE UNIQUE INDEX ix_users_username ON users (username)",
+    "CREATE UNIQUE INDEX ix_users_email ON users (email)",
+    "CREATE TABLE ticket_cache (id INTEGER PRIMARY KEY, title VARCHAR NOT NULL,"
+    " state VARCHAR(50), tags TEXT, created_at DATETIME, updated_at DATETIME,"
+    " close_at DATETIME, priority VARCHAR(50), synced_at DATETIME)",
+    "CREATE INDEX ix_ticket_cache_close_at ON ticket_cache (close_at)",
+]
+
+# Script migrations/002 appliqué à la main, sans le 003
+OAUTH_STATES = "CREATE TABLE oauth_states (state VARCHAR(128) PRIMARY KEY, expires_at DATETIME NOT NULL)"
+
+
+def _upgrade_head():
+    # Sans fichier ini : la journalisation des tests n'est pas reconfigurée
+    config = Config()
+    config.set_main_option("script_location", str(BACKEND_DIR / "alembic"))
+    command.upgrade(config, "head")
+
+
+@pytest.mark.parametrize("extra", [[], [OAUTH_STATES]], ids=["original", "with_oauth_states"])
+def test_pre_alembic_schema_is_stamped_then_upgraded(tmp_path, monkeypatch, extra):
+    url = f"sqlite:///{tmp_path / 'legacy.db'}"
+    engine = create_engine(url)
+    with engine.begin() as connection:
+        for statement in ORIGINAL_SCHEMA + extra:
+            connection.execute(text(statement))
+    monkeypatch.setattr(settings, "database_url", url)
+
+    _upgrade_head()
+    _upgrade_head()
+
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT version_num FROM alembic_version")).scalar() == "0002"
+        inspector = inspect(connection)
+        assert {"oauth_states", "cache_versions"} <= set(inspector.get_table_names())
+        columns = {column["name"] for column in inspector.get_columns("contracts")}
+        assert {"document_status", "document_size", "document_etag", "document_checked_at"} <= columns
+    with Session(engine) as db:
+        assert db.query(Contract).all() == []
+    engine.dispose()
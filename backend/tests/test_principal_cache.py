@@ -0,0 +1,128 @@
+from uuid import uuid4
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app import auth
+from app.auth import Principal, PrincipalCache, create_access_token, verify_token
+from app.models.user import User
+
+
+def make_principal(**overrides):
+    values = {
+        "id": uuid4(),
+        "username": "alice",
+        "email": "alice@example.com",
+        "full_name": "Alice",
+        "is_admin": False,
+        "is_active": True,
+    }
+    values.update(overrides)
+    return Principal(**values)
+
+
+@pytest.fixture
+def cache():
+    return PrincipalCache(ttl_seconds=60)
+
+
+def test_cache_hit_after_set(cache):
+    principal = make_principal()
+    cache.set("alice", principal, cache.version("alice"))
+    assert cache.get("alice") is principal
+    assert cache.hits == 1
+
+
+def test_invalidate_drops_entry(cache):
+    cache.set("alice", make_principal(), cache.version("alice"))
+    cache.invalidate("alice")
+    assert cache.get("alice") is None
+
+
+def test_stale_fill_is_ignored(cache):
+    # Lecture commencée avant une promotion : l'entrée réinsérée est obsolète
+    version = cache.version("alice")
+    cache.invalidate("alice")
+    cache.set("alice", make_principal(), version)
+    assert cache.get("alice") is None
+
+
+def test_disabled_cache_stores_nothing():
+    cache = PrincipalCache(ttl_seconds=0)
+    cache.set("alice", make_principal(), 0)
+    assert cache.get("alice") is None
+
+
+def test_principal_from_claims_round_trip():
+    user_id = uuid4()
+    token = create_access_token(
+        data={"sub": "bob", "uid": str(user_id), "email": "bob@example.com", "is_admin": True}
+    )
+    principal = Principal.from_claims(verify_token(token))
+    assert principal.id == user_id
+    assert principal.is_admin is True
+
+
+def test_principal_from_incomplete_claims():
+    assert Principal.from_claims({"sub": "bob"}) is None
+
+
+@pytest.fixture
+def user_session(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'users.db'}")
+    with engine.begin() as connection:
+        # Type UUID PostgreSQL non rendu par SQLite : table créée à la main
+        connection.execute(text(
+            "CREATE TABLE users (id CHAR(32) PRIMARY KEY, username VARCHAR, email VARCHAR,"
+            " hashed_password VARCHAR, full_name VARCHAR, is_active BOOLEAN,"
+            " is_admin BOOLEAN, created_at DATETIME, last_login DATETIME)"
+        ))
+    monkeypatch.setattr(auth, "principal_cache", PrincipalCache(ttl_seconds=60))
+    db = sessionmaker(bind=engine)()
+    db.add(User(username="alice", email="alice@example.com", hashed_password="x"))
+    db.commit()
+    yield db
+    db.close()
+    engine.dispose()
+
+
+def test_stale_fill_between_flush_and_commit_is_dropped(user_session):
+    user = user_session.query(User).one()
+    user.is_active = False
+    user_session.flush()
+    # Lecture concurrente de la ligne d'avant la validation, après le flush
+    cache = auth.principal_cache
+    cache.set("alice", make_principal(), cache.version("alice"))
+    user_session.commit()
+    assert cache.get("alice") is None
+
+
+def test_bulk_update_invalidates_every_principal(user_session):
+    cache = auth.principal_cache
+    cache.set("alice", make_principal(), cache.version("alice"))
+    user_session.query(User).filter(User.username == "alice").update({"is_admin": True})
+    version = cache.version("alice")
+    cache.set("alice", make_principal(), version)
+    user_session.commit()
+    assert cache.get("alice") is None
+
+
+def test_invalidate_all_forgets_per_user_versions(cache):
+    cache.invalidate("alice")
+    cache.invalidate("alice")
+    stale = cache.version("alice")
+    cache.invalidate_all()
+    assert cache._versions == {}
+    # Lecture commencée avant l'invalidation globale : toujours obsolète
+    cache.set("alice", make_principal(), stale)
+    assert cache.get("alice") is None
+
+
+def test_tracked_versions_are_bounded(cache, monkeypatch):
+    monkeypatch.setattr(auth, "_MAX_TRACKED_VERSIONS", 3)
+    versions = {name: cache.version(name) for name in "abcde"}
+    for name in "abcde":
+        cache.invalidate(name)
+    assert len(cache._versions) <= 3
+    for name, version in versions.items():
+        assert cache.version(name) > version
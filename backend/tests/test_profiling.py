@@ -0,0 +1,98 @@
+import asyncio
+import os
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+import pytest
+
+from app import profiling
+from app.auth import Principal, create_access_token, principal_cache
+from app.config import settings
+from app.profiling import ProfilingMiddleware, _store_profile, list_profiles
+
+
+@pytest.fixture
+def profiled_app(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "profiling_dir", str(tmp_path))
+    monkeypatch.setattr(settings, "profiling_sample_rate", 0.0)
+    monkeypatch.setattr(settings, "profiling_token", "secret")
+    monkeypatch.setattr(settings, "profiling_max_files", 50)
+
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware)
+
+    @app.get("/slow/{item_id}")
+    async def slow(item_id: int):
+        await asyncio.sleep(0.01)
+        return {"id": item_id}
+
+    return TestClient(app)
+
+
+def test_unsampled_requests_are_not_instrumented(profiled_app, monkeypatch, tmp_path):
+    def fail(*args, **kwargs):
+        raise AssertionError("Profiler ne doit pas être instancié")
+
+    monkeypatch.setattr(profiling, "Profiler", fail)
+    assert profiled_app.get("/slow/1").status_code == 200
+    assert profiled_app.get("/slow/1", headers={"X-Profile-Token": "wrong"}).status_code == 200
+    assert list_profiles(str(tmp_path)) == []
+
+
+def _bearer(username, is_admin):
+    principal = Principal(
+        id=None, username=username, email=f"{username}@example.com",
+        full_name=None, is_admin=is_admin, is_active=True
+    )
+    principal_cache.set(username, principal, principal_cache.version(username))
+    return {"Authorization": f"Bearer {create_access_token(data={'sub': username})}"}
+
+
+@pytest.fixture
+def cached_principals(monkeypatch):
+    monkeypatch.setattr(principal_cache, "ttl_seconds", 60)
+    yield
+    principal_cache.clear()
+
+
+def test_header_requires_an_admin(profiled_app, monkeypatch, tmp_path, cached_principals):
+    def fail(*args, **kwargs):
+        raise AssertionError("Profiler ne doit pas être instancié")
+
+    monkeypatch.setattr(profiling, "Profiler", fail)
+    headers = {"X-Profile-Token": "secret"}
+    assert profiled_app.get("/slow/1", headers=headers).status_code == 200
+    headers.update(_bearer("bob", is_admin=False))
+    assert profiled_app.get("/slow/1", headers=headers).status_code == 200
+    assert list_profiles(str(tmp_path)) == []
+
+
+def test_header_triggers_profile(profiled_app, tmp_path, cached_principals):
+    pytest.importorskip("pyinstrument")
+    response = profiled_app.get(
+        "/slow/1", headers={"X-Profile-Token": "secret", **_bearer("alice", is_admin=True)}
+    )
+    assert response.json() == {"id": 1}
+
+    profiles = list_profiles(str(tmp_path))
+    assert len(profiles) == 1
+    assert "GET-slow_item_id" in profiles[0]["name"]
+    with open(tmp_path / profiles[0]["name"], encoding="utf-8") as profile_file:
+        assert "<html" in profile_file.read().lower()
+
+
+def test_sample_rate_triggers_profile(profiled_app, monkeypatch, tmp_path):
+    pytest.importorskip("pyinstrument")
+    monkeypatch.setattr(settings, "profiling_sample_rate", 1.0)
+    profiled_app.get("/slow/2")
+    assert len(list_profiles(str(tmp_path))) == 1
+
+
+def test_retention_keeps_most_recent(tmp_path):
+    for i in range(5):
+        _store_profile(str(tmp_path), f"p{i}.html", "<html></html>", max_files=3)
+        os.utime(tmp_path / f"p{i}.html", (i, i))
+    _store_profile(str(tmp_path), "p5.html", "<html></html>", max_files=3)
+
+    names = {profile["name"] for profile in list_profiles(str(tmp_path))}
+    assert names == {"p5.html", "p4.html", "p3.html"}
@@ -0,0 +1,74 @@
+import logging
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from app.config import settings
+from app.query_tracking import QueryTrackingMiddleware
+
+
+@pytest.fixture
+def tracked_client(monkeypatch):
+    monkeypatch.setattr(settings, "debug", True)
+    monkeypatch.setattr(settings, "sql_n_plus_one_threshold", 5)
+    monkeypatch.setattr(settings, "sql_slow_query_ms", 10_000.0)
+    db_engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+
+    app = FastAPI()
+    app.add_middleware(QueryTrackingMiddleware)
+
+    @app.get("/items/{count}")
+    def read_items(count: int):
+        # Endpoint synchrone : exécuté dans le pool de threads
+        with db_engine.connect() as conn:
+            for i in range(count):
+                conn.execute(text("SELECT :i"), {"i": i})
+        return {"count": count}
+
+    return TestClient(app)
+
+
+def test_query_count_headers_in_debug(tracked_client):
+    response = tracked_client.get("/items/3")
+    assert response.headers["X-DB-Query-Count"] == "3"
+    assert float(response.headers["X-DB-Query-Time-Ms"]) >= 0
+
+
+def test_no_headers_outside_debug(tracked_client, monkeypatch):
+    monkeypatch.setattr(settings, "debug", False)
+    response = tracked_client.get("/items/3")
+    assert "X-DB-Query-Count" not in response.headers
+
+
+def test_repeated_statement_flagged_with_route(tracked_client, caplog):
+    with caplog.at_level(logging.WARNING, logger="app.query_tracking"):
+        tracked_client.get("/items/2")
+        assert "N+1" not in caplog.text
+        tracked_client.get("/items/6")
+    assert "N+1 probable sur /items/{count}" in caplog.text
+    assert "6 fois" in caplog.text
+
+
+def test_slow_query_logged_with_route(tracked_client, monkeypatch, caplog):
+    monkeypatch.setattr(settings, "sql_slow_query_ms", 0.0)
+    with caplog.at_level(logging.WARNING, logger="app.query_tracking"):
+        tracked_client.get("/items/1")
+    assert "Requête SQL lente" in caplog.text
+    assert "/items/{count}" in caplog.text
+
+
+def test_failed_statement_does_not_leave_its_start_time():
+    db_engine = create_engine("sqlite://", poolclass=StaticPool)
+    with db_engine.connect() as conn:
+        with pytest.raises(Exception):
+            conn.execute(text("SELECT * FROM missing_table"))
+        assert conn.info.get("query_start_time") == []
+        conn.execute(text("SELECT 1"))
+        assert conn.info["query_start_time"] == []
@@ -0,0 +1,84 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+import pytest
+
+from app.config import settings
+from app.rate_limit import InMemoryRateLimitBackend, RateLimitMiddleware, route_cost
+
+
+@pytest.fixture
+def limited_client(monkeypatch):
+    monkeypatch.setattr(settings, "rate_limit_enabled", True)
+    monkeypatch.setattr(settings, "rate_limit_client_capacity", 10.0)
+    monkeypatch.setattr(settings, "rate_limit_client_refill_per_second", 1.0)
+    monkeypatch.setattr(settings, "rate_limit_global_capacity", 100.0)
+    monkeypatch.setattr(settings, "rate_limit_global_refill_per_second", 1.0)
+
+    app = FastAPI()
+    app.add_middleware(RateLimitMiddleware)
+
+    @app.get("/cheap")
+    async def cheap():
+        return {"ok": True}
+
+    @app.get("/expensive")
+    @route_cost(6)
+    async def expensive():
+        return {"ok": True}
+
+    return TestClient(app)
+
+
+def test_token_bucket_consumes_and_reports_wait():
+    backend = InMemoryRateLimitBackend()
+    assert backend.consume("k", 5, capacity=5, refill_rate=1) == 0
+    assert backend.consume("k", 2, capacity=5, refill_rate=1) == pytest.approx(2, abs=0.1)
+
+
+def test_cost_larger_than_capacity_is_never_accepted():
+    backend = InMemoryRateLimitBackend()
+    assert backend.consume("k", 10, capacity=5, refill_rate=1) == float("inf")
+
+
+def test_expensive_route_is_limited_with_retry_after(limited_client):
+    assert limited_client.get("/expensive").status_code == 200
+    response = limited_client.get("/expensive")
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+
+
+def test_cheap_route_uses_default_cost(limited_client):
+    for _ in range(10):
+        assert limited_client.get("/cheap").status_code == 200
+    assert limited_client.get("/cheap").status_code == 429
+
+
+def test_disabled_rate_limit(limited_client, monkeypatch):
+    monkeypatch.setattr(settings, "rate_limit_enabled", False)
+    for _ in range(5):
+        assert limited_client.get("/expensive").status_code == 200
+
+
+def test_global_bucket_only_applies_when_enabled(limited_client, monkeypatch):
+    monkeypatch.setattr(settings, "rate_limit_global_capacity", 1.0)
+    monkeypatch.setattr(settings, "rate_limit_global_enabled", False)
+    assert limited_client.get("/expensive").status_code == 200
+    monkeypatch.setattr(settings, "rate_limit_global_enabled", True)
+    assert limited_client.get("/cheap").status_code == 200
+    assert limited_client.get("/cheap").status_code == 429
+
+
+def test_route_cost_lookup_is_cached():
+    middleware = RateLimitMiddleware(app=None)
+    app = FastAPI()
+
+    @app.get("/expensive")
+    @route_cost(6)
+    async def expensive():
+        return {"ok": True}
+
+    scope = {"type": "http", "app": app, "method": "GET", "path": "/expensive", "root_path": ""}
+    assert middleware._route_cost(scope) == 6
+    app.router.routes.clear()
+    assert middleware._route_cost(scope) == 6
+    assert middleware._route_cost({**scope, "path": "/other"}) == 1.0
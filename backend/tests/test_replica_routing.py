@@ -0,0 +1,62 @@
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+import pytest
+
+from app.config import settings
+from app.database import (
+    READ_PRIMARY_COOKIE,
+    ReadAfterWriteMiddleware,
+    ReplicaRouter,
+    SessionLocal,
+    _mark_primary_write,
+    wrote_recently,
+)
+
+
+@pytest.fixture
+def replica_engine():
+    return create_engine("sqlite:///:memory:")
+
+
+def test_no_replica_configured():
+    router = ReplicaRouter(None)
+    assert router.use_replica() is False
+
+
+def test_replica_used_when_healthy(replica_engine):
+    router = ReplicaRouter(replica_engine)
+    assert router.use_replica() is True
+    assert router.last_lag == 0.0
+
+
+def test_read_after_write_is_tracked_per_client(monkeypatch):
+    monkeypatch.setattr(settings, "replica_read_after_write_seconds", 60.0)
+    app = FastAPI()
+    app.add_middleware(ReadAfterWriteMiddleware)
+
+    @app.post("/write")
+    def write():
+        _mark_primary_write(SessionLocal(), None)  # comme un flush réel
+
+    @app.get("/read")
+    def read(primary: bool = Depends(wrote_recently)):
+        return {"primary": primary}
+
+    writer, other = TestClient(app), TestClient(app)
+    assert writer.get("/read").headers.get("set-cookie") is None
+    assert READ_PRIMARY_COOKIE in writer.post("/write").headers["set-cookie"]
+    assert writer.get("/read").json() == {"primary": True}
+    assert other.get("/read").json() == {"primary": False}
+
+
+def test_lag_above_threshold_falls_back(replica_engine, monkeypatch):
+    monkeypatch.setattr(settings, "replica_max_lag_seconds", -1.0)
+    router = ReplicaRouter(replica_engine)
+    assert router.use_replica() is False
+
+
+def test_unreachable_replica_falls_back():
+    router = ReplicaRouter(create_engine("sqlite:////nonexistent/dir/replica.db"))
+    assert router.use_replica() is False
+    assert router.last_lag is None
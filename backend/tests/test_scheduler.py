@@ -0,0 +1,177 @@
+import asyncio
+import threading
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.metrics import REGISTRY
+from app.scheduler import CronSchedule, Job, LeaderElection, Scheduler
+
+
+class FakeElection:
+    def __init__(self, is_leader):
+        self.is_leader = is_leader
+
+    async def run(self, retry_interval):
+        await asyncio.sleep(3600)
+
+    async def release(self):
+        self.is_leader = False
+
+
+def _at(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+def test_cron_next_after():
+    assert CronSchedule("*/15 * * * *").next_after(_at(2026, 1, 1, 10, 7, 30)) == _at(2026, 1, 1, 10, 15)
+    assert CronSchedule("0 3 * * *").next_after(_at(2026, 1, 1, 3, 0)) == _at(2026, 1, 2, 3, 0)
+    # 1er du mois ou lundi (jour du mois et jour de semaine restreints)
+    assert CronSchedule("0 0 1 * 1").next_after(_at(2026, 1, 1, 12, 0)) == _at(2026, 1, 5, 0, 0)
+    assert CronSchedule("30 8 * * 7").next_after(_at(2026, 1, 1)) == _at(2026, 1, 4, 8, 30)
+    assert CronSchedule("0 0 29 2 *").next_after(_at(2026, 3, 1)) == _at(2028, 2, 29)
+
+
+@pytest.mark.parametrize("expression", ["* * * *", "60 * * * *", "5-1 * * * *", "0 0 30 2 *"])
+def test_cron_rejects_invalid_expressions(expression):
+    with pytest.raises(ValueError):
+        CronSchedule(expression).next_after(_at(2026, 1, 1))
+
+
+def test_job_requires_a_single_schedule():
+    async def noop():
+        pass
+
+    with pytest.raises(ValueError):
+        Job("both", noop, interval=1, cron="* * * * *")
+    with pytest.raises(ValueError):
+        Job("none", noop)
+
+
+def test_interval_job_runs_and_records_metrics():
+    runs = []
+
+    async def tick():
+        runs.append(1)
+
+    async def scenario():
+        scheduler = Scheduler(FakeElection(is_leader=True))
+        scheduler.add_job(Job("tick", tick, interval=0.01, run_at_start=True))
+        await scheduler.start()
+        await asyncio.sleep(0.1)
+        await scheduler.stop()
+
+    asyncio.run(scenario())
+    assert len(runs) >= 3
+    assert 'scheduler_job_runs_total{job="tick",result="success"}' in REGISTRY.render()
+
+
+def test_leader_only_jobs_are_skipped_on_followers():
+    runs = []
+
+    async def work():
+        runs.append(1)
+
+    async def scenario():
+        scheduler = Scheduler(FakeElection(is_leader=False))
+        scheduler.add_job(Job("follower_job", work, interval=60))
+        scheduler.add_job(Job("every_worker", work, interval=60, leader_only=False))
+        return await scheduler.run_job("follower_job"), await scheduler.run_job("every_worker")
+
+    assert asyncio.run(scenario()) == (None, "success")
+    assert runs == [1]
+    assert 'scheduler_job_skipped_total{job="follower_job",reason="not_leader"}' in REGISTRY.render()
+
+
+def test_overlapping_run_is_skipped_and_errors_are_counted():
+    async def scenario():
+        gate = asyncio.Event()
+
+        async def slow():
+            await gate.wait()
+            raise RuntimeError("échec")
+
+        scheduler = Scheduler(FakeElection(is_leader=True))
+        scheduler.add_job(Job("slow", slow, interval=60))
+        first = asyncio.create_task(scheduler.run_job("slow"))
+        await asyncio.sleep(0)
+        second = await scheduler.run_job("slow")
+        gate.set()
+        return await first, second
+
+    assert asyncio.run(scenario()) == ("error", None)
+    body = REGISTRY.render()
+    assert 'scheduler_job_skipped_total{job="slow",reason="overlap"}' in body
+    assert 'scheduler_job_runs_total{job="slow",result="error"}' in body
+
+
+def test_timeout():
+    async def scenario():
+        async def hang():
+            await asyncio.sleep(10)
+
+        scheduler = Scheduler(FakeElection(is_leader=True))
+        scheduler.add_job(Job("hang", hang, interval=60, timeout=0.01))
+        return await scheduler.run_job("hang")
+
+    assert asyncio.run(scenario()) == "timeout"
+
+
+class SlowLockConnection:
+    def __init__(self, statements):
+        self.statements = statements
+        self.closed = False
+
+    def execute(self, statement, parameters=None):
+        self.statements.append(str(statement))
+        return SimpleNamespace(scalar=lambda: True)
+
+    def commit(self):
+        pass
+
+    def invalidate(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+class SlowLockBind:
+    dialect = SimpleNamespace(name="postgresql")
+
+    def __init__(self):
+        self.connecting = threading.Event()
+        self.proceed = threading.Event()
+        self.statements = []
+        self.connections = []
+
+    def connect(self):
+        self.connecting.set()
+        self.proceed.wait(5)
+        connection = SlowLockConnection(self.statements)
+        self.connections.append(connection)
+        return connection
+
+
+def test_stop_during_acquire_releases_the_advisory_lock():
+    bind = SlowLockBind()
+    election = LeaderElection(bind=bind)
+
+    async def scenario():
+        task = asyncio.create_task(election.run(retry_interval=3600))
+        while not bind.connecting.is_set():
+            await asyncio.sleep(0.01)
+        # Arrêt pendant que la tentative d'acquisition est dans le pool de threads
+        task.cancel()
+        release = asyncio.create_task(election.release())
+        await asyncio.sleep(0.05)
+        bind.proceed.set()
+        await release
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(scenario())
+    assert bind.statements == ["SELECT pg_try_advisory_lock(:key)", "SELECT pg_advisory_unlock(:key)"]
+    assert all(connection.closed for connection in bind.connections)
+    assert election._connection is None
+    assert not election.is_leader
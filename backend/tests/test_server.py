@@ -0,0 +1,35 @@
+from app import server
+from app.config import settings
+
+
+def test_available_cpus_respects_cgroup_quota(tmp_path, monkeypatch):
+    monkeypatch.setattr(server.os, "sched_getaffinity", lambda pid: set(range(8)))
+    cpu_max = tmp_path / "cpu.max"
+
+    cpu_max.write_text("250000 100000\n")
+    assert server.available_cpus(str(cpu_max)) == 3
+
+    cpu_max.write_text("max 100000\n")
+    assert server.available_cpus(str(cpu_max)) == 8
+
+    assert server.available_cpus(str(tmp_path / "missing")) == 8
+
+
+def test_worker_count(monkeypatch):
+    monkeypatch.setattr(server, "available_cpus", lambda: 6)
+    monkeypatch.setattr(settings, "server_workers", 0)
+    assert server.worker_count() == 6
+    monkeypatch.setattr(settings, "server_workers", 2)
+    assert server.worker_count() == 2
+
+
+def test_gunicorn_options(monkeypatch):
+    monkeypatch.setattr(settings, "server_workers", 3)
+    monkeypatch.setattr(settings, "server_port", 9000)
+    monkeypatch.setattr(settings, "server_max_requests", 0)
+    options = server.gunicorn_options()
+    assert options["bind"].endswith(":9000")
+    assert options["workers"] == 3
+    assert options["worker_class"] == "app.server.ProductionWorker"
+    assert options["max_requests_jitter"] == 0
+    assert options["graceful_timeout"] > settings.server_graceful_timeout_seconds
@@ -0,0 +1,50 @@
+import os
+import subprocess
+import sys
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+
+from app.database import advisory_lock, advisory_lock_key
+from app.main import app
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_advisory_lock_key_is_stable_int8():
+    key = advisory_lock_key("bootstrap_admin")
+    assert key == advisory_lock_key("bootstrap_admin")
+    assert key != advisory_lock_key("scheduler")
+    assert -2 ** 63 <= key < 2 ** 63
+
+
+def test_advisory_lock_is_always_acquired_outside_postgresql():
+    sqlite_engine = create_engine("sqlite://")
+    with advisory_lock("bootstrap_admin", bind=sqlite_engine) as acquired:
+        assert acquired
+    sqlite_engine.dispose()
+
+
+def test_sso_routes_are_included_when_enabled():
+    paths = {route.path for route in app.routes}
+    assert {"/auth/login/local", "/auth/login", "/auth/callback"} <= paths
+
+
+def test_msal_and_sso_router_are_not_imported_at_startup():
+    env = dict(os.environ, ENABLE_SSO="false")
+    code = (
+        "import sys, app.main;"
+        "paths = {r.path for r in app.main.app.routes};"
+        "print('msal' in sys.modules, 'app.routers.sso' in sys.modules, '/auth/login' in paths)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=BACKEND_DIR, env=env,
+        capture_output=True, text=True, check=True
+    )
+    assert result.stdout.split() == ["False", "False", "False"]
+
+
+def test_startup_metrics_are_exported():
+    body = TestClient(app).get("/metrics").text
+    assert 'process_startup_seconds{phase="import"}' in body
+    assert "process_resident_memory_bytes" in body
@@ -0,0 +1,147 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app import state_store
+from app.models.oauth_state import OAuthState
+from app.state_store import DatabaseStateStore, InMemoryStateStore
+
+
+def test_state_can_be_consumed_once():
+    store = InMemoryStateStore(ttl_seconds=60)
+    store.put("abc")
+    assert store.consume("abc") is True
+    assert store.consume("abc") is False
+
+
+def test_unknown_state_is_rejected():
+    store = InMemoryStateStore(ttl_seconds=60)
+    assert store.consume("unknown") is False
+
+
+def test_expired_state_is_rejected_and_purged():
+    store = InMemoryStateStore(ttl_seconds=0.01)
+    store.put("old")
+    time.sleep(0.02)
+    store.put("new")
+    assert len(store) == 1
+    assert store.consume("old") is False
+
+
+def test_consumed_state_does_not_break_purge():
+    store = InMemoryStateStore(ttl_seconds=0.01)
+    store.put("a")
+    assert store.consume("a") is True
+    time.sleep(0.02)
+    store.put("b")
+    assert len(store) == 1
+
+
+@pytest.fixture
+def state_sessions(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'states.db'}")
+    OAuthState.__table__.create(bind=engine)
+    factory = sessionmaker(bind=engine)
+    monkeypatch.setattr(state_store, "SessionLocal", factory)
+    yield factory
+    engine.dispose()
+
+
+def _stored_states(factory):
+    db = factory()
+    try:
+        return db.execute(select(func.count()).select_from(OAuthState)).scalar()
+    finally:
+        db.close()
+
+
+def test_database_state_can_be_consumed_once(state_sessions):
+    store = DatabaseStateStore(ttl_seconds=60)
+    store.put("abc")
+    assert store.consume("abc") is True
+    assert store.consume("abc") is False
+    assert store.consume("unknown") is False
+
+
+def test_database_state_is_shared_between_stores(state_sessions):
+    # Deux workers : l'état émis par l'un est consommé par l'autre
+    DatabaseStateStore(ttl_seconds=60).put("abc")
+    assert DatabaseStateStore(ttl_seconds=60).consume("abc") is True
+
+
+def test_database_expired_state_is_rejected(state_sessions):
+    store = DatabaseStateStore(ttl_seconds=-1, cleanup_interval_seconds=3600)
+    store.put("old")
+    assert store.consume("old") is False
+
+
+def test_database_expired_states_are_purged_once_per_interval(state_sessions):
+    db = state_sessions()
+    db.add(OAuthState(state="old", expires_at=datetime.utcnow() - timedelta(seconds=1)))
+    db.commit()
+    db.close()
+
+    store = DatabaseStateStore(ttl_seconds=60, cleanup_interval_seconds=3600)
+    store.put("a")
+    assert _stored_states(state_sessions) == 1
+
+    db = state_sessions()
+    db.add(OAuthState(state="old", expires_at=datetime.utcnow() - timedelta(seconds=1)))
+    db.commit()
+    db.close()
+    store.put("b")
+    assert _stored_states(state_sessions) == 3
+
+
+class ThreadRecordingStore(InMemoryStateStore):
+    def __init__(self):
+        super().__init__(ttl_seconds=60)
+        self.threads = []
+
+    def put(self, state):
+        self.threads.append(threading.get_ident())
+        super().put(state)
+
+    def consume(self, state):
+        self.threads.append(threading.get_ident())
+        return super().consume(state)
+
+
+class FakeGraph:
+    async def get_auth_url(self, state):
+        return f"https://login.example/authorize?state={state}"
+
+    async def authenticate_user(self, code):
+        return {"access_token": "token"}
+
+
+def test_sso_routes_use_the_state_store_off_the_event_loop():
+    from app.routers.sso import router
+    from app.services.graph_service import get_graph_service
+
+    store = ThreadRecordingStore()
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_graph_service] = FakeGraph
+    app.dependency_overrides[state_store.get_state_store] = lambda: store
+    loop_threads = []
+
+    @app.get("/loop-thread")
+    async def loop_thread():
+        loop_threads.append(threading.get_ident())
+
+    with TestClient(app) as client:
+        client.get("/loop-thread")
+        login = client.get("/auth/login", follow_redirects=False)
+        state = login.headers["location"].rsplit("=", 1)[1]
+        assert client.get("/auth/callback", params={"code": "c", "state": state}).status_code == 200
+        assert client.get("/auth/callback", params={"code": "c", "state": state}).status_code == 400
+
+    assert len(store.threads) == 3
+    assert loop_threads[0] not in store.threads
@@ -0,0 +1,134 @@
+import asyncio
+import gzip
+import json
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models.cache_version import CacheVersion
+from app.services import timeline_snapshot
+from app.services.timeline_snapshot import (
+    TimelineSnapshotStore,
+    bump_cache_version,
+    read_cache_version,
+)
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'versions.db'}")
+    CacheVersion.__table__.create(bind=engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+def _bump(session_factory):
+    db = session_factory()
+    try:
+        bump_cache_version(db, "contract_timeline")
+        db.commit()
+    finally:
+        db.close()
+
+
+class Encoder:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, db, today):
+        self.calls.append(today)
+        return json.dumps([{"id": len(self.calls), "as_of": today.isoformat()}]).encode()
+
+
+def test_bump_cache_version_creates_then_increments(session_factory):
+    db = session_factory()
+    assert read_cache_version(db, "contract_timeline") == 0
+    db.close()
+    _bump(session_factory)
+    _bump(session_factory)
+    db = session_factory()
+    assert read_cache_version(db, "contract_timeline") == 2
+    db.close()
+
+
+def test_snapshot_is_rebuilt_only_when_version_changes(session_factory):
+    encode = Encoder()
+    store = TimelineSnapshotStore(encode, version_check_seconds=3600, session_factory=session_factory)
+
+    first = asyncio.run(store.get())
+    assert asyncio.run(store.get()) is first
+    assert len(encode.calls) == 1
+
+    # Écriture d'un autre worker : invisible avant la relecture de la version
+    _bump(session_factory)
+    assert asyncio.run(store.get()) is first
+
+    # Écriture de ce worker : version relue immédiatement
+    store.invalidate()
+    second = asyncio.run(store.get())
+    assert second.version == first.version + 1
+    assert second.etag != first.etag
+    assert len(encode.calls) == 2
+
+
+def test_concurrent_reads_share_a_single_build(session_factory):
+    encode = Encoder()
+    sessions = []
+
+    def tracked_sessions():
+        sessions.append(session_factory())
+        return sessions[-1]
+
+    store = TimelineSnapshotStore(encode, version_check_seconds=3600, session_factory=tracked_sessions)
+
+    async def main():
+        return await asyncio.gather(*(store.get() for _ in range(20)))
+
+    snapshots = asyncio.run(main())
+    assert len({id(snapshot) for snapshot in snapshots}) == 1
+    assert len(encode.calls) == 1
+    # Reconstruction partagée sur une session propre, refermée ensuite
+    assert len(sessions) == 1
+    assert not sessions[0].in_transaction()
+
+
+def test_snapshot_is_rebuilt_at_date_rollover(session_factory, monkeypatch):
+    encode = Encoder()
+    store = TimelineSnapshotStore(encode, version_check_seconds=3600, session_factory=session_factory)
+
+    class Today(date):
+        current = date(2026, 10, 19)
+
+        @classmethod
+        def today(cls):
+            return cls.current
+
+    monkeypatch.setattr(timeline_snapshot, "date", Today)
+    first = asyncio.run(store.get())
+    Today.current = date(2026, 10, 20)
+    second = asyncio.run(store.get())
+    assert (first.as_of, second.as_of) == (date(2026, 10, 19), date(2026, 10, 20))
+    assert encode.calls == [date(2026, 10, 19), date(2026, 10, 20)]
+
+
+def test_snapshot_response_serves_gzip_and_not_modified(session_factory):
+    store = TimelineSnapshotStore(Encoder(), version_check_seconds=3600, session_factory=session_factory)
+    snapshot = asyncio.run(store.get())
+
+    plain = snapshot.response({})
+    assert plain.body == snapshot.body
+    assert plain.headers["etag"] == snapshot.etag
+    assert "content-encoding" not in plain.headers
+
+    compressed = snapshot.response({"accept-encoding": "br, gzip;q=0.8"})
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.headers["vary"] == "Accept-Encoding"
+    assert gzip.decompress(compressed.body) == snapshot.body
+
+    assert "content-encoding" not in snapshot.response({"accept-encoding": "gzip;q=0"}).headers
+
+    not_modified = snapshot.response({"if-none-match": compressed.headers["etag"]})
+    assert not_modified.status_code == 304
+    assert not not_modified.body
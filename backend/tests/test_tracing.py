@@ -0,0 +1,167 @@
+import json
+
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+import httpx
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from app import tracing
+from app.config import settings
+from app.tracing import TracedRoute, TracingMiddleware, inject_traceparent, parse_traceparent
+
+
+@pytest.fixture
+def exported(tmp_path, monkeypatch):
+    path = tmp_path / "spans.jsonl"
+    monkeypatch.setattr(settings, "tracing_enabled", True)
+    monkeypatch.setattr(settings, "tracing_sample_rate", 1.0)
+    monkeypatch.setattr(settings, "tracing_export_path", str(path))
+    exporter = tracing.FileSpanExporter(flush_interval=0.05)
+    monkeypatch.setattr(tracing, "_exporter", exporter)
+
+    def read_spans():
+        exporter.shutdown()
+        spans = []
+        for line in path.read_text().splitlines():
+            for resource in json.loads(line)["resourceSpans"]:
+                for scope in resource["scopeSpans"]:
+                    spans.extend(scope["spans"])
+        return {span["name"]: span for span in spans}
+
+    return read_spans
+
+
+def test_parse_traceparent():
+    trace_id, parent_id = "4bf92f3577b34da6a3ce929d0e0e4736", "00f067aa0ba902b7"
+    assert parse_traceparent(f"00-{trace_id}-{parent_id}-01") == (trace_id, parent_id, True)
+    assert parse_traceparent(f"00-{trace_id}-{parent_id}-00") == (trace_id, parent_id, False)
+    assert parse_traceparent("garbage") is None
+    assert parse_traceparent(f"00-{'0' * 32}-{parent_id}-01") is None
+
+
+def test_no_span_outside_trace():
+    headers = inject_traceparent({})
+    assert "traceparent" not in headers
+
+
+def test_request_spans_are_exported(exported):
+    db_engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    upstream_headers = {}
+
+    def upstream(request: httpx.Request) -> httpx.Response:
+        upstream_headers.update(request.headers)
+        return httpx.Response(200, json={"ok": True})
+
+    client = httpx.AsyncClient(
+        transport=httpx.MockTransport(upstream),
+        event_hooks={"request": [tracing.httpx_inject_traceparent]}
+    )
+
+    router = APIRouter(route_class=TracedRoute)
+
+    @router.get("/items/{item_id}")
+    async def read_item(item_id: int):
+        with db_engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        await client.get("http://upstream/ping")
+        return {"id": item_id}
+
+    app = FastAPI()
+    app.add_middleware(TracingMiddleware)
+    app.include_router(router)
+
+    incoming_trace = "4bf92f3577b34da6a3ce929d0e0e4736"
+    response = TestClient(app).get(
+        "/items/1", headers={"traceparent": f"00-{incoming_trace}-00f067aa0ba902b7-01"}
+    )
+    assert response.status_code == 200
+
+    spans = exported()
+    server = spans["GET /items/{item_id}"]
+    handler = spans["handler /items/{item_id}"]
+    endpoint = spans["endpoint /items/{item_id}"]
+    serialize = spans["serialize /items/{item_id}"]
+    query = spans["db.query"]
+
+    assert server["traceId"] == incoming_trace
+    assert server["parentSpanId"] == "00f067aa0ba902b7"
+    assert server["kind"] == tracing.SPAN_KIND_SERVER
+    assert handler["parentSpanId"] == server["spanId"]
+    assert endpoint["parentSpanId"] == handler["spanId"]
+    assert serialize["parentSpanId"] == handler["spanId"]
+    assert query["parentSpanId"] == endpoint["spanId"]
+    assert {span["traceId"] for span in spans.values()} == {incoming_trace}
+    assert upstream_headers["traceparent"] == f"00-{incoming_trace}-{endpoint['spanId']}-01"
+
+
+def _sampling_app():
+    upstream_headers = {}
+
+    def upstream(request: httpx.Request) -> httpx.Response:
+        upstream_headers.update(request.headers)
+        return httpx.Response(200)
+
+    client = httpx.AsyncClient(
+        transport=httpx.MockTransport(upstream),
+        event_hooks={"request": [tracing.httpx_inject_traceparent]}
+    )
+    router = APIRouter(route_class=TracedRoute)
+
+    @router.get("/ping")
+    async def ping():
+        await client.get("http://upstream/ping")
+        return {"ok": True}
+
+    app = FastAPI()
+    app.add_middleware(TracingMiddleware)
+    app.include_router(router)
+
+    async def from_internal_service(scope, receive, send):
+        # Adresse du client absente des requêtes de TestClient
+        scope = {**scope, "client": ("10.0.0.5", 51000)}
+        await app(scope, receive, send)
+
+    return TestClient(from_internal_service), upstream_headers
+
+
+INCOMING_TRACE = "4bf92f3577b34da6a3ce929d0e0e4736"
+
+
+def test_unsampled_incoming_trace_is_propagated_without_spans(exported):
+    client, upstream_headers = _sampling_app()
+    client.get("/ping", headers={"traceparent": f"00-{INCOMING_TRACE}-00f067aa0ba902b7-00"})
+    assert upstream_headers["traceparent"].startswith(f"00-{INCOMING_TRACE}-")
+    assert upstream_headers["traceparent"].endswith("-00")
+    with pytest.raises(FileNotFoundError):
+        exported()
+
+
+def test_untrusted_caller_cannot_force_sampling(exported, monkeypatch):
+    monkeypatch.setattr(settings, "tracing_sample_rate", 0.0)
+    client, upstream_headers = _sampling_app()
+    client.get("/ping", headers={"traceparent": f"00-{INCOMING_TRACE}-00f067aa0ba902b7-01"})
+    assert upstream_headers["traceparent"].endswith("-00")
+
+    monkeypatch.setattr(settings, "tracing_trusted_ips", ["10.0.0.5"])
+    client.get("/ping", headers={"traceparent": f"00-{INCOMING_TRACE}-00f067aa0ba902b7-01"})
+    assert upstream_headers["traceparent"].endswith("-01")
+    assert exported()["GET /ping"]["traceId"] == INCOMING_TRACE
+
+
+def test_failure_before_execution_keeps_the_enclosing_query_span():
+    db_engine = create_engine("sqlite://", poolclass=StaticPool)
+    with db_engine.connect() as conn:
+        enclosing = tracing.Span(name="db.query", trace_id="1" * 32, span_id="2" * 16)
+        conn.info["trace_spans"] = [enclosing]
+        # Paramètre manquant : échec avant before_cursor_execute
+        with pytest.raises(Exception):
+            conn.execute(text("SELECT :missing"))
+        assert conn.info["trace_spans"] == [enclosing]
+        assert enclosing.end_ns is None
+        with pytest.raises(Exception):
+            conn.execute(text("SELECT * FROM missing_table"))
+        assert conn.info["trace_spans"] == [enclosing]
@@ -0,0 +1,157 @@
+import asyncio
+from datetime import date
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.caching import SingleFlightCache
+from app.health import health_checker
+from app.main import app
+from app.services.zammad_service import ZammadService, default_stats_period
+from app.warmup import readiness, run_warmup
+
+
+class CountingZammadService(ZammadService):
+    def __init__(self, payload=None, error=None):
+        super().__init__()
+        self.payload = payload if payload is not None else []
+        self.error = error
+        self.calls = 0
+
+    async def _make_request(self, endpoint, params=None, metric_endpoint=None):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        if self.error is not None:
+            raise self.error
+        return self.payload
+
+
+@pytest.fixture(autouse=True)
+def reset_readiness():
+    readiness.reset()
+    yield
+    readiness.reset()
+
+
+def test_single_flight_cache_coalesces_concurrent_loads():
+    cache = SingleFlightCache("test", ttl_seconds=60)
+    calls = []
+
+    async def load():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return ["value"]
+
+    async def main():
+        results = await asyncio.gather(*(cache.get_or_load("key", load) for _ in range(10)))
+        return results, await cache.get_or_load("key", load)
+
+    results, cached = asyncio.run(main())
+    assert results == [["value"]] * 10
+    assert cached == ["value"]
+    assert len(calls) == 1
+
+
+def test_single_flight_cache_does_not_cache_errors():
+    cache = SingleFlightCache("test", ttl_seconds=60)
+    calls = []
+
+    async def fail():
+        calls.append(1)
+        raise RuntimeError("amont indisponible")
+
+    async def main():
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                await cache.get_or_load("key", fail)
+
+    asyncio.run(main())
+    assert len(calls) == 2
+
+
+def test_single_flight_cache_drops_result_loaded_before_invalidation():
+    cache = SingleFlightCache("test", ttl_seconds=60)
+
+    async def load_then_invalidate():
+        cache.clear()  # écriture concurrente pendant le chargement
+        return ["stale"]
+
+    asyncio.run(cache.get_or_load("key", load_then_invalidate))
+    assert cache.get("key") is None
+
+
+def test_single_flight_cache_is_bounded(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("app.caching.time.monotonic", lambda: now[0])
+    cache = SingleFlightCache("test", ttl_seconds=60, max_entries=3)
+    for key in ("a", "b", "c"):
+        cache.set(key, key)
+    assert cache.get("a") == "a"  # lue récemment : conservée
+    cache.set("d", "d")
+    assert [cache.get(key) for key in "abcd"] == ["a", None, "c", "d"]
+
+    # Entrées expirées purgées à la mise en cache suivante
+    now[0] += 61
+    cache.set("e", "e")
+    assert list(cache._entries) == ["e"]
+
+
+def test_zammad_service_caches_project_tickets_and_stats():
+    zammad = CountingZammadService()
+    start_date, end_date = default_stats_period(date(2026, 1, 31))
+    assert start_date == date(2026, 1, 1)
+
+    async def main():
+        await asyncio.gather(zammad.get_project_tickets(), zammad.get_project_tickets())
+        await zammad.get_closed_tickets_stats(start_date, end_date)
+        await zammad.get_closed_tickets_stats(start_date, end_date)
+        await zammad.aclose()
+
+    asyncio.run(main())
+    assert zammad.calls == 2
+
+
+def test_zammad_warm_up_propagates_errors_without_caching():
+    zammad = CountingZammadService(error=httpx.ConnectError("refused"))
+
+    async def main():
+        with pytest.raises(httpx.HTTPError):
+            await zammad.warm_up()
+        return await zammad.get_project_tickets()
+
+    assert asyncio.run(main()) == []
+    assert zammad.calls == 3
+
+
+def test_warmup_budget_cancels_slow_steps_and_reports_ready():
+    async def fast():
+        pass
+
+    async def slow():
+        await asyncio.sleep(10)
+
+    async def broken():
+        raise RuntimeError("base indisponible")
+
+    steps = asyncio.run(run_warmup(0.1, {"fast": fast, "slow": slow, "broken": broken}))
+    assert {step: result["result"] for step, result in steps.items()} == {
+        "fast": "success",
+        "slow": "timeout",
+        "broken": "error",
+    }
+    assert readiness.ready
+
+
+def test_readiness_probe_waits_for_warmup(monkeypatch):
+    monkeypatch.setattr(health_checker, "checks", {})
+    client = TestClient(app)
+    response = client.get("/health/ready")
+    assert response.status_code == 503
+    assert response.json()["status"] == "starting"
+
+    readiness.set_ready()
+    response = client.get("/health/ready")
+    assert response.status_code == 200
+    assert response.json()["status"] == "ready"
+    assert "app_ready 1" in client.get("/metrics").text
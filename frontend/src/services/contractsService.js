@@ -5,6 +5,8 @@ import axios from 'axios';
 import { API_ENDPOINTS } from '../config/api';
 
 const api = axios.create({
+    // Cookie de lecture de ses propres écritures (réplica en lecture)
+    withCredentials: true,
     headers: {
         'Content-Type': 'application/json',
     },